@@ -8,6 +8,7 @@ from supabase import Client
 
 from app.core.auth import get_current_user
 from app.core.database import get_db
+from app.core.streaming import sse_response
 from app.services.cover_letter_generator import cover_letter_generator
 from app.services.job_watchlist import JobWatchlistService
 from app.services.profile import ProfileService
@@ -135,6 +136,33 @@ async def generate_cover_letter(
         )
 
 
+@router.post("/generate/stream")
+async def stream_cover_letter(
+    request: CoverLetterGenerationRequest,
+    current_user: str = Depends(get_current_user),
+    db: Client = Depends(get_db)
+):
+    """Stream a cover letter for a specific job as server-sent events"""
+    from app.services.simple_ai import simple_ai_service
+    
+    # Verify job exists and user has access
+    job_result = db.table("jobs").select("""
+        *,
+        job_sites_watchlist!inner(user_id)
+    """).eq("id", request.job_id).eq("job_sites_watchlist.user_id", current_user).execute()
+    
+    if not job_result.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or access denied"
+        )
+    
+    job = Job(**job_result.data[0])
+    user_profile = await ProfileService(db).get_complete_profile(current_user)
+    
+    return sse_response(simple_ai_service.stream_cover_letter(user_profile, job))
+
+
 @router.get("/", response_model=List[CoverLetterWithJob])
 async def get_cover_letters(
     current_user: str = Depends(get_current_user),
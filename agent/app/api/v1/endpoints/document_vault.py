@@ -2,9 +2,15 @@
 Document vault API endpoints
 """
 
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Header, Request
+from fastapi.responses import FileResponse, RedirectResponse, JSONResponse
 from supabase import Client
 
 from app.core.auth import get_current_user
@@ -13,35 +19,67 @@ from app.services.document_vault import get_document_vault_service, DocumentVaul
 
 router = APIRouter()
 
+# Uploads are spooled to disk in chunks of this size rather than read whole
+_UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+# Caps how many vault uploads are staged and stored at once per process
+_upload_slots = asyncio.Semaphore(8)
+# Content hashes are SHA-256 hex digests, as stored in document_vault.file_hash
+_CONTENT_HASH = re.compile(r"[0-9a-fA-F]{64}")
+# Accept type for the column-per-field document listing
+_COLUMNAR_MEDIA_TYPE = "application/vnd.activcv.columnar+json"
+
 
 @router.get("/")
 async def get_documents(
+    request: Request,
     current_user: str = Depends(get_current_user),
     document_type: Optional[str] = Query(None),
     folder_id: Optional[str] = Query(None),
     search_query: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True),
+    after_created_at: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
     vault_service: DocumentVaultService = Depends(get_document_vault_service)
 ):
-    """Get user's documents with filtering"""
+    """
+    Get user's documents with filtering, newest first
+    
+    To fetch the next page, pass the created_at and id of the last document
+    received as after_created_at and after_id. offset still works but is
+    deprecated, and is ignored when a cursor is given.
+    
+    Clients that accept application/vnd.activcv.columnar+json get the page
+    as one list per column (id, title, document_type, created_at) plus
+    next_cursor and total_count.
+    """
     try:
-        result = await vault_service.get_documents(
-            user_id=current_user,
+        filters = dict(
             document_type=document_type,
             folder_id=folder_id,
             search_query=search_query,
             limit=limit,
-            offset=offset
+            offset=offset,
+            after=(after_created_at, after_id) if after_created_at and after_id else None
         )
-        
-        if result["success"]:
-            return result["documents"]
+        columnar = _COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+        if columnar:
+            result = await vault_service.get_documents_columnar(current_user, **filters)
         else:
+            result = await vault_service.get_documents(user_id=current_user, **filters)
+        
+        if not result["success"]:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=result["error"]
             )
+        
+        if columnar:
+            return JSONResponse(
+                {key: result[key] for key in ("columns", "next_cursor", "total_count")},
+                media_type=_COLUMNAR_MEDIA_TYPE
+            )
+        return result["documents"]
             
     except HTTPException:
         raise
@@ -178,6 +216,40 @@ async def delete_document(
         )
 
 
+@router.post("/bulk-delete")
+async def delete_documents(
+    delete_request: dict,
+    current_user: str = Depends(get_current_user),
+    vault_service: DocumentVaultService = Depends(get_document_vault_service)
+):
+    """Permanently delete several documents at once"""
+    document_ids = delete_request.get("document_ids") or []
+    if not isinstance(document_ids, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="document_ids must be a list"
+        )
+    
+    try:
+        result = await vault_service.delete_documents(document_ids, current_user)
+        
+        if result["success"]:
+            return {"deleted_count": result["deleted_count"]}
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result["error"]
+            )
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete documents: {str(e)}"
+        )
+
+
 @router.post("/{document_id}/share")
 async def create_share_link(
     document_id: str,
@@ -369,6 +441,32 @@ async def get_storage_stats(
         )
 
 
+@router.post("/check-hash")
+async def check_document_hash(
+    hash_request: dict,
+    current_user: str = Depends(get_current_user),
+    vault_service: DocumentVaultService = Depends(get_document_vault_service)
+):
+    """
+    Check whether a file is already in the vault before uploading it
+    
+    Send the SHA-256 hex digest of the file as file_hash; if it is a
+    duplicate, the upload can be skipped.
+    """
+    file_hash = str(hash_request.get("file_hash") or "")
+    if not _CONTENT_HASH.fullmatch(file_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file_hash must be a SHA-256 hex digest"
+        )
+    
+    existing = await vault_service.find_duplicate(current_user, file_hash)
+    return {
+        "duplicate": existing is not None,
+        "existing_document_id": existing["id"] if existing else None
+    }
+
+
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
@@ -376,42 +474,28 @@ async def upload_document(
     title: str = Query(...),
     description: Optional[str] = Query(None),
     folder_id: Optional[str] = Query(None),
+    content_hash: Optional[str] = Header(None, alias="X-Content-Hash"),
     current_user: str = Depends(get_current_user),
     vault_service: DocumentVaultService = Depends(get_document_vault_service)
 ):
-    """Upload document directly to vault"""
+    """
+    Upload document directly to vault
+    
+    Clients that send the file's SHA-256 digest in X-Content-Hash have
+    duplicates rejected before the file is staged or hashed here.
+    """
     try:
-        # Save uploaded file temporarily
-        import tempfile
-        import os
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Store in vault
-            result = await vault_service.store_document(
-                user_id=current_user,
-                file_path=temp_file_path,
-                document_type=document_type,
-                title=title,
-                description=description,
-                folder_id=folder_id
-            )
-            
-            if result["success"]:
-                return result["document"]
-            else:
+        if content_hash and _CONTENT_HASH.fullmatch(content_hash):
+            if await vault_service.find_duplicate(current_user, content_hash):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=result["error"]
+                    detail="Duplicate document already exists"
                 )
         
-        finally:
-            # Clean up temp file
-            os.unlink(temp_file_path)
+        async with _upload_slots:
+            return await _store_uploaded_document(
+                file, document_type, title, description, folder_id, current_user, vault_service
+            )
             
     except HTTPException:
         raise
@@ -419,4 +503,43 @@ async def upload_document(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload document: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def _store_uploaded_document(
+    file: UploadFile,
+    document_type: str,
+    title: str,
+    description: Optional[str],
+    folder_id: Optional[str],
+    current_user: str,
+    vault_service: DocumentVaultService
+):
+    """Stage an uploaded file on disk and store it in the vault"""
+    # Save uploaded file temporarily, copying in chunks off the event loop
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as temp_file:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, temp_file, _UPLOAD_COPY_CHUNK_SIZE)
+        temp_file_path = temp_file.name
+    
+    try:
+        # Store in vault
+        result = await vault_service.store_document(
+            user_id=current_user,
+            file_path=temp_file_path,
+            document_type=document_type,
+            title=title,
+            description=description,
+            folder_id=folder_id
+        )
+        
+        if result["success"]:
+            return result["document"]
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result["error"]
+            )
+    
+    finally:
+        # Clean up temp file
+        os.unlink(temp_file_path)
\ No newline at end of file
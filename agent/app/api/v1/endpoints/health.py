@@ -2,7 +2,7 @@
 Health check endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -14,11 +14,15 @@ class HealthResponse(BaseModel):
     version: str
 
 
+# The health payload never changes, so it is validated and serialised once
+_HEALTH_BODY = HealthResponse(
+    status="healthy",
+    service="ai-cv-agent",
+    version="0.1.0"
+).model_dump_json().encode()
+
+
 @router.get("/", response_model=HealthResponse)
 async def health_check():
     """Detailed health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        service="ai-cv-agent",
-        version="0.1.0"
-    )
\ No newline at end of file
+    return Response(content=_HEALTH_BODY, media_type="application/json")
\ No newline at end of file
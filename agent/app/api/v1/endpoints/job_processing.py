@@ -10,7 +10,7 @@ import asyncio
 
 from app.core.auth import get_current_user
 from app.core.database import get_db
-from app.services.job_processor import JobProcessor
+from app.services.job_processor import JobProcessor, get_job_processor
 from app.models.job_processing import (
     JobQueue, JobQueueCreate, JobQueueUpdate, JobQueueWithSteps,
     JobType, JobStatus, JobDashboardStats, JobSearchFilters,
@@ -21,11 +21,6 @@ from app.models.job_processing import (
 router = APIRouter()
 
 
-def get_job_processor(db: Client = Depends(get_db)) -> JobProcessor:
-    """Get job processor instance"""
-    return JobProcessor(db)
-
-
 @router.post("/", response_model=JobQueue)
 async def create_job(
     job_create: JobQueueCreate,
@@ -87,7 +82,7 @@ async def get_jobs(
         
         result = query.execute()
         
-        return [JobQueue(**job) for job in result.data]
+        return [JobQueue.model_validate(job) for job in result.data]
         
     except Exception as e:
         raise HTTPException(
@@ -148,11 +143,11 @@ async def update_job(
             result = db.table("job_queue").update(update_data).eq("id", job_id).execute()
             
             if result.data:
-                return JobQueue(**result.data[0])
+                return JobQueue.model_validate(result.data[0])
         
         # Return current job if no updates
         current_result = db.table("job_queue").select("*").eq("id", job_id).execute()
-        return JobQueue(**current_result.data[0])
+        return JobQueue.model_validate(current_result.data[0])
         
     except HTTPException:
         raise
@@ -219,7 +214,7 @@ async def retry_job(
                 detail="Job not found"
             )
         
-        job = JobQueue(**job_result.data[0])
+        job = JobQueue.model_validate(job_result.data[0])
         
         if job.status not in [JobStatus.FAILED, JobStatus.CANCELLED]:
             raise HTTPException(
@@ -250,7 +245,7 @@ async def retry_job(
         result = db.table("job_queue").update(update_data).eq("id", job_id).execute()
         
         if result.data:
-            updated_job = JobQueue(**result.data[0])
+            updated_job = JobQueue.model_validate(result.data[0])
             
             # Reset processing steps
             db.table("job_processing_steps").update({
@@ -318,7 +313,7 @@ async def cancel_job(
         result = db.table("job_queue").update(update_data).eq("id", job_id).execute()
         
         if result.data:
-            return JobQueue(**result.data[0])
+            return JobQueue.model_validate(result.data[0])
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -479,12 +474,12 @@ async def job_queue_worker(processor: JobProcessor):
     """Continuous job queue worker"""
     while True:
         try:
-            # Get next job
+            # Claim next job (safe with several workers polling)
             job = await processor.get_next_job()
             
             if job:
                 # Process job
-                await processor.process_job(job)
+                await processor.process_job(job, claimed=True)
             else:
                 # No jobs available, wait before checking again
                 await asyncio.sleep(5)
@@ -8,6 +8,7 @@ from supabase import Client
 
 from app.core.auth import get_current_user
 from app.core.database import get_db
+from app.core.streaming import sse_response
 from app.services.job_watchlist import JobWatchlistService
 from app.services.job_crawler import JobCrawlerService
 from app.services.job_matcher import JobMatcherService
@@ -246,6 +247,34 @@ async def generate_cv_for_job(
     }
 
 
+@router.post("/generate-cv/{job_id}/stream")
+async def stream_cv_for_job(
+    job_id: str,
+    current_user: str = Depends(get_current_user),
+    service: JobWatchlistService = Depends(get_job_watchlist_service)
+):
+    """Stream a tailored CV for a specific job as server-sent events"""
+    from app.services.profile import ProfileService
+    from app.services.simple_ai import simple_ai_service
+    
+    # Verify job exists and user has access
+    job_result = service.db.table("jobs").select("""
+        *,
+        job_sites_watchlist!inner(user_id)
+    """).eq("id", job_id).eq("job_sites_watchlist.user_id", current_user).execute()
+    
+    if not job_result.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or access denied"
+        )
+    
+    job = Job(**job_result.data[0])
+    complete_profile = await ProfileService(service.db).get_complete_profile(current_user)
+    
+    return sse_response(simple_ai_service.stream_tailored_cv(complete_profile, job))
+
+
 # Crawling management endpoints (admin/manual triggers)
 @router.post("/crawl/{site_id}")
 async def crawl_site_manually(
@@ -2,8 +2,10 @@
 File upload and parsing endpoints
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
 from supabase import Client
 
 from app.core.auth import get_current_user
@@ -14,9 +16,16 @@ from app.models.upload import Upload, ParsedData, ParseResponse
 router = APIRouter()
 
 
+# The service holds no per-request state, so one instance serves every request
+_upload_service: Optional[UploadService] = None
+
+
 def get_upload_service(db: Client = Depends(get_db)) -> UploadService:
     """Get upload service instance"""
-    return UploadService(db)
+    global _upload_service
+    if _upload_service is None or _upload_service.db is not db:
+        _upload_service = UploadService(db)
+    return _upload_service
 
 
 @router.post("/", response_model=Upload, status_code=status.HTTP_201_CREATED)
@@ -48,11 +57,20 @@ async def upload_cv(
 
 @router.get("/", response_model=List[Upload])
 async def get_uploads(
+    limit: int = Query(50, ge=1, le=100),
+    after_created_at: Optional[datetime] = Query(None),
+    after_id: Optional[str] = Query(None),
     current_user: str = Depends(get_current_user),
     service: UploadService = Depends(get_upload_service)
 ):
-    """Get all uploads for the current user"""
-    return await service.get_user_uploads(current_user)
+    """
+    Get uploads for the current user, newest first
+    
+    To fetch the next page, pass the created_at and id of the last upload
+    received as after_created_at and after_id.
+    """
+    after = (after_created_at, after_id) if after_created_at and after_id else None
+    return await service.get_user_uploads(current_user, after=after, limit=limit)
 
 
 @router.get("/{upload_id}", response_model=Upload)
@@ -142,6 +160,9 @@ async def apply_parsed_data_to_profile(
     # Implement profile merging logic
     try:
         from app.services.profile import ProfileService
+        from app.models.profile import (
+            EducationCreate, ExperienceCreate, SkillCreate, CertificationCreate
+        )
         profile_service = ProfileService(service.db)
         
         # Get current profile data
@@ -200,6 +221,12 @@ async def apply_parsed_data_to_profile(
                 changes_summary["profile"]["updated"] = True
                 changes_summary["profile"]["fields"].append("summary")
         
+        # New entries are collected per section and inserted together at the end
+        new_education = []
+        new_experience = []
+        new_skills = []
+        new_certifications = []
+        
         # 3. Merge Education
         if parsed_data.education:
             for edu_data in parsed_data.education:
@@ -215,9 +242,8 @@ async def apply_parsed_data_to_profile(
                             break
                 
                 if not existing_edu:
-                    # Add new education entry
-                    await profile_service.create_education(current_user, edu_data)
-                    changes_summary["education"]["added"] += 1
+                    # Queue new education entry for a single insert
+                    new_education.append(EducationCreate(**edu_data))
                 else:
                     # Update existing if parsed data has more information
                     updates = {}
@@ -247,9 +273,8 @@ async def apply_parsed_data_to_profile(
                             break
                 
                 if not existing_exp:
-                    # Add new experience entry
-                    await profile_service.create_experience(current_user, exp_data)
-                    changes_summary["experience"]["added"] += 1
+                    # Queue new experience entry for a single insert
+                    new_experience.append(ExperienceCreate(**exp_data))
                 else:
                     # Update existing if parsed data has more information
                     updates = {}
@@ -273,8 +298,7 @@ async def apply_parsed_data_to_profile(
             for skill_data in parsed_data.skills:
                 skill_name = skill_data.get('name', '').lower()
                 if skill_name and skill_name not in existing_skill_names:
-                    await profile_service.create_skill(current_user, skill_data)
-                    changes_summary["skills"]["added"] += 1
+                    new_skills.append(SkillCreate(**skill_data))
                     existing_skill_names.add(skill_name)
         
         # 6. Merge Certifications
@@ -286,10 +310,21 @@ async def apply_parsed_data_to_profile(
             for cert_data in parsed_data.certifications:
                 cert_name = cert_data.get('name', '').lower()
                 if cert_name and cert_name not in existing_cert_names:
-                    await profile_service.create_certification(current_user, cert_data)
-                    changes_summary["certifications"]["added"] += 1
+                    new_certifications.append(CertificationCreate(**cert_data))
                     existing_cert_names.add(cert_name)
         
+        # 7. Insert new entries: one bulk insert per section, run concurrently
+        created_education, created_experience, created_skills, created_certifications = await asyncio.gather(
+            profile_service.create_education_bulk(current_user, new_education),
+            profile_service.create_experience_bulk(current_user, new_experience),
+            profile_service.create_skills_bulk(current_user, new_skills),
+            profile_service.create_certifications_bulk(current_user, new_certifications)
+        )
+        changes_summary["education"]["added"] += len(created_education)
+        changes_summary["experience"]["added"] += len(created_experience)
+        changes_summary["skills"]["added"] += len(created_skills)
+        changes_summary["certifications"]["added"] += len(created_certifications)
+        
         # Mark upload as applied
         await service.mark_upload_as_applied(current_user, upload_id)
         
@@ -0,0 +1,23 @@
+"""
+Shared Redis client for caches that every worker process must agree on
+"""
+
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def get_redis():
+    """Return the shared async Redis client, or None if Redis is unavailable"""
+    global _redis_client
+    if _redis_client is None and settings.REDIS_URL:
+        try:
+            import redis.asyncio as aioredis
+            _redis_client = aioredis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+        except ImportError:
+            logger.warning("Redis not available, shared caches are disabled")
+            _redis_client = False
+    return _redis_client or None
@@ -13,8 +13,13 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "AI CV Agent"
     
-    # CORS
-    ALLOWED_ORIGINS: List[str] = ["*"]
+    # CORS: an explicit allowlist of frontend origins. The default only admits
+    # the local Next.js dev server; deployments must set ALLOWED_ORIGINS to a
+    # JSON list, e.g. ALLOWED_ORIGINS='["https://app.example.com"]'.
+    ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
+    # How long browsers may cache a preflight response. Kept short so a
+    # corrected allowlist reaches browsers quickly.
+    CORS_MAX_AGE: int = 600  # seconds
     
     # Supabase Configuration
     SUPABASE_URL: str = ""
@@ -36,6 +41,8 @@ class Settings(BaseSettings):
     # Job Processing
     MAX_CONCURRENT_JOBS: int = 5
     JOB_TIMEOUT_MINUTES: int = 10
+    # WeasyPrint processes per app worker; each app worker (one per core) has its own pool
+    PDF_RENDER_WORKERS: int = 2
     
     # Background Jobs
     ENABLE_BACKGROUND_JOBS: bool = True
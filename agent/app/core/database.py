@@ -3,33 +3,70 @@ Database connection and utilities
 """
 
 import os
+import importlib.util
 from typing import Optional
+import httpx
+from postgrest.utils import SyncClient
 from supabase import create_client, Client
 from app.core.config import settings
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Every service shares the two clients below, and their PostgREST calls run
+# concurrently in worker threads, so give them a pool wide enough to keep
+# those connections (and their TLS sessions) alive between requests
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+
+
+def _use_shared_pool(client: Client) -> Client:
+    """Swap the client's PostgREST session for a pooled keep-alive session"""
+    postgrest = client.postgrest
+    session = postgrest.session
+    postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        limits=_POOL_LIMITS,
+        http2=HTTP2_AVAILABLE,
+    )
+    session.close()
+    return client
+
 
 class Database:
     """Database connection manager"""
     
     _client: Optional[Client] = None
+    _service_client: Optional[Client] = None
     
     @classmethod
     def get_client(cls) -> Client:
         """Get Supabase client instance"""
         if cls._client is None:
-            cls._client = create_client(
+            cls._client = _use_shared_pool(create_client(
                 settings.SUPABASE_URL,
                 settings.SUPABASE_ANON_KEY
-            )
+            ))
         return cls._client
     
     @classmethod
     def get_service_client(cls) -> Client:
         """Get Supabase service client with elevated permissions"""
-        return create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_ROLE_KEY
-        )
+        if cls._service_client is None:
+            cls._service_client = _use_shared_pool(create_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_ROLE_KEY
+            ))
+        return cls._service_client
+    
+    @classmethod
+    def close(cls) -> None:
+        """Close pooled connections (called on application shutdown)"""
+        for client in (cls._client, cls._service_client):
+            if client is not None:
+                client.postgrest.session.close()
+        cls._client = None
+        cls._service_client = None
 
 
 # Convenience function
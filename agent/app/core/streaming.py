@@ -0,0 +1,29 @@
+"""
+Server-sent events helpers for streaming generated text to clients
+"""
+
+import json
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+
+
+async def _sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Wrap text chunks as SSE messages, ending with a done or error event"""
+    try:
+        async for chunk in chunks:
+            # JSON-encode so newlines in the text can't break the SSE framing
+            yield f"data: {json.dumps(chunk)}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+        return
+    
+    yield "event: done\ndata: {}\n\n"
+
+
+def sse_response(chunks: AsyncIterator[str]) -> StreamingResponse:
+    """Stream text chunks to the client as server-sent events"""
+    return StreamingResponse(
+        _sse_events(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,22 @@
+"""
+CORS middleware that leaves health probes alone
+"""
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ProbeExemptCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that passes exempt paths (health probes) straight through"""
+    
+    def __init__(self, app: ASGIApp, exempt_paths=("/health", "/api/v1/health/"), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exempt_paths = frozenset(exempt_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Probes come from load balancers, never browsers, so skip the
+        # header inspection and response wrapping entirely
+        if scope["type"] == "http" and scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
\ No newline at end of file
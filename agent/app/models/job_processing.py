@@ -13,6 +13,7 @@ class JobType(str, Enum):
     COVER_LETTER_GENERATION = "cover_letter_generation"
     JOB_ANALYSIS = "job_analysis"
     BULK_GENERATION = "bulk_generation"
+    CV_PARSE = "cv_parse"
 
 
 class JobStatus(str, Enum):
@@ -242,9 +243,14 @@ BULK_GENERATION_STEPS = [
     {"name": "notification", "order": 5, "description": "Sending notifications"}
 ]
 
+CV_PARSE_STEPS = [
+    {"name": "cv_parsing", "order": 1, "description": "Extracting data from uploaded CV"}
+]
+
 STEP_DEFINITIONS = {
     JobType.CV_GENERATION: CV_GENERATION_STEPS,
     JobType.COVER_LETTER_GENERATION: COVER_LETTER_GENERATION_STEPS,
     JobType.JOB_ANALYSIS: JOB_ANALYSIS_STEPS,
-    JobType.BULK_GENERATION: BULK_GENERATION_STEPS
+    JobType.BULK_GENERATION: BULK_GENERATION_STEPS,
+    JobType.CV_PARSE: CV_PARSE_STEPS
 }
\ No newline at end of file
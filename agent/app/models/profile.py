@@ -4,7 +4,7 @@ Profile data models
 
 from datetime import date, datetime
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 
 class PersonalInfoBase(BaseModel):
@@ -32,6 +32,14 @@ class PersonalInfoUpdate(BaseModel):
     country: Optional[str] = Field(None, max_length=100)
     postal_code: Optional[str] = Field(None, max_length=20)
 
+    @field_validator("first_name", "last_name", "email")
+    @classmethod
+    def required_fields_not_null(cls, value):
+        # These may be omitted from an update but not cleared: the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not set to null")
+        return value
+
 
 class PersonalInfo(PersonalInfoBase):
     user_id: str
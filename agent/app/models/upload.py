@@ -43,6 +43,7 @@ class Upload(UploadBase):
     status: UploadStatus = UploadStatus.PENDING
     parsed_data: Optional[ParsedData] = None
     error_message: Optional[str] = None
+    content_sha256: Optional[str] = None
     created_at: datetime
     processed_at: Optional[datetime] = None
 
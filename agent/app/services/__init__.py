@@ -2,19 +2,36 @@
 Services package
 """
 
-from .profile import ProfileService
-from .upload import UploadService
-from .storage import StorageService
-from .parser import CVParserService
-from .job_watchlist import JobWatchlistService
-from .job_crawler import JobCrawlerService
-from .job_matcher import JobMatcherService
-from .crew_agents import CrewAIService, get_crew_service
-
-# Use lazy loading to avoid import-time errors
-crew_service = get_crew_service
-from .cv_generator import CVGeneratorService, cv_generator
-from .email_service import EmailService, email_service
+import importlib
+
+# Exports are imported on first access (PEP 562) so that importing one service
+# module does not pull in every other service and its heavy SDKs (OpenAI,
+# Gemini, WeasyPrint) at startup
+_EXPORTS = {
+    "ProfileService": ".profile",
+    "UploadService": ".upload",
+    "StorageService": ".storage",
+    "CVParserService": ".parser",
+    "JobWatchlistService": ".job_watchlist",
+    "JobCrawlerService": ".job_crawler",
+    "JobMatcherService": ".job_matcher",
+    "CrewAIService": ".crew_agents",
+    "get_crew_service": ".crew_agents",
+    "CVGeneratorService": ".cv_generator",
+    "cv_generator": ".cv_generator",
+    "EmailService": ".email_service",
+    "email_service": ".email_service",
+}
+
+
+def __getattr__(name):
+    if name == "crew_service":
+        # Use lazy loading to avoid import-time errors
+        name = "get_crew_service"
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+
 
 __all__ = [
     "ProfileService", 
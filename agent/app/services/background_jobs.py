@@ -6,7 +6,7 @@ import asyncio
 import schedule
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from supabase import Client
 
 from app.core.database import Database
@@ -204,8 +204,17 @@ class BackgroundJobService:
             return await self.matcher_service.match_all_users()
 
 
-# Global instance for the background service
-background_service = BackgroundJobService()
+# Global instance for the background service, created on first use so that
+# importing this module (or printing CLI usage) does not build the clients
+_background_service: Optional[BackgroundJobService] = None
+
+
+def get_background_service() -> BackgroundJobService:
+    """Get or create the background job service"""
+    global _background_service
+    if _background_service is None:
+        _background_service = BackgroundJobService()
+    return _background_service
 
 
 def start_background_jobs():
@@ -214,7 +223,7 @@ def start_background_jobs():
     
     def run_scheduler():
         asyncio.set_event_loop(asyncio.new_event_loop())
-        background_service.start_scheduler()
+        get_background_service().start_scheduler()
     
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
     scheduler_thread.start()
@@ -223,19 +232,20 @@ def start_background_jobs():
 
 def stop_background_jobs():
     """Stop background jobs"""
-    background_service.stop_scheduler()
+    if _background_service is not None:
+        _background_service.stop_scheduler()
 
 
 # CLI commands for manual execution
 async def run_crawling_command(site_id: str = None):
     """CLI command to run crawling"""
-    result = await background_service.run_manual_crawling(site_id)
+    result = await get_background_service().run_manual_crawling(site_id)
     print(f"Crawling result: {result}")
 
 
 async def run_matching_command(user_id: str = None):
     """CLI command to run job matching"""
-    result = await background_service.run_manual_matching(user_id)
+    result = await get_background_service().run_manual_matching(user_id)
     print(f"Matching result: {result}")
 
 
@@ -255,4 +265,4 @@ if __name__ == "__main__":
             print("Usage: python background_jobs.py [crawl|match] [site_id|user_id]")
     else:
         # Start the scheduler
-        background_service.start_scheduler()
\ No newline at end of file
+        get_background_service().start_scheduler()
\ No newline at end of file
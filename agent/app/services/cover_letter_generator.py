@@ -8,7 +8,6 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from pathlib import Path
 import jinja2
-from weasyprint import HTML, CSS
 from io import BytesIO
 
 from app.services.crew_agents import crew_service
@@ -308,6 +307,9 @@ class CoverLetterGeneratorService:
     def _generate_pdf(self, html_content: str, template: CoverLetterTemplate) -> bytes:
         """Generate PDF from HTML content"""
         try:
+            # Imported on first use; WeasyPrint is slow to import
+            from weasyprint import HTML, CSS
+            
             # Load CSS if available
             css_path = self.templates_dir / template.css_file
             css_content = ""
@@ -335,6 +337,7 @@ class CoverLetterGeneratorService:
     def _generate_basic_pdf(self, html_content: str) -> bytes:
         """Generate basic PDF as fallback"""
         try:
+            from weasyprint import HTML
             html_doc = HTML(string=html_content)
             pdf_buffer = BytesIO()
             html_doc.write_pdf(pdf_buffer)
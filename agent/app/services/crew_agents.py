@@ -14,6 +14,105 @@ from app.models.profile import CompleteProfile
 from app.models.jobs import Job
 
 
+# Agent prompts are built once at import and filled with str.format()
+_AGENT_SYSTEM_PROMPT = """You are a {role}. {context}
+        
+Your task: {task}
+
+Provide a detailed, professional response that fulfills your role's expertise."""
+
+_CV_ANALYST_CONTEXT = """You are an expert CV analyst with years of experience in recruitment 
+        and talent acquisition. You understand what employers look for and how to match 
+        candidate profiles to job requirements."""
+
+_CV_ANALYST_TASK = """
+        Analyze this job posting and candidate profile:
+        
+        JOB POSTING:
+        Title: {title}
+        Company: {company}
+        Requirements: {requirements}
+        Description: {description}
+        
+        CANDIDATE PROFILE:
+        Name: {full_name}
+        Email: {email}
+        Experience: {experience}
+        Education: {education}
+        Skills: {skills}
+        
+        Provide:
+        1. Top 5 most important job requirements
+        2. How candidate matches these requirements
+        3. Keywords for ATS optimization
+        4. Which experiences to emphasize
+        5. Recommended CV structure
+        """
+
+_CV_WRITER_CONTEXT = """You are a professional CV writer who specializes in creating tailored CVs 
+        that get interviews. You know how to present information appealingly to both ATS systems 
+        and human recruiters."""
+
+_CV_WRITER_TASK = """
+            Based on this analysis: {analysis}
+            
+            Create a professional, tailored CV for {full_name} applying for 
+            {title} at {company}.
+            
+            Requirements:
+            1. Use the analysis to highlight relevant experience
+            2. Include ATS keywords identified in analysis
+            3. Professional structure with clear sections
+            4. Quantifiable achievements where possible
+            5. Tailored professional summary
+            
+            Include: Contact Info, Professional Summary, Experience, Education, Skills
+            """
+
+_COMPANY_RESEARCH_CONTEXT = """You are a company research expert who understands corporate culture 
+        and what companies look for in candidates. You analyze job postings to understand 
+        company values and ideal candidate profiles."""
+
+_COMPANY_RESEARCH_TASK = """
+        Research and analyze {company} and the {title} position:
+        
+        Company: {company}
+        Position: {title}
+        Description: {description}
+        Requirements: {requirements}
+        
+        Provide:
+        1. Company culture and values analysis
+        2. What type of candidate they want
+        3. Key selling points to emphasize
+        4. Appropriate tone and style
+        5. Specific role aspects to address
+        """
+
+_COVER_LETTER_WRITER_CONTEXT = """You are a professional cover letter writer who creates engaging, 
+        personalized letters that showcase candidates perfectly. You balance professionalism 
+        with personality to make candidates stand out."""
+
+_COVER_LETTER_WRITER_TASK = """
+            Based on this research: {research}
+            
+            Write a compelling cover letter for {full_name} applying for 
+            {title} at {company}.
+            
+            Candidate Info:
+            Experience: {experience}
+            Skills: {skills}
+            
+            Requirements:
+            1. Use research insights for tailoring
+            2. Show genuine interest in company/role
+            3. Highlight relevant experience
+            4. Demonstrate cultural fit
+            5. 300-400 words maximum
+            6. Strong opening and clear call to action
+            """
+
+
 class MultiAgentService:
     """Multi-agent service using direct AI calls for robustness"""
     
@@ -34,11 +133,7 @@ class MultiAgentService:
     async def _call_ai_agent(self, role: str, task: str, context: str = "") -> str:
         """Call an AI agent with a specific role and task"""
         
-        system_prompt = f"""You are a {role}. {context}
-        
-Your task: {task}
-
-Provide a detailed, professional response that fulfills your role's expertise."""
+        system_prompt = _AGENT_SYSTEM_PROMPT.format(role=role, context=context, task=task)
 
         try:
             if self.openai_client:
@@ -70,62 +165,33 @@ Provide a detailed, professional response that fulfills your role's expertise.""
         """Generate tailored CV using multi-agent approach"""
         
         # Agent 1: CV Analyst
-        analyst_context = """You are an expert CV analyst with years of experience in recruitment 
-        and talent acquisition. You understand what employers look for and how to match 
-        candidate profiles to job requirements."""
-        
-        analyst_task = f"""
-        Analyze this job posting and candidate profile:
-        
-        JOB POSTING:
-        Title: {job.title}
-        Company: {job.company}
-        Requirements: {job.requirements}
-        Description: {job.description}
-        
-        CANDIDATE PROFILE:
-        Name: {profile.personal_info.full_name}
-        Email: {profile.personal_info.email}
-        Experience: {self._format_experience(profile.experience)}
-        Education: {self._format_education(profile.education)}
-        Skills: {', '.join(profile.skills) if profile.skills else 'Not specified'}
-        
-        Provide:
-        1. Top 5 most important job requirements
-        2. How candidate matches these requirements
-        3. Keywords for ATS optimization
-        4. Which experiences to emphasize
-        5. Recommended CV structure
-        """
-        
-        # Agent 2: CV Writer (will use analyst's output)
-        writer_context = """You are a professional CV writer who specializes in creating tailored CVs 
-        that get interviews. You know how to present information appealingly to both ATS systems 
-        and human recruiters."""
+        analyst_task = _CV_ANALYST_TASK.format(
+            title=job.title,
+            company=job.company,
+            requirements=job.requirements,
+            description=job.description,
+            full_name=profile.personal_info.full_name,
+            email=profile.personal_info.email,
+            experience=self._format_experience(profile.experience),
+            education=self._format_education(profile.education),
+            skills=', '.join(profile.skills) if profile.skills else 'Not specified',
+        )
         
         try:
             # Run agents sequentially for true multi-agent workflow
             print("🤖 Running CV Analyst Agent...")
-            analysis = await self._call_ai_agent("CV Analysis Expert", analyst_task, analyst_context)
+            analysis = await self._call_ai_agent("CV Analysis Expert", analyst_task, _CV_ANALYST_CONTEXT)
             
             print("🤖 Running CV Writer Agent...")
-            writer_task = f"""
-            Based on this analysis: {analysis}
-            
-            Create a professional, tailored CV for {profile.personal_info.full_name} applying for 
-            {job.title} at {job.company}.
-            
-            Requirements:
-            1. Use the analysis to highlight relevant experience
-            2. Include ATS keywords identified in analysis
-            3. Professional structure with clear sections
-            4. Quantifiable achievements where possible
-            5. Tailored professional summary
-            
-            Include: Contact Info, Professional Summary, Experience, Education, Skills
-            """
+            writer_task = _CV_WRITER_TASK.format(
+                analysis=analysis,
+                full_name=profile.personal_info.full_name,
+                title=job.title,
+                company=job.company,
+            )
             
-            cv_content = await self._call_ai_agent("Professional CV Writer", writer_task, writer_context)
+            # Agent 2: CV Writer (uses the analyst's output)
+            cv_content = await self._call_ai_agent("Professional CV Writer", writer_task, _CV_WRITER_CONTEXT)
             
             return {
                 "cv_content": cv_content,
@@ -144,56 +210,29 @@ Provide a detailed, professional response that fulfills your role's expertise.""
         """Generate cover letter using multi-agent approach"""
         
         # Agent 1: Company Researcher
-        researcher_context = """You are a company research expert who understands corporate culture 
-        and what companies look for in candidates. You analyze job postings to understand 
-        company values and ideal candidate profiles."""
-        
-        researcher_task = f"""
-        Research and analyze {job.company} and the {job.title} position:
-        
-        Company: {job.company}
-        Position: {job.title}
-        Description: {job.description}
-        Requirements: {job.requirements}
-        
-        Provide:
-        1. Company culture and values analysis
-        2. What type of candidate they want
-        3. Key selling points to emphasize
-        4. Appropriate tone and style
-        5. Specific role aspects to address
-        """
-        
-        # Agent 2: Cover Letter Writer
-        writer_context = """You are a professional cover letter writer who creates engaging, 
-        personalized letters that showcase candidates perfectly. You balance professionalism 
-        with personality to make candidates stand out."""
+        researcher_task = _COMPANY_RESEARCH_TASK.format(
+            company=job.company,
+            title=job.title,
+            description=job.description,
+            requirements=job.requirements,
+        )
         
         try:
             print("🤖 Running Company Research Agent...")
-            research = await self._call_ai_agent("Company Research Specialist", researcher_task, researcher_context)
+            research = await self._call_ai_agent("Company Research Specialist", researcher_task, _COMPANY_RESEARCH_CONTEXT)
             
             print("🤖 Running Cover Letter Writer Agent...")
-            writer_task = f"""
-            Based on this research: {research}
-            
-            Write a compelling cover letter for {profile.personal_info.full_name} applying for 
-            {job.title} at {job.company}.
-            
-            Candidate Info:
-            Experience: {self._format_experience(profile.experience)}
-            Skills: {', '.join(profile.skills) if profile.skills else 'Various skills'}
-            
-            Requirements:
-            1. Use research insights for tailoring
-            2. Show genuine interest in company/role
-            3. Highlight relevant experience
-            4. Demonstrate cultural fit
-            5. 300-400 words maximum
-            6. Strong opening and clear call to action
-            """
+            writer_task = _COVER_LETTER_WRITER_TASK.format(
+                research=research,
+                full_name=profile.personal_info.full_name,
+                title=job.title,
+                company=job.company,
+                experience=self._format_experience(profile.experience),
+                skills=', '.join(profile.skills) if profile.skills else 'Various skills',
+            )
             
-            cover_letter = await self._call_ai_agent("Cover Letter Writer", writer_task, writer_context)
+            # Agent 2: Cover Letter Writer
+            cover_letter = await self._call_ai_agent("Cover Letter Writer", writer_task, _COVER_LETTER_WRITER_CONTEXT)
             
             return {
                 "cover_letter": cover_letter,
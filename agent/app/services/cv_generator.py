@@ -4,24 +4,63 @@ CV generation service with multiple templates and AI-powered content optimizatio
 
 import os
 import uuid
+import asyncio
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from pathlib import Path
 import jinja2
-from io import BytesIO
-try:
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    from app.services.pdf_generator_fallback import PDFGeneratorFallback
+# WeasyPrint is slow to import, so only check that it is installed here and
+# import it on the first PDF render. The flag is cleared if that import or
+# render fails because the native pango/cairo libraries are missing.
+WEASYPRINT_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
 
 from app.models.profile import CompleteProfile
 from app.models.jobs import Job, GeneratedCVCreate
 from app.services.crew_agents import crew_service
 from app.services.storage import StorageService
+from app.services.pdf_renderer import render_pdf
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+# Rendering is CPU-bound, so it runs in a process pool (created on first use)
+# instead of blocking the event loop. Workers are spawned rather than forked
+# from a process that already runs threads.
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Get or create the PDF rendering process pool"""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_executor
+
+
+def _discard_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next render starts a fresh one"""
+    global _pdf_executor
+    if _pdf_executor is executor:
+        _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_executor() -> None:
+    """Stop the PDF rendering workers, if they were started"""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(cancel_futures=True)
+        _pdf_executor = None
+
 
 class CVTemplate:
     """CV template configuration"""
@@ -178,7 +217,7 @@ class CVGeneratorService:
             html_content = self._render_template(template, context)
             
             # Generate PDF
-            pdf_content = self._generate_pdf(html_content, template)
+            pdf_content = await self._generate_pdf(html_content, template)
             
             # Save to storage
             storage_service = StorageService(None)  # Will be injected properly
@@ -388,8 +427,10 @@ class CVGeneratorService:
         """
         return html
     
-    def _generate_pdf(self, html_content: str, template: CVTemplate) -> bytes:
+    async def _generate_pdf(self, html_content: str, template: CVTemplate) -> bytes:
         """Generate PDF from HTML content"""
+        global WEASYPRINT_AVAILABLE
+        loop = asyncio.get_running_loop()
         try:
             if WEASYPRINT_AVAILABLE:
                 # Load CSS if available
@@ -401,31 +442,38 @@ class CVGeneratorService:
                         css_content = f.read()
                 
                 # Generate PDF with WeasyPrint
-                html_doc = HTML(string=html_content)
-                css_doc = CSS(string=css_content) if css_content else None
-                
-                pdf_buffer = BytesIO()
-                if css_doc:
-                    html_doc.write_pdf(pdf_buffer, stylesheets=[css_doc])
-                else:
-                    html_doc.write_pdf(pdf_buffer)
-                
-                return pdf_buffer.getvalue()
-            else:
-                # Use fallback PDF generator
-                return self._generate_fallback_pdf(html_content)
+                executor = _get_pdf_executor()
+                try:
+                    return await loop.run_in_executor(executor, render_pdf, html_content, css_content)
+                except BrokenProcessPool as e:
+                    # A renderer died (e.g. OOM-killed); start a new pool next time
+                    logger.error(f"PDF rendering pool broke, restarting it: {e}")
+                    _discard_pdf_executor(executor)
+                except (ImportError, OSError) as e:
+                    # Installed but unusable, typically missing pango/cairo
+                    logger.warning(f"WeasyPrint unavailable, using fallback PDF generator: {e}")
+                    WEASYPRINT_AVAILABLE = False
+            
+            # Use fallback PDF generator
+            return await asyncio.to_thread(self._generate_fallback_pdf, html_content)
             
         except Exception as e:
             # Fallback to basic PDF generation
+            logger.error(f"PDF rendering failed, using fallback PDF generator: {e}")
             try:
-                html_doc = HTML(string=html_content)
-                pdf_buffer = BytesIO()
-                html_doc.write_pdf(pdf_buffer)
-                return pdf_buffer.getvalue()
+                return await asyncio.to_thread(self._generate_fallback_pdf, html_content)
             except Exception as e:
                 # Return empty PDF as last resort
                 return b"PDF generation failed"
     
+    def _generate_fallback_pdf(self, html_content: str) -> bytes:
+        """Generate a plain-text PDF from rendered HTML with reportlab"""
+        from bs4 import BeautifulSoup
+        from app.services.pdf_generator_fallback import PDFGeneratorFallback
+        
+        text = BeautifulSoup(html_content, 'html.parser').get_text("\n")
+        return PDFGeneratorFallback().generate_text_pdf(text)
+    
     async def _save_cv_file(self, user_id: str, pdf_content: bytes, filename: str) -> tuple[str, str]:
         """Save CV file to storage and return path and URL"""
         # This would integrate with StorageService
@@ -3,27 +3,149 @@ Document vault service for managing generated files
 """
 
 import os
+import json
+import mmap
+import asyncio
+import time
 import hashlib
+import secrets
 import mimetypes
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from uuid import uuid4
 import logging
 
 from supabase import Client
+from app.core.cache import get_redis
 from app.core.config import settings
 from app.services.storage import StorageService
 
 logger = logging.getLogger(__name__)
 
+# Files up to this size are hashed from a memory map; larger ones are read in
+# fixed-size chunks so hashing never maps (or buffers) a huge file at once
+_MMAP_HASH_THRESHOLD = 64 * 1024 * 1024
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Storage deletes in flight at once when removing documents in bulk
+_STORAGE_DELETE_CONCURRENCY = 16
+
+# Short-lived read caches for vault metadata, one set per process (the service
+# itself is a process-wide singleton). Entries are keyed by the user's vault version,
+# a Redis counter that every write bumps, so a write handled by one worker
+# makes the cached reads of all workers stale. Without Redis nothing is cached.
+_VAULT_CACHE_TTL = 30  # seconds
+_VAULT_CACHE_MAX_SIZE = 4096
+_VAULT_VERSION_TTL = 24 * 60 * 60  # seconds; far longer than any cache entry
+_document_cache: "OrderedDict[Tuple[str, int, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_documents_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_folders_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+
+def _cache_get(cache: OrderedDict, key):
+    """Return a live cache entry, or None"""
+    entry = cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        cache.move_to_end(key)
+        return entry[1]
+    return None
+
+
+def _cache_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = (time.monotonic() + _VAULT_CACHE_TTL, value)
+    cache.move_to_end(key)
+    if len(cache) > _VAULT_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+
+
+def _vault_version_key(user_id: str) -> str:
+    return f"vault_version:{user_id}"
+
+
+async def _vault_version(user_id: str) -> Optional[int]:
+    """The user's current vault version, or None if reads must not be cached"""
+    redis_client = get_redis()
+    if redis_client is None:
+        return None
+    try:
+        return int(await redis_client.get(_vault_version_key(user_id)) or 0)
+    except Exception as e:
+        logger.debug(f"Vault version lookup failed: {e}")
+        return None
+
+
+async def _invalidate_documents(user_id: str) -> None:
+    """Make every worker's cached reads of the user's documents and folders stale"""
+    redis_client = get_redis()
+    if redis_client is None:
+        return
+    try:
+        key = _vault_version_key(user_id)
+        await redis_client.incr(key)
+        await redis_client.expire(key, _VAULT_VERSION_TTL)
+    except Exception as e:
+        logger.warning(f"Vault cache invalidation failed: {e}")
+
+
+# Columns returned by get_documents_columnar
+_COLUMNAR_FIELDS = ("id", "title", "document_type", "created_at")
+
+# Resolved share links are cached in Redis (when configured) so repeated opens
+# of a popular link skip the share and document lookups
+_SHARE_CACHE_TTL = 60  # seconds
+# Share access bookkeeping runs after the response; keep the tasks referenced
+_background_tasks: set = set()
+
+
+def _share_cache_key(share_token: str) -> str:
+    return f"share:{share_token}"
+
+
+def _share_index_key(document_id: str) -> str:
+    """Set of the document's share tokens that currently have a cache entry"""
+    return f"share_tokens:{document_id}"
+
+
+async def _invalidate_shares(document_ids: List[str]) -> None:
+    """Drop cached share links of documents that were changed, archived or deleted"""
+    redis_client = get_redis()
+    if redis_client is None:
+        return
+    try:
+        for document_id in document_ids:
+            index_key = _share_index_key(document_id)
+            tokens = await redis_client.smembers(index_key)
+            share_keys = [
+                _share_cache_key(token.decode() if isinstance(token, bytes) else token) for token in tokens
+            ]
+            await redis_client.delete(index_key, *share_keys)
+    except Exception as e:
+        logger.warning(f"Share cache invalidation failed: {e}")
+
+
+def _seconds_until(timestamp: str) -> float:
+    """Seconds from now until an ISO timestamp (negative once it has passed)"""
+    moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - datetime.now(timezone.utc)).total_seconds()
+
+
+def _clear_caches() -> None:
+    """Empty every vault read cache (tests use this between cases)"""
+    _document_cache.clear()
+    _documents_cache.clear()
+    _folders_cache.clear()
+
 
 class DocumentVaultService:
     """Service for managing document vault operations"""
     
     def __init__(self, db: Client):
         self.db = db
-        self.storage = StorageService()
+        self.storage = StorageService(db)
     
     async def store_document(
         self,
@@ -90,6 +212,7 @@ class DocumentVaultService:
             
             if result.data:
                 document = result.data[0]
+                await _invalidate_documents(user_id)
                 
                 # Log access
                 await self._log_access(document["id"], "create", user_id)
@@ -113,13 +236,36 @@ class DocumentVaultService:
         folder_id: Optional[str] = None,
         status: str = "active",
         limit: int = 50,
-        offset: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
         search_query: Optional[str] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        columns: str = "*",
+        offset: int = 0
     ) -> Dict[str, Any]:
-        """Get user's documents with filtering"""
+        """
+        Get a page of the user's documents with filtering, newest first.
+        `after` is the (created_at, id) of the last document on the previous
+        page; the response's next_cursor holds it when more pages follow.
+        `offset` is the deprecated way to page and is ignored with `after`.
+        total_count is only computed for offset pages (including the first);
+        cursor pages return None rather than counting past the cursor.
+        `columns` narrows the select (it must include id and created_at).
+        """
+        if after:
+            offset = 0
+        version = await _vault_version(user_id)
+        cache_key = (
+            user_id, version, document_type, folder_id, status,
+            limit, after, offset, search_query, tuple(tags or ()), columns
+        )
+        cached = _cache_get(_documents_cache, cache_key) if version is not None else None
+        if cached is not None:
+            return {**cached, "documents": list(cached["documents"])}
+        
         try:
-            query = self.db.table("document_vault_dashboard").select("*").eq("user_id", user_id)
+            # Count the filtered set only when it is not narrowed by a cursor
+            count = None if after else "exact"
+            query = self.db.table("document_vault_dashboard").select(columns, count=count).eq("user_id", user_id)
             
             # Apply filters
             if document_type:
@@ -139,34 +285,75 @@ class DocumentVaultService:
                 for tag in tags:
                     query = query.contains("tags", [tag])
             
-            # Get total count
-            count_result = query.execute()
-            total_count = len(count_result.data) if count_result.data else 0
-            
-            # Apply pagination and ordering
-            query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-            
+            # Keyset pagination on (created_at DESC, id DESC), written as raw
+            # PostgREST parameters like UploadService.get_user_uploads; the
+            # cursor filter goes under "and" so it cannot clash with a search "or"
+            if after:
+                created_at, document_id = after
+                created_at = created_at.isoformat()
+                query.params = query.params.add(
+                    "and",
+                    f'(or(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{document_id})))'
+                )
+            query.params = query.params.add("order", "created_at.desc,id.desc")
+            
+            # One extra row tells us whether another page follows
+            query = query.limit(limit + 1)
+            if offset:
+                query = query.offset(offset)
             result = query.execute()
+            documents = result.data or []
+            
+            next_cursor = None
+            if len(documents) > limit:
+                documents = documents[:limit]
+                next_cursor = {"created_at": documents[-1]["created_at"], "id": documents[-1]["id"]}
             
-            return {
+            response = {
                 "success": True,
-                "documents": result.data or [],
-                "total_count": total_count,
+                "documents": documents,
+                # The exact count comes back with the page (Content-Range)
+                "total_count": None if after else result.count or 0,
                 "limit": limit,
-                "offset": offset
+                "offset": offset,
+                "next_cursor": next_cursor
             }
+            if version is not None:
+                _cache_put(_documents_cache, cache_key, response)
+            return {**response, "documents": list(response["documents"])}
             
         except Exception as e:
             logger.error(f"Failed to get documents: {e}")
             return {"success": False, "error": str(e)}
     
+    async def get_documents_columnar(self, user_id: str, **filters) -> Dict[str, Any]:
+        """
+        Get a page of documents as one list per column rather than one dict
+        per document, selecting only the columns a document list shows.
+        Takes the same filters as get_documents.
+        """
+        result = await self.get_documents(user_id, columns=",".join(_COLUMNAR_FIELDS), **filters)
+        if not result["success"]:
+            return result
+        
+        rows = result.pop("documents")
+        return {**result, "columns": {field: [row.get(field) for row in rows] for field in _COLUMNAR_FIELDS}}
+    
     async def get_document(self, document_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get specific document"""
         try:
-            result = self.db.table("document_vault").select("*").eq("id", document_id).eq("user_id", user_id).execute()
+            version = await _vault_version(user_id)
+            cache_key = (user_id, version, document_id)
+            document = _cache_get(_document_cache, cache_key) if version is not None else None
+            if document is None:
+                result = self.db.table("document_vault").select("*").eq("id", document_id).eq("user_id", user_id).execute()
+                if result.data:
+                    document = result.data[0]
+                    if version is not None:
+                        _cache_put(_document_cache, cache_key, document)
             
-            if result.data:
-                document = result.data[0]
+            if document is not None:
+                document = dict(document)
                 
                 # Log access
                 await self._log_access(document_id, "view", user_id)
@@ -196,6 +383,9 @@ class DocumentVaultService:
             updates["updated_at"] = datetime.utcnow().isoformat()
             result = self.db.table("document_vault").update(updates).eq("id", document_id).execute()
             
+            await _invalidate_documents(user_id)
+            await _invalidate_shares([document_id])
+            
             if result.data:
                 # Log access
                 await self._log_access(document_id, "edit", user_id)
@@ -211,39 +401,67 @@ class DocumentVaultService:
     async def delete_document(self, document_id: str, user_id: str, permanent: bool = False) -> Dict[str, Any]:
         """Delete or archive document"""
         try:
+            if permanent:
+                result = await self.delete_documents([document_id], user_id)
+                if not result["success"]:
+                    return result
+                if not result["deleted_count"]:
+                    return {"success": False, "error": "Document not found"}
+                
+                return {"success": True, "message": "Document permanently deleted"}
+            
             # Verify ownership
             existing = await self.get_document(document_id, user_id)
             if not existing:
                 return {"success": False, "error": "Document not found"}
             
-            if permanent:
-                # Delete from storage
-                if existing.get("file_path"):
-                    await self.storage.delete_file(existing["file_path"])
-                
-                # Delete from database
-                self.db.table("document_vault").delete().eq("id", document_id).execute()
-                
-                # Log access
-                await self._log_access(document_id, "delete", user_id)
-                
-                return {"success": True, "message": "Document permanently deleted"}
+            # Archive document
+            result = self.db.table("document_vault").update({
+                "status": "deleted",
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", document_id).execute()
+            await _invalidate_documents(user_id)
+            await _invalidate_shares([document_id])
+            
+            if result.data:
+                return {"success": True, "message": "Document archived"}
             else:
-                # Archive document
-                result = self.db.table("document_vault").update({
-                    "status": "deleted",
-                    "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", document_id).execute()
+                return {"success": False, "error": "Archive failed"}
                 
-                if result.data:
-                    return {"success": True, "message": "Document archived"}
-                else:
-                    return {"success": False, "error": "Archive failed"}
-                    
         except Exception as e:
             logger.error(f"Failed to delete document: {e}")
             return {"success": False, "error": str(e)}
     
+    async def delete_documents(self, document_ids: List[str], user_id: str) -> Dict[str, Any]:
+        """Permanently delete documents and their stored files"""
+        try:
+            # One RPC checks ownership, deletes the rows (shares and access
+            # logs cascade) and hands back the storage paths
+            result = self.db.rpc("delete_document_permanent", {
+                "doc_ids": document_ids,
+                "user_id": user_id
+            }).execute()
+            await _invalidate_documents(user_id)
+            await _invalidate_shares(document_ids)
+            
+            file_paths = [path for path in (result.data or []) if path]
+            slots = asyncio.Semaphore(_STORAGE_DELETE_CONCURRENCY)
+            
+            async def delete_file(path: str):
+                async with slots:
+                    return await self.storage.delete_file(user_id, path, bucket="documents")
+            
+            outcomes = await asyncio.gather(*(delete_file(path) for path in file_paths), return_exceptions=True)
+            for path, outcome in zip(file_paths, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"Failed to delete stored file {path}: {outcome}")
+            
+            return {"success": True, "deleted_count": len(result.data or [])}
+            
+        except Exception as e:
+            logger.error(f"Failed to delete documents: {e}")
+            return {"success": False, "error": str(e)}
+    
     async def create_share_link(
         self,
         document_id: str,
@@ -288,6 +506,7 @@ class DocumentVaultService:
                     "share_token": share_token,
                     "share_expires_at": expires_at.isoformat() if expires_at else None
                 }).eq("id", document_id).execute()
+                await _invalidate_documents(user_id)
                 
                 # Log access
                 await self._log_access(document_id, "share", user_id)
@@ -310,49 +529,106 @@ class DocumentVaultService:
     async def get_shared_document(self, share_token: str) -> Optional[Dict[str, Any]]:
         """Get document by share token"""
         try:
-            # Get share info
-            share_result = self.db.table("document_shares").select("*").eq("share_token", share_token).eq("is_active", True).execute()
-            
-            if not share_result.data:
-                return None
-            
-            share_info = share_result.data[0]
+            shared = await self._get_cached_share(share_token)
             
-            # Check expiry
-            if share_info.get("expires_at"):
-                expires_at = datetime.fromisoformat(share_info["expires_at"].replace('Z', '+00:00'))
-                if expires_at < datetime.utcnow():
+            if shared is None:
+                # Get share info
+                share_result = self.db.table("document_shares").select("*").eq("share_token", share_token).eq("is_active", True).execute()
+                
+                if not share_result.data:
                     return None
-            
-            # Get document
-            doc_result = self.db.table("document_vault").select("*").eq("id", share_info["document_id"]).execute()
-            
-            if doc_result.data:
-                document = doc_result.data[0]
-                document["share_permissions"] = share_info["permissions"]
                 
-                # Update access count
-                self.db.table("document_shares").update({
-                    "access_count": share_info["access_count"] + 1,
-                    "last_accessed_at": datetime.utcnow().isoformat()
-                }).eq("id", share_info["id"]).execute()
+                share_info = share_result.data[0]
                 
-                # Log access
-                await self._log_access(share_info["document_id"], "view")
+                # Get document
+                doc_result = self.db.table("document_vault").select("*").eq("id", share_info["document_id"]).execute()
                 
-                return document
+                if not doc_result.data:
+                    return None
+                
+                document = doc_result.data[0]
+                # Archived documents are no longer shared
+                if document.get("status", "active") != "active":
+                    return None
+                
+                document["share_permissions"] = share_info["permissions"]
+                shared = {
+                    "share_id": share_info["id"],
+                    "expires_at": share_info.get("expires_at"),
+                    "document": document
+                }
+                await self._cache_share(share_token, shared)
             
-            return None
+            # Check expiry
+            if shared["expires_at"] and _seconds_until(shared["expires_at"]) <= 0:
+                return None
+            
+            # Count the access and log it without holding up the response
+            task = asyncio.create_task(self._record_share_access(shared["share_id"], shared["document"]["id"]))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            
+            return dict(shared["document"])
             
         except Exception as e:
             logger.error(f"Failed to get shared document: {e}")
             return None
     
+    async def _get_cached_share(self, share_token: str) -> Optional[Dict[str, Any]]:
+        redis_client = get_redis()
+        if redis_client is None:
+            return None
+        try:
+            cached = await redis_client.get(_share_cache_key(share_token))
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.debug(f"Share cache lookup failed: {e}")
+            return None
+    
+    async def _cache_share(self, share_token: str, shared: Dict[str, Any]):
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+        
+        # Never cache a link past its expiry
+        ttl = _SHARE_CACHE_TTL
+        if shared["expires_at"]:
+            ttl = min(ttl, int(_seconds_until(shared["expires_at"])))
+        if ttl <= 0:
+            return
+        
+        try:
+            # Index the token under its document so writes to the document can drop it
+            index_key = _share_index_key(shared["document"]["id"])
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(_share_cache_key(share_token), json.dumps(shared, default=str), ex=ttl)
+                pipe.sadd(index_key, share_token)
+                pipe.expire(index_key, _SHARE_CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Share cache write failed: {e}")
+    
+    async def _record_share_access(self, share_id: str, document_id: str):
+        """Count a share link open and log the view"""
+        try:
+            await asyncio.to_thread(self.db.rpc("record_share_access", {"share_id": share_id}).execute)
+        except Exception as e:
+            logger.error(f"Failed to record share access: {e}")
+        await self._log_access(document_id, "view")
+    
     async def get_folders(self, user_id: str) -> List[Dict[str, Any]]:
         """Get user's document folders"""
+        version = await _vault_version(user_id)
+        cached = _cache_get(_folders_cache, (user_id, version)) if version is not None else None
+        if cached is not None:
+            return list(cached)
+        
         try:
             result = self.db.table("document_folders").select("*").eq("user_id", user_id).order("name").execute()
-            return result.data or []
+            folders = result.data or []
+            if version is not None:
+                _cache_put(_folders_cache, (user_id, version), folders)
+            return list(folders)
             
         except Exception as e:
             logger.error(f"Failed to get folders: {e}")
@@ -380,6 +656,7 @@ class DocumentVaultService:
             }
             
             result = self.db.table("document_folders").insert(folder_data).execute()
+            await _invalidate_documents(user_id)
             
             if result.data:
                 return {"success": True, "folder": result.data[0]}
@@ -419,6 +696,7 @@ class DocumentVaultService:
         """Create system folders for new user"""
         try:
             self.db.rpc("create_system_folders_for_user", {"user_id": user_id}).execute()
+            await _invalidate_documents(user_id)
             return {"success": True, "message": "System folders created"}
             
         except Exception as e:
@@ -428,25 +706,47 @@ class DocumentVaultService:
     def _get_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get file information"""
         path = Path(file_path)
+        size = path.stat().st_size
         
-        # Calculate file hash
-        with open(file_path, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
+        # Calculate file hash without copying the whole file into memory.
+        # SHA-256 is kept: stored file_hash values are compared for duplicates.
+        with open(file_path, 'rb', buffering=0) as f:
+            if 0 < size <= _MMAP_HASH_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    file_hash = hashlib.sha256(mapped).hexdigest()
+            else:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                digest = hashlib.sha256()
+                while chunk := f.read(_HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+                file_hash = digest.hexdigest()
         
         # Get MIME type
         mime_type, _ = mimetypes.guess_type(file_path)
         
         return {
             "name": path.name,
-            "size": path.stat().st_size,
+            "size": size,
             "hash": file_hash,
             "mime_type": mime_type or "application/octet-stream"
         }
     
+    async def find_duplicate(self, user_id: str, file_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the user's active document with this SHA-256 content hash.
+        Lets clients that hash a file locally skip uploading a duplicate;
+        store_document still checks the hash of what it receives.
+        """
+        return await self._check_duplicate(user_id, file_hash.lower())
+    
     async def _check_duplicate(self, user_id: str, file_hash: str) -> Optional[Dict[str, Any]]:
         """Check for duplicate files"""
         try:
-            result = self.db.table("document_vault").select("id, title").eq("user_id", user_id).eq("file_hash", file_hash).eq("status", "active").execute()
+            result = self.db.rpc("find_duplicate_document", {
+                "user_id": user_id,
+                "file_hash": file_hash
+            }).execute()
             
             return result.data[0] if result.data else None
             
@@ -465,9 +765,12 @@ class DocumentVaultService:
             
             folder_name = folder_mapping.get(document_type, "CVs")
             
-            result = self.db.table("document_folders").select("id").eq("user_id", user_id).eq("name", folder_name).eq("is_system_folder", True).execute()
+            result = self.db.rpc("get_system_folder_id", {
+                "user_id": user_id,
+                "folder_name": folder_name
+            }).execute()
             
-            return result.data[0]["id"] if result.data else None
+            return result.data or None
             
         except Exception:
             return None
@@ -485,11 +788,17 @@ class DocumentVaultService:
     
     def _generate_share_token(self) -> str:
         """Generate secure share token"""
-        return hashlib.sha256(str(uuid4()).encode()).hexdigest()[:32]
+        return secrets.token_hex(16)
 
 
 # Global service instance
+_document_vault_service: Optional[DocumentVaultService] = None
+
+
 def get_document_vault_service() -> DocumentVaultService:
-    from app.core.database import get_db
-    db = get_db()
-    return DocumentVaultService(db)
\ No newline at end of file
+    """Get or create the shared document vault service"""
+    global _document_vault_service
+    if _document_vault_service is None:
+        from app.core.database import get_db
+        _document_vault_service = DocumentVaultService(get_db())
+    return _document_vault_service
\ No newline at end of file
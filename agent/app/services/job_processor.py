@@ -6,8 +6,14 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
 from uuid import uuid4
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+from postgrest.types import ReturnMethod
 from supabase import Client
 
 from app.models.job_processing import (
@@ -22,6 +28,18 @@ from app.services.email_service import email_service
 
 logger = logging.getLogger(__name__)
 
+# Progress, step and log writes are buffered and written together, at most this
+# long after the first buffered write or as soon as this many logs are queued
+_WRITE_FLUSH_INTERVAL = 0.1  # seconds
+_LOG_BATCH_SIZE = 64
+
+
+def _dumps_json(data: Any) -> str:
+    """Serialize to a JSON string, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
+
 
 class JobProcessor:
     """Real-time job processing service"""
@@ -33,8 +51,18 @@ class JobProcessor:
             JobType.CV_GENERATION: self._process_cv_generation,
             JobType.COVER_LETTER_GENERATION: self._process_cover_letter_generation,
             JobType.JOB_ANALYSIS: self._process_job_analysis,
-            JobType.BULK_GENERATION: self._process_bulk_generation
+            JobType.BULK_GENERATION: self._process_bulk_generation,
+            JobType.CV_PARSE: self._process_cv_parse
         }
+        self._pending_progress: Dict[str, Dict[str, Any]] = {}
+        self._pending_steps: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._pending_logs: List[Dict[str, Any]] = []
+        # Jobs whose step-based progress still has to be recalculated after a failed flush
+        self._pending_recalculations: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # Upload service for CV_PARSE jobs, created on first use
+        self._upload_service = None
     
     async def create_job(self, job_create: JobQueueCreate) -> JobQueue:
         """Create a new job in the queue"""
@@ -55,7 +83,7 @@ class JobProcessor:
             if not result.data:
                 raise Exception("Failed to create job")
             
-            job = JobQueue(**result.data[0])
+            job = JobQueue.model_validate(result.data[0])
             
             # Create processing steps
             await self._create_job_steps(job.id, job.job_type)
@@ -67,6 +95,7 @@ class JobProcessor:
                 f"Job created: {job.job_type}",
                 {"priority": job.priority, "scheduled_at": job.scheduled_at.isoformat()}
             )
+            await self._flush_writes()
             
             return job
             
@@ -97,13 +126,13 @@ class JobProcessor:
             }).eq("id", job_id).execute()
     
     async def get_next_job(self) -> Optional[JobQueue]:
-        """Get the next job from the queue"""
+        """Claim the next job from the queue, marking it as processing"""
         try:
-            result = self.db.rpc("get_next_job_from_queue").execute()
+            result = await asyncio.to_thread(self.db.rpc("get_next_job_from_queue").execute)
             
             if result.data and len(result.data) > 0:
                 job_data = result.data[0]
-                return JobQueue(**job_data)
+                return JobQueue.model_validate(job_data)
             
             return None
             
@@ -111,6 +140,18 @@ class JobProcessor:
             logger.error(f"Failed to get next job: {e}")
             return None
     
+    async def claim_jobs(self, batch_size: int) -> List[JobQueue]:
+        """Claim up to batch_size pending jobs, marking them as processing"""
+        try:
+            result = await asyncio.to_thread(
+                self.db.rpc("claim_jobs_from_queue", {"batch_size": batch_size}).execute
+            )
+            return [JobQueue.model_validate(job_data) for job_data in result.data or []]
+            
+        except Exception as e:
+            logger.error(f"Failed to claim jobs: {e}")
+            return []
+    
     async def start_job_processing(self, job_id: str) -> bool:
         """Mark job as processing"""
         try:
@@ -127,13 +168,16 @@ class JobProcessor:
             logger.error(f"Failed to start job processing: {e}")
             return False
     
-    async def process_job(self, job: JobQueue) -> bool:
+    async def process_job(self, job: JobQueue, claimed: bool = False) -> bool:
         """Process a job with progress tracking"""
         job_id = job.id
         
         try:
-            # Start processing
-            if not await self.start_job_processing(job_id):
+            # Start processing (jobs from claim_jobs are already marked as processing)
+            if claimed:
+                self.processing_jobs[job_id] = True
+                await self._log_job_event(job_id, LogLevel.INFO, "Job processing started")
+            elif not await self.start_job_processing(job_id):
                 return False
             
             # Get job handler
@@ -161,6 +205,19 @@ class JobProcessor:
             return False
         finally:
             self.processing_jobs.pop(job_id, None)
+            await self._flush_writes()
+    
+    async def _fetch_profile_and_job(self, user_id: str, job_id: Optional[str]) -> Tuple[Any, Any]:
+        """Fetch the user's profile and (optionally) the target job concurrently"""
+        profile_query = self.db.table("profiles").select("*").eq("user_id", user_id)
+        if not job_id:
+            return await asyncio.to_thread(profile_query.execute), None
+        
+        job_query = self.db.table("jobs").select("*").eq("id", job_id)
+        return await asyncio.gather(
+            asyncio.to_thread(profile_query.execute),
+            asyncio.to_thread(job_query.execute)
+        )
     
     async def _process_cv_generation(self, job: JobQueue) -> Dict[str, Any]:
         """Process CV generation job"""
@@ -172,8 +229,10 @@ class JobProcessor:
             await self._update_step_progress(job.id, "profile_analysis", StepStatus.PROCESSING, 0)
             await self._update_job_progress(job.id, 10, "Analyzing user profile")
             
-            # Get user profile
-            profile_result = self.db.table("profiles").select("*").eq("user_id", user_id).execute()
+            # Profile and job rows are independent, so fetch them together
+            profile_result, job_result = await self._fetch_profile_and_job(
+                user_id, input_data.get("job_id")
+            )
             if not profile_result.data:
                 return {"success": False, "error": "User profile not found"}
             
@@ -185,7 +244,6 @@ class JobProcessor:
                 await self._update_step_progress(job.id, "job_analysis", StepStatus.PROCESSING, 0)
                 await self._update_job_progress(job.id, 25, "Analyzing job requirements")
                 
-                job_result = self.db.table("jobs").select("*").eq("id", input_data["job_id"]).execute()
                 if job_result.data:
                     job_data = job_result.data[0]
                 
@@ -279,8 +337,10 @@ class JobProcessor:
             await self._update_step_progress(job.id, "company_research", StepStatus.PROCESSING, 0)
             await self._update_job_progress(job.id, 10, "Researching company information")
             
-            # Get job information
-            job_result = self.db.table("jobs").select("*").eq("id", input_data["job_id"]).execute()
+            # Get job information along with the profile used in step 2
+            profile_result, job_result = await self._fetch_profile_and_job(
+                user_id, input_data["job_id"]
+            )
             if not job_result.data:
                 return {"success": False, "error": "Job not found"}
             
@@ -291,7 +351,6 @@ class JobProcessor:
             await self._update_step_progress(job.id, "profile_analysis", StepStatus.PROCESSING, 0)
             await self._update_job_progress(job.id, 25, "Analyzing user profile")
             
-            profile_result = self.db.table("profiles").select("*").eq("user_id", user_id).execute()
             if not profile_result.data:
                 return {"success": False, "error": "User profile not found"}
             
@@ -384,6 +443,38 @@ class JobProcessor:
         # Implementation for bulk generation
         return {"success": True, "output_data": {"processed": "Bulk generation completed"}}
     
+    def _get_upload_service(self):
+        """Return the upload service shared by all CV_PARSE jobs"""
+        if self._upload_service is None:
+            # Imported here: the upload service pulls in the parser and storage
+            from app.services.upload import UploadService
+            self._upload_service = UploadService(self.db)
+        return self._upload_service
+    
+    async def _process_cv_parse(self, job: JobQueue) -> Dict[str, Any]:
+        """Process parsing of an uploaded CV"""
+        try:
+            input_data = job.input_data
+            upload_id = input_data["upload_id"]
+            
+            await self._update_step_progress(job.id, "cv_parsing", StepStatus.PROCESSING, 0)
+            await self._update_job_progress(job.id, 10, "Parsing uploaded CV")
+            
+            await self._get_upload_service().parse_upload(
+                upload_id,
+                job.user_id,
+                input_data["file_path"],
+                input_data.get("content_sha256")
+            )
+            
+            await self._update_step_progress(job.id, "cv_parsing", StepStatus.COMPLETED, 100)
+            
+            return {"success": True, "output_data": {"upload_id": upload_id}}
+            
+        except Exception as e:
+            logger.error(f"CV parsing failed: {e}")
+            return {"success": False, "error": str(e)}
+    
     async def _update_job_progress(self, job_id: str, progress: int, message: str = None):
         """Update job progress"""
         update_data = {
@@ -394,7 +485,8 @@ class JobProcessor:
         if message:
             update_data["current_step"] = message
         
-        self.db.table("job_queue").update(update_data).eq("id", job_id).execute()
+        self._pending_progress.setdefault(job_id, {}).update(update_data)
+        self._schedule_flush()
         
         # Log progress update
         if message:
@@ -413,21 +505,22 @@ class JobProcessor:
         elif status in [StepStatus.COMPLETED, StepStatus.FAILED, StepStatus.SKIPPED]:
             update_data["completed_at"] = datetime.utcnow().isoformat()
         
-        self.db.table("job_processing_steps").update(update_data).eq("job_queue_id", job_id).eq("step_name", step_name).execute()
-        
-        # Update overall job progress
-        self.db.rpc("calculate_job_progress", {"job_id": job_id}).execute()
+        # Later updates to the same step merge in, keeping started_at
+        self._pending_steps.setdefault((job_id, step_name), {}).update(update_data)
+        self._schedule_flush()
     
     async def _complete_job(self, job_id: str, output_data: Dict[str, Any]):
         """Complete job processing"""
+        await self._flush_writes()
         self.db.rpc("complete_job_processing", {
             "job_id": job_id,
-            "output_data": json.dumps(output_data),
+            "output_data": _dumps_json(output_data),
             "success": True
         }).execute()
     
     async def _fail_job(self, job_id: str, error_message: str):
         """Fail job processing"""
+        await self._flush_writes()
         self.db.table("job_queue").update({
             "status": JobStatus.FAILED.value,
             "error_message": error_message,
@@ -439,8 +532,9 @@ class JobProcessor:
     
     async def _log_job_event(self, job_id: str, level: LogLevel, message: str, metadata: Dict[str, Any] = None):
         """Log job event"""
+        # The id is left to the column default; created_at stays client-side
+        # so a flushed batch keeps the order its events happened in
         log_data = {
-            "id": str(uuid4()),
             "job_queue_id": job_id,
             "log_level": level.value,
             "message": message,
@@ -448,7 +542,96 @@ class JobProcessor:
             "created_at": datetime.utcnow().isoformat()
         }
         
-        self.db.table("job_processing_logs").insert(log_data).execute()
+        self._pending_logs.append(log_data)
+        if len(self._pending_logs) >= _LOG_BATCH_SIZE:
+            await self._flush_writes()
+        else:
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Flush buffered writes shortly, unless a flush is already due"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(_WRITE_FLUSH_INTERVAL)
+        await self._flush_writes()
+    
+    def _cancel_scheduled_flush(self):
+        """Cancel a pending delayed flush; the caller is about to flush anyway"""
+        task, self._flush_task = self._flush_task, None
+        if task is not None and task is not asyncio.current_task() and not task.done():
+            task.cancel()
+    
+    async def _flush_writes(self):
+        """
+        Write buffered job progress, step updates and logs. Writes that fail
+        are put back in the buffers and retried by the next flush.
+        """
+        self._cancel_scheduled_flush()
+        async with self._flush_lock:
+            steps, self._pending_steps = self._pending_steps, {}
+            progress, self._pending_progress = self._pending_progress, {}
+            logs, self._pending_logs = self._pending_logs, []
+            recalculations, self._pending_recalculations = self._pending_recalculations, set()
+            recalculations.update(job_id for job_id, _ in steps)
+            
+            # Each write is dropped from its batch once it succeeds, so only
+            # unwritten entries are re-queued on failure
+            try:
+                # Explicit progress goes first; the step-based recalculation
+                # below then has the final word on progress_percentage
+                while progress:
+                    job_id, update_data = next(iter(progress.items()))
+                    await asyncio.to_thread(self.db.table("job_queue").update(update_data).eq("id", job_id).execute)
+                    del progress[job_id]
+                
+                while steps:
+                    (job_id, step_name), update_data = next(iter(steps.items()))
+                    await asyncio.to_thread(
+                        self.db.table("job_processing_steps").update(update_data)
+                        .eq("job_queue_id", job_id).eq("step_name", step_name).execute
+                    )
+                    del steps[(job_id, step_name)]
+                
+                # Update overall job progress once per job
+                while recalculations:
+                    job_id = next(iter(recalculations))
+                    await asyncio.to_thread(self.db.rpc("calculate_job_progress", {"job_id": job_id}).execute)
+                    recalculations.discard(job_id)
+                
+                if logs:
+                    # Nothing reads the inserted rows back, so skip echoing them
+                    await asyncio.to_thread(
+                        self.db.table("job_processing_logs").insert(logs, returning=ReturnMethod.minimal).execute
+                    )
+                    logs = []
+                    
+            except Exception as e:
+                logger.error(
+                    f"Failed to write job progress, re-queued {len(progress)} progress, {len(steps)} step, "
+                    f"{len(recalculations)} recalculation and {len(logs)} log writes: {e}"
+                )
+                self._requeue_writes(progress, steps, recalculations, logs)
+    
+    def _requeue_writes(
+        self,
+        progress: Dict[str, Dict[str, Any]],
+        steps: Dict[Tuple[str, str], Dict[str, Any]],
+        recalculations: Set[str],
+        logs: List[Dict[str, Any]]
+    ):
+        """Put unwritten entries back, under any updates buffered since the flush began"""
+        for job_id, update_data in progress.items():
+            self._pending_progress[job_id] = {**update_data, **self._pending_progress.get(job_id, {})}
+        for key, update_data in steps.items():
+            self._pending_steps[key] = {**update_data, **self._pending_steps.get(key, {})}
+        self._pending_recalculations.update(recalculations)
+        self._pending_logs[:0] = logs
+    
+    async def close(self):
+        """Write out anything still buffered; called at shutdown"""
+        await self._flush_writes()
     
     async def get_job_with_steps(self, job_id: str, user_id: str) -> Optional[JobQueueWithSteps]:
         """Get job with processing steps and logs"""
@@ -458,15 +641,15 @@ class JobProcessor:
             if not job_result.data:
                 return None
             
-            job = JobQueue(**job_result.data[0])
+            job = JobQueue.model_validate(job_result.data[0])
             
             # Get steps
             steps_result = self.db.table("job_processing_steps").select("*").eq("job_queue_id", job_id).order("step_order").execute()
-            steps = [JobProcessingStep(**step) for step in steps_result.data]
+            steps = [JobProcessingStep.model_validate(step) for step in steps_result.data]
             
             # Get logs
             logs_result = self.db.table("job_processing_logs").select("*").eq("job_queue_id", job_id).order("created_at").execute()
-            logs = [JobProcessingLog(**log) for log in logs_result.data]
+            logs = [JobProcessingLog.model_validate(log) for log in logs_result.data]
             
             return JobQueueWithSteps(**job.dict(), steps=steps, logs=logs)
             
@@ -477,37 +660,14 @@ class JobProcessor:
     async def get_dashboard_stats(self, user_id: str) -> JobDashboardStats:
         """Get dashboard statistics"""
         try:
-            # Get job counts by status
-            status_result = self.db.table("job_queue").select("status", count="exact").eq("user_id", user_id).execute()
-            
-            stats = JobDashboardStats()
-            stats.total_jobs = status_result.count or 0
-            
-            # Get detailed stats
-            detailed_result = self.db.table("job_queue_dashboard").select("*").eq("user_id", user_id).execute()
-            
-            for job in detailed_result.data:
-                if job["status"] == "pending":
-                    stats.pending_jobs += 1
-                elif job["status"] == "processing":
-                    stats.processing_jobs += 1
-                elif job["status"] == "completed":
-                    stats.completed_jobs += 1
-                elif job["status"] == "failed":
-                    stats.failed_jobs += 1
-                
-                # Track job types
-                job_type = job["job_type"]
-                stats.jobs_by_type[job_type] = stats.jobs_by_type.get(job_type, 0) + 1
+            # One RPC returns the counts and recent jobs (see migration 018_job_dashboard_stats_rpc)
+            result = await asyncio.to_thread(self.db.rpc("get_job_dashboard_stats", {"uid": user_id}).execute)
+            stats = JobDashboardStats.model_validate(result.data or {})
             
             # Calculate success rate
             if stats.total_jobs > 0:
                 stats.success_rate = stats.completed_jobs / stats.total_jobs
             
-            # Get recent jobs
-            recent_result = self.db.table("job_queue").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(5).execute()
-            stats.recent_jobs = [JobQueue(**job) for job in recent_result.data]
-            
             return stats
             
         except Exception as e:
@@ -516,4 +676,20 @@ class JobProcessor:
 
 
 # Global service instance
-job_processor = JobProcessor
\ No newline at end of file
+job_processor = JobProcessor
+_job_processor: Optional[JobProcessor] = None
+
+
+def get_job_processor() -> JobProcessor:
+    """Get or create the shared job processor"""
+    global _job_processor
+    if _job_processor is None:
+        from app.core.database import get_db
+        _job_processor = JobProcessor(get_db())
+    return _job_processor
+
+
+async def shutdown_job_processor() -> None:
+    """Flush the shared job processor's buffered writes, if it was created"""
+    if _job_processor is not None:
+        await _job_processor.close()
\ No newline at end of file
@@ -296,41 +296,6 @@ class JobWatchlistService:
     # Statistics
     async def get_job_stats(self, user_id: str) -> JobStats:
         """Get job statistics for user dashboard"""
-        stats = JobStats()
-        
-        # Watchlist stats
-        watchlist_result = self.db.table("job_sites_watchlist").select("id, is_active, last_crawled_at").eq("user_id", user_id).execute()
-        stats.total_watchlist_sites = len(watchlist_result.data)
-        stats.active_sites = len([site for site in watchlist_result.data if site["is_active"]])
-        
-        # Get last crawl time
-        if watchlist_result.data:
-            last_crawls = [site["last_crawled_at"] for site in watchlist_result.data if site["last_crawled_at"]]
-            if last_crawls:
-                stats.last_crawl = max(datetime.fromisoformat(crawl.replace('Z', '+00:00')) for crawl in last_crawls)
-        
-        # Job stats (from user's watchlist sites)
-        if watchlist_result.data:
-            site_ids = [site["id"] for site in watchlist_result.data]
-            
-            # Total jobs
-            jobs_result = self.db.table("jobs").select("id, created_at", count="exact").in_("site_id", site_ids).execute()
-            stats.total_jobs_found = jobs_result.count or 0
-            
-            # New jobs today
-            today = datetime.utcnow().date()
-            new_jobs_result = self.db.table("jobs").select("id", count="exact").in_("site_id", site_ids).gte("created_at", today.isoformat()).execute()
-            stats.new_jobs_today = new_jobs_result.count or 0
-        
-        # Suggested jobs stats
-        suggestions_result = self.db.table("suggested_jobs").select("id, is_viewed", count="exact").eq("user_id", user_id).eq("is_dismissed", False).execute()
-        stats.suggested_jobs = suggestions_result.count or 0
-        
-        unviewed_result = self.db.table("suggested_jobs").select("id", count="exact").eq("user_id", user_id).eq("is_viewed", False).eq("is_dismissed", False).execute()
-        stats.unviewed_suggestions = unviewed_result.count or 0
-        
-        # Generated CVs stats
-        cvs_result = self.db.table("generated_cvs").select("id", count="exact").eq("user_id", user_id).execute()
-        stats.generated_cvs = cvs_result.count or 0
-        
-        return stats
\ No newline at end of file
+        # One RPC computes every count (see migration 014_job_stats_rpc)
+        result = self.db.rpc("get_job_stats", {"uid": user_id}).execute()
+        return JobStats(**(result.data or {}))
\ No newline at end of file
@@ -3,63 +3,524 @@ CV parsing service for extracting structured data from PDFs
 """
 
 import re
-import io
-from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+import hashlib
+import tempfile
+import itertools
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime
-import pypdf
+import httpx
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
 from supabase import Client
 from app.models.upload import ParsedData
 from app.services.storage import StorageService
 
 
+# Downloads larger than this spill from memory to a temporary file
+_PDF_SPOOL_MAX_SIZE = 2 * 1024 * 1024
+
+# Parse results are cached per user under this folder, keyed by PDF SHA-256
+_PARSED_CACHE_FOLDER = "parsed_cache"
+
+# Patterns are compiled once at import instead of on every parse call
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+_PHONE_RES = (
+    re.compile(r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'),
+    re.compile(r'\+?([0-9]{1,4})[-.\s]?([0-9]{3,4})[-.\s]?([0-9]{3,4})[-.\s]?([0-9]{3,4})'),
+    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+)
+
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+
+_HAS_DIGIT_RE = re.compile(r'\d')
+
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+_DEGREE_RES = (
+    re.compile(r'(Bachelor|Master|PhD|Doctorate|Associate|Diploma|Certificate).*?(?:in|of)\s+([^,\n]+)', re.IGNORECASE),
+    re.compile(r'(B\.?A\.?|B\.?S\.?|M\.?A\.?|M\.?S\.?|Ph\.?D\.?|MBA)\s*(?:in|of)?\s*([^,\n]+)', re.IGNORECASE),
+    re.compile(r'(Bachelor|Master|PhD|Doctorate)\s+([^,\n]+)', re.IGNORECASE),
+)
+
+_INSTITUTION_RES = (
+    re.compile(r'(?:at|from)\s+([A-Z][^,\n]+(?:University|College|Institute|School))', re.IGNORECASE),
+    re.compile(r'([A-Z][^,\n]+(?:University|College|Institute|School))', re.IGNORECASE),
+)
+
+_TITLE_RES = (
+    re.compile(r'^([A-Z][^,\n]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead))'),
+    re.compile(r'^([A-Z][^,\n]+)\s+(?:at|@)\s+'),
+    re.compile(r'^([A-Z][A-Za-z\s]+)(?:\s*[-–]\s*|\s+at\s+)'),
+)
+
+_COMPANY_RES = (
+    re.compile(r'(?:at|@)\s+([A-Z][^,\n]+?)(?:\s*[-–]\s*|\s*,|\s*\n)'),
+    re.compile(r'([A-Z][^,\n]+(?:Inc|LLC|Corp|Company|Ltd|Limited))'),
+)
+
+# Common skill categories and keywords
+_SKILL_CATEGORIES = {
+    'Programming Languages': [
+        'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust',
+        'TypeScript', 'Swift', 'Kotlin', 'Scala', 'R', 'MATLAB'
+    ],
+    'Web Technologies': [
+        'HTML', 'CSS', 'React', 'Angular', 'Vue', 'Node.js', 'Express', 'Django',
+        'Flask', 'Spring', 'Laravel', 'Bootstrap', 'jQuery'
+    ],
+    'Databases': [
+        'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'SQLite', 'Oracle', 'SQL Server',
+        'Elasticsearch', 'Cassandra', 'DynamoDB'
+    ],
+    'Cloud & DevOps': [
+        'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git', 'CI/CD',
+        'Terraform', 'Ansible'
+    ],
+    'Data Science': [
+        'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Pandas',
+        'NumPy', 'Scikit-learn', 'Jupyter', 'Tableau', 'Power BI'
+    ]
+}
+
+_SKILL_LOOKUP = {
+    skill.lower(): (skill, category)
+    for category, skill_list in _SKILL_CATEGORIES.items()
+    for skill in skill_list
+}
+
+# One alternation over every lowercase skill, longest first, matched against
+# lowercased text. The lookahead keeps matches zero-width so overlapping
+# skills are all found in a single scan of the text.
+_SKILL_RE = re.compile(
+    r'\b(?=(' + '|'.join(re.escape(skill) for skill in sorted(_SKILL_LOOKUP, key=len, reverse=True)) + r')\b)'
+)
+
+# Common certification patterns and providers
+_CERT_PROVIDERS = {
+    # Cloud Certifications
+    'AWS': [
+        'AWS Certified Solutions Architect', 'AWS Certified Developer', 'AWS Certified SysOps Administrator',
+        'AWS Certified DevOps Engineer', 'AWS Certified Security', 'AWS Certified Data Analytics',
+        'AWS Certified Machine Learning', 'AWS Certified Database', 'AWS Cloud Practitioner'
+    ],
+    'Microsoft Azure': [
+        'Azure Fundamentals', 'Azure Administrator', 'Azure Developer', 'Azure Solutions Architect',
+        'Azure DevOps Engineer', 'Azure Security Engineer', 'Azure Data Engineer', 'Azure AI Engineer'
+    ],
+    'Google Cloud': [
+        'Google Cloud Professional', 'Google Cloud Associate', 'GCP Cloud Architect',
+        'GCP Data Engineer', 'GCP DevOps Engineer', 'GCP Security Engineer'
+    ],
+    
+    # Programming & Development
+    'Oracle': [
+        'Oracle Certified Professional', 'Oracle Certified Associate', 'Oracle Java Programmer',
+        'Oracle Database Administrator', 'OCP', 'OCA'
+    ],
+    'Microsoft': [
+        'Microsoft Certified', 'MCSA', 'MCSE', 'MCSD', 'Microsoft Azure', 'Microsoft 365'
+    ],
+    'Cisco': [
+        'CCNA', 'CCNP', 'CCIE', 'Cisco Certified', 'CCDA', 'CCDP'
+    ],
+    
+    # Project Management
+    'PMI': [
+        'PMP', 'Project Management Professional', 'CAPM', 'PMI-ACP', 'PMI-RMP', 'PMI-SP'
+    ],
+    'Scrum': [
+        'Certified Scrum Master', 'CSM', 'Certified Scrum Product Owner', 'CSPO',
+        'Professional Scrum Master', 'PSM', 'Scrum Alliance'
+    ],
+    
+    # Security
+    'Security': [
+        'CISSP', 'CISM', 'CISA', 'CompTIA Security+', 'CEH', 'Certified Ethical Hacker',
+        'GSEC', 'CISSP', 'CCSP'
+    ],
+    
+    # Data & Analytics
+    'Data Science': [
+        'Certified Analytics Professional', 'CAP', 'Tableau Certified', 'SAS Certified',
+        'Cloudera Certified', 'Databricks Certified', 'Snowflake Certified'
+    ],
+    
+    # Industry Specific
+    'Finance': [
+        'CFA', 'FRM', 'CPA', 'Chartered Financial Analyst', 'Financial Risk Manager',
+        'Certified Public Accountant'
+    ],
+    'Healthcare': [
+        'RHIA', 'RHIT', 'CCS', 'CHPS', 'HIMSS', 'Healthcare Information'
+    ]
+}
+
+_CERT_KEYS = {
+    provider: tuple((cert_name.lower(), cert_name) for cert_name in cert_list)
+    for provider, cert_list in _CERT_PROVIDERS.items()
+}
+
+_CERT_NAMES = {key for cert_keys in _CERT_KEYS.values() for key, _ in cert_keys}
+
+# Certification names match as plain substrings. The alternation reports the
+# longest name at each position, so shorter names that are a prefix of it
+# (e.g. CAP/CAPM) are added back from _CERT_PREFIXES. Like _SKILL_RE it is
+# matched against lowercased text.
+_CERT_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(name) for name in sorted(_CERT_NAMES, key=len, reverse=True)) + '))'
+)
+_CERT_PREFIXES = {
+    name: tuple(other for other in _CERT_NAMES if other != name and name.startswith(other))
+    for name in _CERT_NAMES
+}
+
+
+def _build_automaton(keys) -> "ahocorasick.Automaton":
+    """Build an Aho-Corasick automaton whose values are the matched keys"""
+    automaton = ahocorasick.Automaton()
+    for key in keys:
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+    return automaton
+
+
+# With pyahocorasick installed, keyword lookups are one pass over lowercased text
+if AHOCORASICK_AVAILABLE:
+    _SKILL_AUTOMATON = _build_automaton(_SKILL_LOOKUP)
+    _CERT_AUTOMATON = _build_automaton(_CERT_NAMES)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _at_word_boundary(text: str, index: int) -> bool:
+    """Mirror re's \\b: exactly one side of the index is a word character"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+def _find_skill_keys(text: str) -> Set[str]:
+    """Return the lowercase keys of every skill appearing as a whole word in text"""
+    haystack = text.lower()
+    if AHOCORASICK_AVAILABLE:
+        return {
+            key for end, key in _SKILL_AUTOMATON.iter(haystack)
+            if _at_word_boundary(haystack, end - len(key) + 1) and _at_word_boundary(haystack, end + 1)
+        }
+    
+    return {match.group(1) for match in _SKILL_RE.finditer(haystack)}
+
+
+def _find_cert_keys(line: str) -> Set[str]:
+    """Return the lowercase keys of every certification name contained in line"""
+    haystack = line.lower()
+    if AHOCORASICK_AVAILABLE:
+        return {key for _, key in _CERT_AUTOMATON.iter(haystack)}
+    
+    found = set()
+    for match in _CERT_RE.finditer(haystack):
+        cert_key = match.group(1)
+        found.add(cert_key)
+        found.update(_CERT_PREFIXES[cert_key])
+    return found
+
+
+# Date patterns for certification dates
+_CERT_DATE_PATTERNS = (
+    r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b',
+    r'\b\d{1,2}[/-]\d{1,2}[/-]\d{4}\b',
+    r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',
+    r'\b(19|20)\d{2}\b'
+)
+_GENERIC_CERT_DATE_RES = tuple(re.compile(pattern) for pattern in _CERT_DATE_PATTERNS)
+
+# Issue date, expiration and credential ID on a certification line, found in
+# one scan. The lookahead reports overlapping matches, so each named group
+# sees the same first match a separate search would.
+_CERT_META_RE = re.compile(
+    r'(?=(?P<month_year>\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b)'
+    r'|(?P<day_month_year>\b\d{1,2}[/-]\d{1,2}[/-]\d{4}\b)'
+    r'|(?P<year_month_day>\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b)'
+    r'|(?P<year>\b(?:19|20)\d{2}\b)'
+    r'|expires?\s*:?\s*(?P<expires>[^,\n]+)'
+    r'|valid\s+until\s*:?\s*(?P<valid_until>[^,\n]+)'
+    r'|expiration\s*:?\s*(?P<expiration>[^,\n]+)'
+    r'|(?-i:(?:ID|credential|certificate)\s*:?\s*(?P<credential>[A-Z0-9-]+)))',
+    re.IGNORECASE
+)
+_GENERIC_CREDENTIAL_RE = re.compile(r'[A-Z0-9]{6,}')
+
+# Preferred order when a line matches more than one kind
+_CERT_DATE_KINDS = ('month_year', 'day_month_year', 'year_month_day', 'year')
+_CERT_EXPIRATION_KINDS = ('expires', 'valid_until', 'expiration')
+
+
+def _scan_cert_meta(line: str) -> Dict[str, str]:
+    """Return issue_date, expiration_date and credential_id found on a certification line"""
+    found = {}
+    for match in _CERT_META_RE.finditer(line):
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+    
+    meta = {}
+    for kind in _CERT_DATE_KINDS:
+        if kind in found:
+            date_str = found[kind]
+            # For more complex date parsing, you might want to use dateutil
+            meta['issue_date'] = f"{date_str}-01-01" if _YEAR_RE.match(date_str) else date_str
+            break
+    
+    for kind in _CERT_EXPIRATION_KINDS:
+        if kind in found:
+            meta['expiration_date'] = found[kind].strip()
+            break
+    
+    if 'credential' in found:
+        meta['credential_id'] = found['credential']
+    else:
+        # Generic alphanumeric ID
+        cred_match = _GENERIC_CREDENTIAL_RE.search(line)
+        if cred_match:
+            meta['credential_id'] = cred_match.group(0)
+    
+    return meta
+
+# Additional pattern matching for generic certifications
+_GENERIC_CERT_RES = (
+    re.compile(r'Certified\s+([A-Z][A-Za-z\s]+?)(?:\s*[-–]\s*|\s*,|\s*\n)'),
+    re.compile(r'([A-Z][A-Za-z\s]+?)\s+Certification'),
+    re.compile(r'([A-Z][A-Za-z\s]+?)\s+Certificate'),
+)
+
+# Header keywords for each section the parser extracts
+_SECTION_KEYWORDS = {
+    'education': ('education', 'academic', 'qualification'),
+    'experience': ('experience', 'employment', 'work', 'career'),
+    'skills': ('skills', 'technical', 'competencies', 'technologies'),
+    'certifications': ('certifications', 'certificates', 'licenses', 'credentials'),
+    'summary': ('summary', 'objective', 'profile', 'about'),
+}
+
+# Words that mark the start of the next section when slicing one out
+_COMMON_SECTIONS = (
+    'education', 'experience', 'skills', 'projects', 'certifications',
+    'awards', 'publications', 'references', 'interests', 'hobbies'
+)
+
+
+def _detect_sections(lines_stripped: List[str], lines_lower: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Find every section's (start, end) line slice in a single walk over the lines
+    
+    A section starts after the first header-like line (short, upper or title
+    case) containing one of its keywords, and ends at the next short line
+    naming a common section that is not one of its own keywords.
+    """
+    sections: Dict[str, Tuple[int, int]] = {}
+    open_sections: Dict[str, int] = {}
+    
+    for i, line in enumerate(lines_lower):
+        # Close open sections first: a section never ends on its own header
+        if open_sections and line and len(line) < 50 and any(section in line for section in _COMMON_SECTIONS):
+            for name, start in list(open_sections.items()):
+                if not any(keyword in line for keyword in _SECTION_KEYWORDS[name]):
+                    sections[name] = (start, i)
+                    del open_sections[name]
+        
+        if len(sections) + len(open_sections) == len(_SECTION_KEYWORDS):
+            if not open_sections:
+                break
+            continue
+        
+        stripped = lines_stripped[i]
+        if len(stripped) < 50 and (stripped.isupper() or stripped.istitle()):
+            for name, keywords in _SECTION_KEYWORDS.items():
+                if name not in sections and name not in open_sections:
+                    if any(keyword in line for keyword in keywords):
+                        open_sections[name] = i + 1
+    
+    for name, start in open_sections.items():
+        sections[name] = (start, len(lines_lower))
+    
+    return sections
+
+
+@dataclass
+class CVDocument:
+    """CV text split into lines once and shared by every section parser"""
+    raw: str
+    lines: List[str]
+    lines_stripped: List[str]
+    lines_lower: List[str]
+    _sections: Optional[Dict[str, Tuple[int, int]]] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_text(cls, text: str) -> "CVDocument":
+        lines = text.split('\n')
+        lines_stripped = [line.strip() for line in lines]
+        return cls(
+            raw=text,
+            lines=lines,
+            lines_stripped=lines_stripped,
+            lines_lower=[line.lower() for line in lines_stripped]
+        )
+    
+    def section(self, name: str) -> Tuple[int, int]:
+        """Return the (start, end) line slice of a named section; (0, 0) if absent"""
+        if self._sections is None:
+            self._sections = _detect_sections(self.lines_stripped, self.lines_lower)
+        return self._sections.get(name, (0, 0))
+    
+    def text(self, start: int, end: int) -> str:
+        """Return the original text of lines[start:end]"""
+        return '\n'.join(self.lines[start:end])
+    
+    def has_text(self, start: int, end: int) -> bool:
+        """Whether text(start, end) would be non-empty, without joining the lines"""
+        return end - start > 1 or (end > start and bool(self.lines[start]))
+
+
+def _extract_text_pypdf(pdf_file: BinaryIO) -> str:
+    """Extract text with the pure-Python pypdf reader"""
+    # Imported here so processes that never read PDFs don't load pypdf
+    import pypdf
+    
+    pdf_file.seek(0)
+    pdf_reader = pypdf.PdfReader(pdf_file)
+    pages: List[str] = [page.extract_text() for page in pdf_reader.pages]
+    
+    return "\n".join(pages).strip()
+
+
+def _extract_text_native(pdf_file: BinaryIO) -> str:
+    """Extract text with the native PDFium engine"""
+    pdf_file.seek(0)
+    pdf = pdfium.PdfDocument(pdf_file)
+    try:
+        pages: List[str] = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    
+    return "\n".join(pages).strip()
+
+
+def _extract_pdf_text(pdf_file: BinaryIO) -> str:
+    """Extract text from a PDF file object; CPU-bound, so callers run it in a worker thread"""
+    if PDFIUM_AVAILABLE:
+        try:
+            return _extract_text_native(pdf_file)
+        except Exception:
+            # Fall back to pypdf for documents PDFium cannot read
+            pass
+    
+    return _extract_text_pypdf(pdf_file)
+
+
 class CVParserService:
     """Service for parsing CV content and extracting structured data"""
     
-    def __init__(self, db: Client):
+    # Shared across instances so downloads reuse keep-alive connections
+    _http_client: Optional[httpx.AsyncClient] = None
+    
+    def __init__(self, db: Client, storage_service: Optional[StorageService] = None):
         self.db = db
-        self.storage_service = StorageService(db)
+        self.storage_service = storage_service or StorageService(db)
+    
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        """Return the shared HTTP client used to download PDFs"""
+        if cls._http_client is None:
+            cls._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+        return cls._http_client
+    
+    async def _stream_pdf(self, file_path: str, user_id: str, pdf_file: BinaryIO) -> str:
+        """Download a stored PDF into pdf_file and return the SHA-256 of its content"""
+        # Get signed URL for the file
+        signed_url = await self.storage_service.get_signed_url(user_id, file_path)
+        
+        digest = hashlib.sha256()
+        async with self._get_http_client().stream("GET", signed_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                digest.update(chunk)
+                pdf_file.write(chunk)
+        
+        return digest.hexdigest()
     
     async def extract_text_from_pdf(self, file_path: str, user_id: str) -> str:
         """Extract raw text from PDF file"""
         try:
-            # Get signed URL for the file
-            signed_url = await self.storage_service.get_signed_url(user_id, file_path)
-            
-            # Download and parse PDF
-            import requests
-            response = requests.get(signed_url)
-            response.raise_for_status()
-            
-            pdf_reader = pypdf.PdfReader(io.BytesIO(response.content))
-            text = ""
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            # Stream the download into a spooled file so large PDFs never sit
+            # fully in memory, then parse in a worker thread
+            with tempfile.SpooledTemporaryFile(max_size=_PDF_SPOOL_MAX_SIZE) as pdf_file:
+                await self._stream_pdf(file_path, user_id, pdf_file)
+                return await asyncio.to_thread(_extract_pdf_text, pdf_file)
             
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
-    def parse_personal_info(self, text: str) -> Dict[str, Any]:
+    def _parsed_cache_path(self, user_id: str, content_hash: str) -> str:
+        return f"{user_id}/{_PARSED_CACHE_FOLDER}/{content_hash}.json"
+    
+    async def _load_cached_parse(self, user_id: str, content_hash: str) -> Optional[ParsedData]:
+        """Return the cached parse for this PDF content, or None on a miss"""
+        bucket = self.db.storage.from_(self.storage_service.documents_bucket)
+        try:
+            cached = await asyncio.to_thread(bucket.download, self._parsed_cache_path(user_id, content_hash))
+            return ParsedData.model_validate_json(cached)
+        except Exception:
+            return None
+    
+    async def _store_cached_parse(self, user_id: str, content_hash: str, parsed_data: ParsedData) -> None:
+        """Cache a parse result; failures only cost a re-parse next time"""
+        bucket = self.db.storage.from_(self.storage_service.documents_bucket)
+        try:
+            await asyncio.to_thread(
+                bucket.upload,
+                self._parsed_cache_path(user_id, content_hash),
+                parsed_data.model_dump_json().encode("utf-8"),
+                {"content-type": "application/json", "upsert": "true"}
+            )
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _as_document(text: Union[str, CVDocument]) -> CVDocument:
+        return text if isinstance(text, CVDocument) else CVDocument.from_text(text)
+    
+    def parse_personal_info(self, text: Union[str, CVDocument]) -> Dict[str, Any]:
         """Extract personal information from CV text"""
+        doc = self._as_document(text)
+        text = doc.raw
         personal_info = {}
         
         # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = _EMAIL_RE.findall(text)
         if emails:
             personal_info['email'] = emails[0]
         
         # Phone extraction
-        phone_patterns = [
-            r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
-            r'\+?([0-9]{1,4})[-.\s]?([0-9]{3,4})[-.\s]?([0-9]{3,4})[-.\s]?([0-9]{3,4})',
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        ]
-        
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, text)
+        for pattern in _PHONE_RES:
+            phones = pattern.findall(text)
             if phones:
                 if isinstance(phones[0], tuple):
                     personal_info['phone'] = ''.join(phones[0])
@@ -68,55 +529,34 @@ class CVParserService:
                 break
         
         # Name extraction (first few lines, excluding email/phone)
-        lines = text.split('\n')[:5]
-        for line in lines:
-            line = line.strip()
-            if line and not re.search(email_pattern, line) and not any(char.isdigit() for char in line):
-                if len(line.split()) >= 2 and len(line) < 50:
-                    name_parts = line.split()
-                    if len(name_parts) >= 2:
-                        personal_info['first_name'] = name_parts[0]
-                        personal_info['last_name'] = ' '.join(name_parts[1:])
-                        break
+        for line in itertools.islice(doc.lines_stripped, 5):
+            if line and len(line) < 50 and ('@' not in line or not _EMAIL_RE.search(line)) and _HAS_DIGIT_RE.search(line) is None:
+                name_parts = line.split()
+                if len(name_parts) >= 2:
+                    personal_info['first_name'] = name_parts[0]
+                    personal_info['last_name'] = ' '.join(name_parts[1:])
+                    break
         
         # LinkedIn URL
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin_matches = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        linkedin_matches = _LINKEDIN_RE.findall(text)
         if linkedin_matches:
             personal_info['linkedin_url'] = f"https://{linkedin_matches[0]}"
         
         return personal_info
     
-    def parse_education(self, text: str) -> List[Dict[str, Any]]:
+    def parse_education(self, text: Union[str, CVDocument]) -> List[Dict[str, Any]]:
         """Extract education information from CV text"""
+        doc = self._as_document(text)
         education = []
         
         # Look for education section
-        education_section = self._extract_section(text, ['education', 'academic', 'qualification'])
-        if not education_section:
+        start, end = doc.section('education')
+        if start == end:
             return education
         
-        # Common degree patterns
-        degree_patterns = [
-            r'(Bachelor|Master|PhD|Doctorate|Associate|Diploma|Certificate).*?(?:in|of)\s+([^,\n]+)',
-            r'(B\.?A\.?|B\.?S\.?|M\.?A\.?|M\.?S\.?|Ph\.?D\.?|MBA)\s*(?:in|of)?\s*([^,\n]+)',
-            r'(Bachelor|Master|PhD|Doctorate)\s+([^,\n]+)'
-        ]
-        
-        # Institution patterns
-        institution_patterns = [
-            r'(?:at|from)\s+([A-Z][^,\n]+(?:University|College|Institute|School))',
-            r'([A-Z][^,\n]+(?:University|College|Institute|School))'
-        ]
-        
-        # Year patterns
-        year_pattern = r'\b(19|20)\d{2}\b'
-        
-        lines = education_section.split('\n')
         current_education = {}
         
-        for line in lines:
-            line = line.strip()
+        for line in doc.lines_stripped[start:end]:
             if not line:
                 if current_education:
                     education.append(current_education)
@@ -124,24 +564,23 @@ class CVParserService:
                 continue
             
             # Check for degree
-            for pattern in degree_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
+            for pattern in _DEGREE_RES:
+                match = pattern.search(line)
                 if match:
                     current_education['degree'] = match.group(1)
                     current_education['field_of_study'] = match.group(2).strip()
                     break
             
             # Check for institution
-            for pattern in institution_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
+            for pattern in _INSTITUTION_RES:
+                match = pattern.search(line)
                 if match:
                     current_education['institution'] = match.group(1).strip()
                     break
             
             # Check for years
-            years = re.findall(year_pattern, line)
+            years = [int(match.group(0)) for match in _YEAR_RE.finditer(line)]
             if years:
-                years = [int(y) for y in years]
                 if len(years) >= 2:
                     current_education['start_date'] = f"{min(years)}-01-01"
                     current_education['end_date'] = f"{max(years)}-12-31"
@@ -153,36 +592,19 @@ class CVParserService:
         
         return education
     
-    def parse_experience(self, text: str) -> List[Dict[str, Any]]:
+    def parse_experience(self, text: Union[str, CVDocument]) -> List[Dict[str, Any]]:
         """Extract work experience from CV text"""
+        doc = self._as_document(text)
         experience = []
         
         # Look for experience section
-        experience_section = self._extract_section(text, ['experience', 'employment', 'work', 'career'])
-        if not experience_section:
+        start, end = doc.section('experience')
+        if start == end:
             return experience
         
-        # Job title patterns
-        title_patterns = [
-            r'^([A-Z][^,\n]+(?:Engineer|Developer|Manager|Analyst|Specialist|Coordinator|Director|Lead))',
-            r'^([A-Z][^,\n]+)\s+(?:at|@)\s+',
-            r'^([A-Z][A-Za-z\s]+)(?:\s*[-–]\s*|\s+at\s+)'
-        ]
-        
-        # Company patterns
-        company_patterns = [
-            r'(?:at|@)\s+([A-Z][^,\n]+?)(?:\s*[-–]\s*|\s*,|\s*\n)',
-            r'([A-Z][^,\n]+(?:Inc|LLC|Corp|Company|Ltd|Limited))'
-        ]
-        
-        # Year patterns
-        year_pattern = r'\b(19|20)\d{2}\b'
-        
-        lines = experience_section.split('\n')
         current_job = {}
         
-        for line in lines:
-            line = line.strip()
+        for line in doc.lines_stripped[start:end]:
             if not line:
                 if current_job:
                     experience.append(current_job)
@@ -190,88 +612,61 @@ class CVParserService:
                 continue
             
             # Check for job title
-            for pattern in title_patterns:
-                match = re.search(pattern, line)
+            title_matched = False
+            for pattern in _TITLE_RES:
+                match = pattern.search(line)
                 if match:
                     current_job['title'] = match.group(1).strip()
+                    title_matched = True
                     break
             
             # Check for company
-            for pattern in company_patterns:
-                match = re.search(pattern, line)
+            company_matched = False
+            for pattern in _COMPANY_RES:
+                match = pattern.search(line)
                 if match:
                     current_job['company'] = match.group(1).strip()
+                    company_matched = True
                     break
             
             # Check for years
-            years = re.findall(year_pattern, line)
+            years = [int(match.group(0)) for match in _YEAR_RE.finditer(line)]
             if years:
-                years = [int(y) for y in years]
                 if len(years) >= 2:
                     current_job['start_date'] = f"{min(years)}-01-01"
                     current_job['end_date'] = f"{max(years)}-12-31"
                 elif len(years) == 1:
                     current_job['start_date'] = f"{years[0]}-01-01"
             
-            # Collect description lines
-            if 'description' not in current_job:
-                current_job['description'] = ""
-            if not any(re.search(pattern, line) for pattern in title_patterns + company_patterns):
-                if not re.search(year_pattern, line):
-                    current_job['description'] += line + " "
+            # Collect description lines, reusing the matches found above
+            description_lines = current_job.setdefault('description', [])
+            if not (title_matched or company_matched or years):
+                description_lines.append(line)
         
         if current_job:
             experience.append(current_job)
         
-        # Clean up descriptions
+        # Join the collected description lines
         for job in experience:
             if 'description' in job:
-                job['description'] = job['description'].strip()
+                job['description'] = ' '.join(job['description'])
         
         return experience
     
-    def parse_skills(self, text: str) -> List[Dict[str, Any]]:
+    def parse_skills(self, text: Union[str, CVDocument]) -> List[Dict[str, Any]]:
         """Extract skills from CV text"""
+        doc = self._as_document(text)
         skills = []
         
         # Look for skills section
-        skills_section = self._extract_section(text, ['skills', 'technical', 'competencies', 'technologies'])
-        if not skills_section:
+        start, end = doc.section('skills')
+        if doc.has_text(start, end):
+            skills_section = doc.text(start, end)
+        else:
             # Fallback: look for common technical terms throughout the document
-            skills_section = text
-        
-        # Common skill categories and keywords
-        skill_categories = {
-            'Programming Languages': [
-                'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust',
-                'TypeScript', 'Swift', 'Kotlin', 'Scala', 'R', 'MATLAB'
-            ],
-            'Web Technologies': [
-                'HTML', 'CSS', 'React', 'Angular', 'Vue', 'Node.js', 'Express', 'Django',
-                'Flask', 'Spring', 'Laravel', 'Bootstrap', 'jQuery'
-            ],
-            'Databases': [
-                'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'SQLite', 'Oracle', 'SQL Server',
-                'Elasticsearch', 'Cassandra', 'DynamoDB'
-            ],
-            'Cloud & DevOps': [
-                'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git', 'CI/CD',
-                'Terraform', 'Ansible'
-            ],
-            'Data Science': [
-                'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Pandas',
-                'NumPy', 'Scikit-learn', 'Jupyter', 'Tableau', 'Power BI'
-            ]
-        }
-        
-        found_skills = set()
+            skills_section = doc.raw
         
-        for category, skill_list in skill_categories.items():
-            for skill in skill_list:
-                # Case-insensitive search with word boundaries
-                pattern = r'\b' + re.escape(skill) + r'\b'
-                if re.search(pattern, skills_section, re.IGNORECASE):
-                    found_skills.add((skill, category))
+        found_skills = {_SKILL_LOOKUP[key] for key in _find_skill_keys(skills_section)}
         
         # Convert to list of dictionaries
         for skill, category in found_skills:
@@ -283,255 +678,141 @@ class CVParserService:
         
         return skills
     
-    def parse_certifications(self, text: str) -> List[Dict[str, Any]]:
+    def parse_certifications(self, text: Union[str, CVDocument]) -> List[Dict[str, Any]]:
         """Extract certifications from CV text"""
+        doc = self._as_document(text)
         certifications = []
+        seen_names = set()
+        seen_keys = set()
         
         # Look for certifications section
-        cert_section = self._extract_section(text, ['certifications', 'certificates', 'licenses', 'credentials'])
-        if not cert_section:
+        start, end = doc.section('certifications')
+        if doc.has_text(start, end):
+            lines = doc.lines_stripped[start:end]
+        else:
             # Fallback: search entire document for certification patterns
-            cert_section = text
-        
-        # Common certification patterns and providers
-        cert_patterns = {
-            # Cloud Certifications
-            'AWS': [
-                'AWS Certified Solutions Architect', 'AWS Certified Developer', 'AWS Certified SysOps Administrator',
-                'AWS Certified DevOps Engineer', 'AWS Certified Security', 'AWS Certified Data Analytics',
-                'AWS Certified Machine Learning', 'AWS Certified Database', 'AWS Cloud Practitioner'
-            ],
-            'Microsoft Azure': [
-                'Azure Fundamentals', 'Azure Administrator', 'Azure Developer', 'Azure Solutions Architect',
-                'Azure DevOps Engineer', 'Azure Security Engineer', 'Azure Data Engineer', 'Azure AI Engineer'
-            ],
-            'Google Cloud': [
-                'Google Cloud Professional', 'Google Cloud Associate', 'GCP Cloud Architect',
-                'GCP Data Engineer', 'GCP DevOps Engineer', 'GCP Security Engineer'
-            ],
-            
-            # Programming & Development
-            'Oracle': [
-                'Oracle Certified Professional', 'Oracle Certified Associate', 'Oracle Java Programmer',
-                'Oracle Database Administrator', 'OCP', 'OCA'
-            ],
-            'Microsoft': [
-                'Microsoft Certified', 'MCSA', 'MCSE', 'MCSD', 'Microsoft Azure', 'Microsoft 365'
-            ],
-            'Cisco': [
-                'CCNA', 'CCNP', 'CCIE', 'Cisco Certified', 'CCDA', 'CCDP'
-            ],
-            
-            # Project Management
-            'PMI': [
-                'PMP', 'Project Management Professional', 'CAPM', 'PMI-ACP', 'PMI-RMP', 'PMI-SP'
-            ],
-            'Scrum': [
-                'Certified Scrum Master', 'CSM', 'Certified Scrum Product Owner', 'CSPO',
-                'Professional Scrum Master', 'PSM', 'Scrum Alliance'
-            ],
-            
-            # Security
-            'Security': [
-                'CISSP', 'CISM', 'CISA', 'CompTIA Security+', 'CEH', 'Certified Ethical Hacker',
-                'GSEC', 'CISSP', 'CCSP'
-            ],
-            
-            # Data & Analytics
-            'Data Science': [
-                'Certified Analytics Professional', 'CAP', 'Tableau Certified', 'SAS Certified',
-                'Cloudera Certified', 'Databricks Certified', 'Snowflake Certified'
-            ],
-            
-            # Industry Specific
-            'Finance': [
-                'CFA', 'FRM', 'CPA', 'Chartered Financial Analyst', 'Financial Risk Manager',
-                'Certified Public Accountant'
-            ],
-            'Healthcare': [
-                'RHIA', 'RHIT', 'CCS', 'CHPS', 'HIMSS', 'Healthcare Information'
-            ]
-        }
-        
-        # Date patterns for certification dates
-        date_patterns = [
-            r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b',
-            r'\b\d{1,2}[/-]\d{1,2}[/-]\d{4}\b',
-            r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',
-            r'\b(19|20)\d{2}\b'
-        ]
-        
-        # Expiration patterns
-        expiration_patterns = [
-            r'expires?\s*:?\s*([^,\n]+)',
-            r'valid\s+until\s*:?\s*([^,\n]+)',
-            r'expiration\s*:?\s*([^,\n]+)'
-        ]
-        
-        lines = cert_section.split('\n')
+            lines = doc.lines_stripped
         
         for line in lines:
-            line = line.strip()
             if not line or len(line) < 5:
                 continue
             
+            # Find every known certification name on the line in one scan
+            found_certs = _find_cert_keys(line)
+            if not found_certs:
+                continue
+            
             # Check each certification pattern
-            for provider, cert_list in cert_patterns.items():
-                for cert_name in cert_list:
-                    # Case-insensitive search for certification name
-                    if re.search(re.escape(cert_name), line, re.IGNORECASE):
+            for provider, cert_list in _CERT_KEYS.items():
+                for cert_key, cert_name in cert_list:
+                    if cert_key in found_certs:
                         certification = {
                             'name': cert_name,
                             'issuing_organization': provider,
-                            'description': line.strip()
+                            'description': line
                         }
                         
-                        # Extract issue date
-                        for date_pattern in date_patterns:
-                            date_match = re.search(date_pattern, line, re.IGNORECASE)
-                            if date_match:
-                                try:
-                                    date_str = date_match.group(0)
-                                    # Try to parse and format the date
-                                    if re.match(r'\b(19|20)\d{2}\b', date_str):
-                                        certification['issue_date'] = f"{date_str}-01-01"
-                                    else:
-                                        # For more complex date parsing, you might want to use dateutil
-                                        certification['issue_date'] = date_str
-                                except:
-                                    pass
-                                break
-                        
-                        # Extract expiration date
-                        for exp_pattern in expiration_patterns:
-                            exp_match = re.search(exp_pattern, line, re.IGNORECASE)
-                            if exp_match:
-                                certification['expiration_date'] = exp_match.group(1).strip()
-                                break
-                        
-                        # Extract credential ID if present
-                        credential_patterns = [
-                            r'(?:ID|credential|certificate)\s*:?\s*([A-Z0-9-]+)',
-                            r'([A-Z0-9]{6,})'  # Generic alphanumeric ID
-                        ]
-                        
-                        for cred_pattern in credential_patterns:
-                            cred_match = re.search(cred_pattern, line)
-                            if cred_match:
-                                certification['credential_id'] = cred_match.group(1)
-                                break
+                        # Extract issue date, expiration date and credential ID
+                        certification.update(_scan_cert_meta(line))
                         
                         # Check if we already have this certification
-                        if not any(cert['name'] == cert_name for cert in certifications):
+                        if cert_name not in seen_names:
+                            seen_names.add(cert_name)
+                            seen_keys.add(cert_name.lower())
                             certifications.append(certification)
                         break
         
         # Additional pattern matching for generic certifications
-        generic_cert_patterns = [
-            r'Certified\s+([A-Z][A-Za-z\s]+?)(?:\s*[-–]\s*|\s*,|\s*\n)',
-            r'([A-Z][A-Za-z\s]+?)\s+Certification',
-            r'([A-Z][A-Za-z\s]+?)\s+Certificate'
-        ]
-        
         for line in lines:
-            line = line.strip()
             if not line:
                 continue
                 
-            for pattern in generic_cert_patterns:
-                matches = re.findall(pattern, line)
+            for pattern in _GENERIC_CERT_RES:
+                matches = pattern.findall(line)
                 for match in matches:
                     cert_name = match.strip()
                     if len(cert_name) > 3 and len(cert_name) < 100:
                         # Check if it's not already captured
-                        if not any(cert['name'].lower() == cert_name.lower() for cert in certifications):
+                        cert_key = cert_name.lower()
+                        if cert_key not in seen_keys:
                             certification = {
                                 'name': cert_name,
                                 'issuing_organization': 'Unknown',
-                                'description': line.strip()
+                                'description': line
                             }
                             
                             # Try to extract date
-                            for date_pattern in date_patterns:
-                                date_match = re.search(date_pattern, line)
+                            for date_pattern in _GENERIC_CERT_DATE_RES:
+                                date_match = date_pattern.search(line)
                                 if date_match:
                                     certification['issue_date'] = date_match.group(0)
                                     break
                             
+                            seen_keys.add(cert_key)
                             certifications.append(certification)
         
         return certifications
     
-    def _extract_section(self, text: str, keywords: List[str]) -> str:
-        """Extract a specific section from CV text based on keywords"""
-        lines = text.split('\n')
-        section_start = -1
-        section_end = len(lines)
-        
-        # Find section start
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in keywords):
-                # Check if this looks like a section header
-                if len(line.strip()) < 50 and (line.isupper() or line.istitle()):
-                    section_start = i + 1
-                    break
-        
-        if section_start == -1:
-            return ""
-        
-        # Find section end (next section header or end of document)
-        common_sections = [
-            'education', 'experience', 'skills', 'projects', 'certifications',
-            'awards', 'publications', 'references', 'interests', 'hobbies'
-        ]
-        
-        for i in range(section_start, len(lines)):
-            line = lines[i].strip().lower()
-            if line and len(line) < 50:
-                if any(section in line for section in common_sections):
-                    if not any(keyword in line for keyword in keywords):
-                        section_end = i
-                        break
-        
-        return '\n'.join(lines[section_start:section_end])
+    def parse_text(self, raw_text: str) -> ParsedData:
+        """Extract all structured data from already-extracted CV text"""
+        # Split the text into lines once for every section parser
+        doc = CVDocument.from_text(raw_text)
+        
+        # Parse different sections
+        personal_info = self.parse_personal_info(doc)
+        education = self.parse_education(doc)
+        experience = self.parse_experience(doc)
+        skills = self.parse_skills(doc)
+        
+        # Extract profile information
+        profile = {}
+        
+        # Look for summary/objective section
+        start, end = doc.section('summary')
+        summary_section = doc.text(start, end)
+        if summary_section:
+            # Take first few sentences as summary
+            sentences = summary_section.split('.')[:3]
+            profile['summary'] = '. '.join(sentences).strip()
+            if profile['summary'] and not profile['summary'].endswith('.'):
+                profile['summary'] += '.'
+        
+        # Parse certifications
+        certifications = self.parse_certifications(doc)
+        
+        return ParsedData(
+            personal_info=personal_info if personal_info else None,
+            profile=profile if profile else None,
+            education=education if education else None,
+            experience=experience if experience else None,
+            skills=skills if skills else None,
+            certifications=certifications if certifications else None,
+            raw_text=raw_text
+        )
     
     async def parse_cv(self, file_path: str, user_id: str) -> ParsedData:
         """Parse CV and extract all structured data"""
         try:
-            # Extract raw text
-            raw_text = await self.extract_text_from_pdf(file_path, user_id)
-            
-            # Parse different sections
-            personal_info = self.parse_personal_info(raw_text)
-            education = self.parse_education(raw_text)
-            experience = self.parse_experience(raw_text)
-            skills = self.parse_skills(raw_text)
-            
-            # Extract profile information
-            profile = {}
-            
-            # Look for summary/objective section
-            summary_section = self._extract_section(raw_text, ['summary', 'objective', 'profile', 'about'])
-            if summary_section:
-                # Take first few sentences as summary
-                sentences = summary_section.split('.')[:3]
-                profile['summary'] = '. '.join(sentences).strip()
-                if profile['summary'] and not profile['summary'].endswith('.'):
-                    profile['summary'] += '.'
-            
-            # Parse certifications
-            certifications = self.parse_certifications(raw_text)
+            with tempfile.SpooledTemporaryFile(max_size=_PDF_SPOOL_MAX_SIZE) as pdf_file:
+                try:
+                    content_hash = await self._stream_pdf(file_path, user_id, pdf_file)
+                except Exception as e:
+                    raise Exception(f"Failed to extract text from PDF: {str(e)}")
+                
+                # Identical re-uploads skip extraction and parsing entirely
+                cached = await self._load_cached_parse(user_id, content_hash)
+                if cached is not None:
+                    return cached
+                
+                # Extract raw text
+                try:
+                    raw_text = await asyncio.to_thread(_extract_pdf_text, pdf_file)
+                except Exception as e:
+                    raise Exception(f"Failed to extract text from PDF: {str(e)}")
             
-            return ParsedData(
-                personal_info=personal_info if personal_info else None,
-                profile=profile if profile else None,
-                education=education if education else None,
-                experience=experience if experience else None,
-                skills=skills if skills else None,
-                certifications=certifications if certifications else None,
-                raw_text=raw_text
-            )
+            parsed_data = self.parse_text(raw_text)
+            await self._store_cached_parse(user_id, content_hash, parsed_data)
+            return parsed_data
             
         except Exception as e:
-            raise Exception(f"Failed to parse CV: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to parse CV: {str(e)}")
@@ -3,66 +3,99 @@ Fallback PDF generator using reportlab when WeasyPrint is not available
 """
 
 import io
+import functools
+import queue
 from typing import Dict, Any
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
+
+# reportlab is imported inside the functions that use it, so importing this
+# module (e.g. from cv_generator) doesn't load the reportlab stack up front
+
+# Output buffers kept for reuse across PDF generations
+_BUFFER_POOL_SIZE = 8
+_buffer_pool: "queue.LifoQueue[io.BytesIO]" = queue.LifoQueue(maxsize=_BUFFER_POOL_SIZE)
+
+
+def _acquire_buffer() -> io.BytesIO:
+    """Take an empty buffer from the pool, or a new one if the pool is empty"""
+    try:
+        return _buffer_pool.get_nowait()
+    except queue.Empty:
+        return io.BytesIO()
+
+
+def _release_buffer(buffer: io.BytesIO) -> None:
+    """Reset a buffer and return it to the pool"""
+    buffer.seek(0)
+    buffer.truncate(0)
+    try:
+        _buffer_pool.put_nowait(buffer)
+    except queue.Full:
+        pass
+
+
+@functools.cache
+def _get_styles():
+    """Build the sample stylesheet plus custom styles once per process"""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    
+    styles = getSampleStyleSheet()
+    
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=6,
+        spaceBefore=12,
+        textColor=colors.darkblue,
+        borderWidth=1,
+        borderColor=colors.darkblue,
+        borderPadding=3
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='JobTitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=3,
+        textColor=colors.black,
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='Company',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=3,
+        textColor=colors.darkgrey,
+        fontName='Helvetica-Oblique'
+    ))
+    
+    return styles
 
 
 class PDFGeneratorFallback:
     """Fallback PDF generator using reportlab"""
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=6,
-            spaceBefore=12,
-            textColor=colors.darkblue,
-            borderWidth=1,
-            borderColor=colors.darkblue,
-            borderPadding=3
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='JobTitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            spaceAfter=3,
-            textColor=colors.black,
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Company',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=3,
-            textColor=colors.darkgrey,
-            fontName='Helvetica-Oblique'
-        ))
+        self.styles = _get_styles()
     
     def generate_cv_pdf(self, cv_data: Dict[str, Any], template_name: str = "modern") -> bytes:
         """Generate CV PDF from data"""
-        buffer = io.BytesIO()
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        buffer = _acquire_buffer()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
                               topMargin=72, bottomMargin=18)
         
@@ -121,13 +154,18 @@ class PDFGeneratorFallback:
             story.append(Spacer(1, 12))
         
         # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
+        try:
+            doc.build(story)
+            return buffer.getvalue()
+        finally:
+            _release_buffer(buffer)
     
     def generate_cover_letter_pdf(self, cover_letter_data: Dict[str, Any]) -> bytes:
         """Generate cover letter PDF from data"""
-        buffer = io.BytesIO()
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        buffer = _acquire_buffer()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
                               topMargin=72, bottomMargin=18)
         
@@ -161,6 +199,30 @@ class PDFGeneratorFallback:
         story.append(Spacer(1, 12))
         story.append(Paragraph(cover_letter_data.get('applicant_name', ''), self.styles['Normal']))
         
-        doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
+        try:
+            doc.build(story)
+            return buffer.getvalue()
+        finally:
+            _release_buffer(buffer)
+    
+    def generate_text_pdf(self, text: str) -> bytes:
+        """Generate PDF from plain text, one paragraph per non-empty line"""
+        from xml.sax.saxutils import escape
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        
+        buffer = _acquire_buffer()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72,
+                              topMargin=72, bottomMargin=18)
+        
+        story = []
+        for line in text.splitlines():
+            if line.strip():
+                story.append(Paragraph(escape(line.strip()), self.styles['Normal']))
+                story.append(Spacer(1, 6))
+        
+        try:
+            doc.build(story)
+            return buffer.getvalue()
+        finally:
+            _release_buffer(buffer)
@@ -0,0 +1,22 @@
+"""
+WeasyPrint rendering entry point for the PDF worker processes
+"""
+
+from io import BytesIO
+
+# Workers are spawned, so they import this module rather than cv_generator
+# (and the AI SDKs behind it)
+
+
+def render_pdf(html_content: str, css_content: str) -> bytes:
+    """Render HTML to PDF with WeasyPrint; runs in a worker process"""
+    from weasyprint import HTML, CSS
+    
+    html_doc = HTML(string=html_content)
+    pdf_buffer = BytesIO()
+    if css_content:
+        html_doc.write_pdf(pdf_buffer, stylesheets=[CSS(string=css_content)])
+    else:
+        html_doc.write_pdf(pdf_buffer)
+    
+    return pdf_buffer.getvalue()
\ No newline at end of file
@@ -2,8 +2,12 @@
 Profile service for database operations
 """
 
+import asyncio
+import logging
 from typing import List, Optional
+from pydantic import TypeAdapter
 from supabase import Client
+from app.core.cache import get_redis
 from app.models.profile import (
     PersonalInfo,
     PersonalInfoCreate,
@@ -29,6 +33,25 @@ from app.models.profile import (
     CompleteProfile,
 )
 
+logger = logging.getLogger(__name__)
+
+# Complete profiles are cached per user in Redis, shared by every worker
+# process, for a short time. Every write through ProfileService deletes the
+# user's entry; the TTL bounds staleness from writes made elsewhere (e.g.
+# directly in the database). Without Redis nothing is cached.
+_PROFILE_CACHE_TTL = 120  # seconds
+
+# List validators run in pydantic-core rather than one model per row in Python.
+_EDUCATION_LIST = TypeAdapter(List[Education])
+_EXPERIENCE_LIST = TypeAdapter(List[Experience])
+_SKILL_LIST = TypeAdapter(List[Skill])
+_CERTIFICATION_LIST = TypeAdapter(List[Certification])
+_REFEREE_LIST = TypeAdapter(List[Referee])
+
+
+def _profile_cache_key(user_id: str) -> str:
+    return f"profile:{user_id}"
+
 
 class ProfileService:
     """Service for profile-related database operations"""
@@ -36,12 +59,17 @@ class ProfileService:
     def __init__(self, db: Client):
         self.db = db
     
+    async def _run(self, query):
+        """Execute a supabase query without blocking the event loop"""
+        return await asyncio.to_thread(query.execute)
+    
     # Personal Info methods
     async def get_personal_info(self, user_id: str) -> Optional[PersonalInfo]:
         """Get user's personal information"""
-        result = self.db.table("core.personal_info").select("*").eq("user_id", user_id).execute()
+        query = self.db.table("core.personal_info").select("*").eq("user_id", user_id)
+        result = await self._run(query)
         if result.data:
-            return PersonalInfo(**result.data[0])
+            return PersonalInfo.model_validate(result.data[0])
         return None
     
     async def create_personal_info(self, user_id: str, data: PersonalInfoCreate) -> PersonalInfo:
@@ -49,28 +77,35 @@ class ProfileService:
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.personal_info").insert(insert_data).execute()
-        return PersonalInfo(**result.data[0])
+        result = await self._run(self.db.table("core.personal_info").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return PersonalInfo.model_validate(result.data[0])
     
     async def update_personal_info(self, user_id: str, data: PersonalInfoUpdate) -> Optional[PersonalInfo]:
         """Update user's personal information"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
+            # Nothing to write; answer from the cached profile when possible
+            cached = await self._cached_complete_profile(user_id)
+            if cached and cached.personal_info:
+                return cached.personal_info
             return await self.get_personal_info(user_id)
         
         update_data["updated_at"] = "now()"
-        result = self.db.table("core.personal_info").update(update_data).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.personal_info").update(update_data).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return PersonalInfo(**result.data[0])
+            return PersonalInfo.model_validate(result.data[0])
         return None
     
     # Profile methods
     async def get_profile(self, user_id: str) -> Optional[Profile]:
         """Get user's profile"""
-        result = self.db.table("core.profiles").select("*").eq("user_id", user_id).execute()
+        query = self.db.table("core.profiles").select("*").eq("user_id", user_id)
+        result = await self._run(query)
         if result.data:
-            return Profile(**result.data[0])
+            return Profile.model_validate(result.data[0])
         return None
     
     async def create_profile(self, user_id: str, data: ProfileCreate) -> Profile:
@@ -78,194 +113,276 @@ class ProfileService:
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.profiles").insert(insert_data).execute()
-        return Profile(**result.data[0])
+        result = await self._run(self.db.table("core.profiles").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Profile.model_validate(result.data[0])
     
     async def update_profile(self, user_id: str, data: ProfileUpdate) -> Optional[Profile]:
         """Update user's profile"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
+            # Nothing to write; answer from the cached profile when possible
+            cached = await self._cached_complete_profile(user_id)
+            if cached and cached.profile:
+                return cached.profile
             return await self.get_profile(user_id)
         
         update_data["last_updated"] = "now()"
-        result = self.db.table("core.profiles").update(update_data).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.profiles").update(update_data).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Profile(**result.data[0])
+            return Profile.model_validate(result.data[0])
         return None
     
     # Education methods
     async def get_education(self, user_id: str) -> List[Education]:
         """Get user's education records"""
-        result = self.db.table("core.education").select("*").eq("user_id", user_id).order("start_date", desc=True).execute()
-        return [Education(**item) for item in result.data]
+        query = self.db.table("core.education").select("*").eq("user_id", user_id).order("start_date", desc=True)
+        result = await self._run(query)
+        return _EDUCATION_LIST.validate_python(result.data)
     
     async def create_education(self, user_id: str, data: EducationCreate) -> Education:
         """Create education record"""
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.education").insert(insert_data).execute()
-        return Education(**result.data[0])
+        result = await self._run(self.db.table("core.education").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Education.model_validate(result.data[0])
     
     async def update_education(self, user_id: str, education_id: int, data: EducationUpdate) -> Optional[Education]:
         """Update education record"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
             return None
         
-        result = self.db.table("core.education").update(update_data).eq("id", education_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.education").update(update_data).eq("id", education_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Education(**result.data[0])
+            return Education.model_validate(result.data[0])
         return None
     
     async def delete_education(self, user_id: str, education_id: int) -> bool:
         """Delete education record"""
-        result = self.db.table("core.education").delete().eq("id", education_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.education").delete().eq("id", education_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         return len(result.data) > 0
     
     # Experience methods
     async def get_experience(self, user_id: str) -> List[Experience]:
         """Get user's experience records"""
-        result = self.db.table("core.experience").select("*").eq("user_id", user_id).order("start_date", desc=True).execute()
-        return [Experience(**item) for item in result.data]
+        query = self.db.table("core.experience").select("*").eq("user_id", user_id).order("start_date", desc=True)
+        result = await self._run(query)
+        return _EXPERIENCE_LIST.validate_python(result.data)
     
     async def create_experience(self, user_id: str, data: ExperienceCreate) -> Experience:
         """Create experience record"""
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.experience").insert(insert_data).execute()
-        return Experience(**result.data[0])
+        result = await self._run(self.db.table("core.experience").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Experience.model_validate(result.data[0])
     
     async def update_experience(self, user_id: str, experience_id: int, data: ExperienceUpdate) -> Optional[Experience]:
         """Update experience record"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
             return None
         
-        result = self.db.table("core.experience").update(update_data).eq("id", experience_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.experience").update(update_data).eq("id", experience_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Experience(**result.data[0])
+            return Experience.model_validate(result.data[0])
         return None
     
     async def delete_experience(self, user_id: str, experience_id: int) -> bool:
         """Delete experience record"""
-        result = self.db.table("core.experience").delete().eq("id", experience_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.experience").delete().eq("id", experience_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         return len(result.data) > 0
     
     # Skills methods
     async def get_skills(self, user_id: str) -> List[Skill]:
         """Get user's skills"""
-        result = self.db.table("core.skills").select("*").eq("user_id", user_id).order("name").execute()
-        return [Skill(**item) for item in result.data]
+        query = self.db.table("core.skills").select("*").eq("user_id", user_id).order("name")
+        result = await self._run(query)
+        return _SKILL_LIST.validate_python(result.data)
     
     async def create_skill(self, user_id: str, data: SkillCreate) -> Skill:
         """Create skill record"""
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.skills").insert(insert_data).execute()
-        return Skill(**result.data[0])
+        result = await self._run(self.db.table("core.skills").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Skill.model_validate(result.data[0])
     
     async def update_skill(self, user_id: str, skill_id: int, data: SkillUpdate) -> Optional[Skill]:
         """Update skill record"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
             return None
         
-        result = self.db.table("core.skills").update(update_data).eq("id", skill_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.skills").update(update_data).eq("id", skill_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Skill(**result.data[0])
+            return Skill.model_validate(result.data[0])
         return None
     
     async def delete_skill(self, user_id: str, skill_id: int) -> bool:
         """Delete skill record"""
-        result = self.db.table("core.skills").delete().eq("id", skill_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.skills").delete().eq("id", skill_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         return len(result.data) > 0
     
     # Certifications methods
     async def get_certifications(self, user_id: str) -> List[Certification]:
         """Get user's certifications"""
-        result = self.db.table("core.certifications").select("*").eq("user_id", user_id).order("issue_date", desc=True).execute()
-        return [Certification(**item) for item in result.data]
+        query = self.db.table("core.certifications").select("*").eq("user_id", user_id).order("issue_date", desc=True)
+        result = await self._run(query)
+        return _CERTIFICATION_LIST.validate_python(result.data)
     
     async def create_certification(self, user_id: str, data: CertificationCreate) -> Certification:
         """Create certification record"""
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.certifications").insert(insert_data).execute()
-        return Certification(**result.data[0])
+        result = await self._run(self.db.table("core.certifications").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Certification.model_validate(result.data[0])
     
     async def update_certification(self, user_id: str, cert_id: int, data: CertificationUpdate) -> Optional[Certification]:
         """Update certification record"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
             return None
         
-        result = self.db.table("core.certifications").update(update_data).eq("id", cert_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.certifications").update(update_data).eq("id", cert_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Certification(**result.data[0])
+            return Certification.model_validate(result.data[0])
         return None
     
     async def delete_certification(self, user_id: str, cert_id: int) -> bool:
         """Delete certification record"""
-        result = self.db.table("core.certifications").delete().eq("id", cert_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.certifications").delete().eq("id", cert_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         return len(result.data) > 0
     
     # Referees methods
     async def get_referees(self, user_id: str) -> List[Referee]:
         """Get user's referees"""
-        result = self.db.table("core.referees").select("*").eq("user_id", user_id).order("name").execute()
-        return [Referee(**item) for item in result.data]
+        query = self.db.table("core.referees").select("*").eq("user_id", user_id).order("name")
+        result = await self._run(query)
+        return _REFEREE_LIST.validate_python(result.data)
     
     async def create_referee(self, user_id: str, data: RefereeCreate) -> Referee:
         """Create referee record"""
         insert_data = data.dict()
         insert_data["user_id"] = user_id
         
-        result = self.db.table("core.referees").insert(insert_data).execute()
-        return Referee(**result.data[0])
+        result = await self._run(self.db.table("core.referees").insert(insert_data))
+        await self._invalidate_complete_profile(user_id)
+        return Referee.model_validate(result.data[0])
     
     async def update_referee(self, user_id: str, referee_id: int, data: RefereeUpdate) -> Optional[Referee]:
         """Update referee record"""
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        update_data = data.model_dump(exclude_unset=True)
         if not update_data:
             return None
         
-        result = self.db.table("core.referees").update(update_data).eq("id", referee_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.referees").update(update_data).eq("id", referee_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         
         if result.data:
-            return Referee(**result.data[0])
+            return Referee.model_validate(result.data[0])
         return None
     
     async def delete_referee(self, user_id: str, referee_id: int) -> bool:
         """Delete referee record"""
-        result = self.db.table("core.referees").delete().eq("id", referee_id).eq("user_id", user_id).execute()
+        result = await self._run(self.db.table("core.referees").delete().eq("id", referee_id).eq("user_id", user_id))
+        await self._invalidate_complete_profile(user_id)
         return len(result.data) > 0
     
+    # Bulk insert methods (one INSERT for many rows, e.g. when importing a CV)
+    async def _create_many(self, table: str, user_id: str, items: list, adapter: TypeAdapter) -> list:
+        """Insert several records for a user in a single round-trip"""
+        if not items:
+            return []
+        
+        # JSON mode so dates are sent as ISO strings
+        rows = [{**item.model_dump(mode="json"), "user_id": user_id} for item in items]
+        result = await self._run(self.db.table(table).insert(rows))
+        await self._invalidate_complete_profile(user_id)
+        return adapter.validate_python(result.data)
+    
+    async def create_education_bulk(self, user_id: str, items: List[EducationCreate]) -> List[Education]:
+        """Create several education records"""
+        return await self._create_many("core.education", user_id, items, _EDUCATION_LIST)
+    
+    async def create_experience_bulk(self, user_id: str, items: List[ExperienceCreate]) -> List[Experience]:
+        """Create several experience records"""
+        return await self._create_many("core.experience", user_id, items, _EXPERIENCE_LIST)
+    
+    async def create_skills_bulk(self, user_id: str, items: List[SkillCreate]) -> List[Skill]:
+        """Create several skill records"""
+        return await self._create_many("core.skills", user_id, items, _SKILL_LIST)
+    
+    async def create_certifications_bulk(self, user_id: str, items: List[CertificationCreate]) -> List[Certification]:
+        """Create several certification records"""
+        return await self._create_many("core.certifications", user_id, items, _CERTIFICATION_LIST)
+    
+    async def create_referees_bulk(self, user_id: str, items: List[RefereeCreate]) -> List[Referee]:
+        """Create several referee records"""
+        return await self._create_many("core.referees", user_id, items, _REFEREE_LIST)
+    
     # Complete profile method
     async def get_complete_profile(self, user_id: str) -> CompleteProfile:
         """Get user's complete profile with all sections"""
-        personal_info = await self.get_personal_info(user_id)
-        profile = await self.get_profile(user_id)
-        education = await self.get_education(user_id)
-        experience = await self.get_experience(user_id)
-        skills = await self.get_skills(user_id)
-        certifications = await self.get_certifications(user_id)
-        referees = await self.get_referees(user_id)
+        cached = await self._cached_complete_profile(user_id)
+        if cached:
+            return cached
+        
+        # One RPC returns every section (see migration 008_complete_profile_rpc)
+        query = self.db.rpc("get_complete_profile", {"uid": user_id})
+        result = await self._run(query)
+        complete_profile = CompleteProfile(**(result.data or {}))
+        
+        redis_client = get_redis()
+        if redis_client is not None:
+            try:
+                await redis_client.set(
+                    _profile_cache_key(user_id), complete_profile.model_dump_json(), ex=_PROFILE_CACHE_TTL
+                )
+            except Exception as e:
+                logger.debug(f"Profile cache write failed: {e}")
         
-        return CompleteProfile(
-            personal_info=personal_info,
-            profile=profile,
-            education=education,
-            experience=experience,
-            skills=skills,
-            certifications=certifications,
-            referees=referees,
-        )
\ No newline at end of file
+        return complete_profile
+    
+    async def _cached_complete_profile(self, user_id: str) -> Optional[CompleteProfile]:
+        """Return the cached complete profile if there is one"""
+        redis_client = get_redis()
+        if redis_client is None:
+            return None
+        try:
+            cached = await redis_client.get(_profile_cache_key(user_id))
+            return CompleteProfile.model_validate_json(cached) if cached else None
+        except Exception as e:
+            logger.debug(f"Profile cache lookup failed: {e}")
+            return None
+    
+    async def _invalidate_complete_profile(self, user_id: str) -> None:
+        """Drop the cached complete profile after a write, for every process"""
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.delete(_profile_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Profile cache invalidation failed: {e}")
\ No newline at end of file
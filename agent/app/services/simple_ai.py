@@ -4,16 +4,258 @@ Lightweight alternative to CrewAI without complex orchestration
 """
 
 import json
+import time
+import hashlib
 import asyncio
-from typing import Dict, Any, List
-from datetime import datetime
-from openai import AsyncOpenAI
+import logging
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from openai import AsyncOpenAI, RateLimitError as OpenAIRateLimitError, InternalServerError
 import google.generativeai as genai
 
 from app.core.config import settings
+from app.core.exceptions import RateLimitError
 from app.models.profile import CompleteProfile
 from app.models.jobs import Job
 
+logger = logging.getLogger(__name__)
+
+
+# Prompt templates are built once at import and filled with str.format()
+_CV_SYSTEM_PROMPT = """You are an expert CV writer with years of experience in recruitment. 
+        Create professional, ATS-optimized CVs that highlight relevant experience and match job requirements."""
+
+_CV_PROMPT = """
+        Create a tailored CV for this job application:
+        
+        JOB DETAILS:
+        Title: {job_title}
+        Company: {job_company}
+        Description: {job_description}
+        Requirements: {job_requirements}
+        
+        CANDIDATE PROFILE:
+        Name: {full_name}
+        Email: {email}
+        Phone: {phone}
+        Location: {location}
+        
+        EXPERIENCE:
+        {experience_json}
+        
+        EDUCATION:
+        {education_json}
+        
+        SKILLS: {skills_str}
+        
+        Create a professional CV that:
+        1. Highlights the most relevant experience for this role
+        2. Uses keywords from the job description for ATS optimization
+        3. Shows quantifiable achievements
+        4. Is well-structured with clear sections
+        5. Matches the job requirements
+        
+        Format as a complete, professional CV ready for submission.
+        """
+
+_COVER_LETTER_SYSTEM_PROMPT = """You are a professional cover letter writer. Write compelling, 
+        personalized cover letters that get interviews."""
+
+_COVER_LETTER_PROMPT = """
+        Write a cover letter for this job application:
+        
+        JOB: {job_title} at {job_company}
+        DESCRIPTION: {job_description}
+        
+        CANDIDATE:
+        Name: {full_name}
+        Key Experience: {key_experience_json}
+        Skills: {top_skills_str}
+        
+        Write a cover letter that:
+        1. Shows genuine interest in the company and role
+        2. Highlights most relevant experience
+        3. Demonstrates enthusiasm and cultural fit
+        4. Is concise but impactful (max 400 words)
+        5. Has a strong opening and compelling closing
+        
+        Make it personal and engaging while maintaining professionalism.
+        """
+
+_MATCH_SYSTEM_PROMPT = """You are an expert recruiter and job matching specialist. 
+        Analyze candidate-job compatibility and provide actionable insights."""
+
+_MATCH_PROMPT = """
+        Analyze how well this candidate matches the job:
+        
+        JOB: {job_title} at {job_company}
+        REQUIREMENTS: {job_requirements}
+        DESCRIPTION: {job_description}
+        
+        CANDIDATE:
+        Experience: {experience_json}
+        Education: {education_json}
+        Skills: {skills_str}
+        
+        Provide analysis in JSON format, where score is an integer match
+        score from 0 (no match) to 100 (perfect match):
+        {{
+            "score": 85,
+            "matching_skills": ["skill1", "skill2"],
+            "missing_skills": ["skill3", "skill4"],
+            "recommendations": ["recommendation1", "recommendation2"],
+            "interview_likelihood": "high/medium/low",
+            "key_strengths": ["strength1", "strength2"],
+            "areas_to_improve": ["area1", "area2"]
+        }}
+        
+        Be specific and actionable in recommendations.
+        """
+
+_BATCH_MATCH_PROMPT = """
+        Analyze how well this candidate matches each of the jobs below:
+        
+        CANDIDATE:
+        Experience: {experience_json}
+        Education: {education_json}
+        Skills: {skills_str}
+        
+        JOBS:
+        {jobs_json}
+        
+        Provide one analysis per job as a JSON array, where score is an
+        integer match score from 0 (no match) to 100 (perfect match):
+        [
+            {{
+                "job_id": "the job's job_id",
+                "score": 85,
+                "matching_skills": ["skill1", "skill2"],
+                "missing_skills": ["skill3", "skill4"],
+                "recommendations": ["recommendation1", "recommendation2"],
+                "interview_likelihood": "high/medium/low",
+                "key_strengths": ["strength1", "strength2"],
+                "areas_to_improve": ["area1", "area2"]
+            }}
+        ]
+        
+        Be specific and actionable in recommendations.
+        """
+
+# Jobs analyzed per LLM call in batch_process_jobs
+_BATCH_SIZE = 5
+
+
+# Function-calling schema so OpenAI returns the match analysis as typed arguments
+_MATCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "report_match",
+        "description": "Report how well the candidate matches the job",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "score": {"type": "integer", "minimum": 0, "maximum": 100},
+                "matching_skills": {"type": "array", "items": {"type": "string"}},
+                "missing_skills": {"type": "array", "items": {"type": "string"}},
+                "recommendations": {"type": "array", "items": {"type": "string"}},
+                "interview_likelihood": {"type": "string", "enum": ["low", "medium", "high"]},
+                "key_strengths": {"type": "array", "items": {"type": "string"}},
+                "areas_to_improve": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["score", "matching_skills", "missing_skills", "recommendations"]
+        }
+    }
+}
+
+# Batch variant: one report per job, tagged with the job's id
+_BATCH_MATCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "report_matches",
+        "description": "Report how well the candidate matches each job",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "matches": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "job_id": {"type": "string"},
+                            **_MATCH_TOOL["function"]["parameters"]["properties"]
+                        },
+                        "required": ["job_id", *_MATCH_TOOL["function"]["parameters"]["required"]]
+                    }
+                }
+            },
+            "required": ["matches"]
+        }
+    }
+}
+
+# Generated results are cached in Redis by a hash of the profile and job, so a
+# profile or job edit changes the key instead of needing invalidation
+_RESULT_CACHE_TTL = 24 * 60 * 60  # seconds
+_RESULT_CACHE_PREFIX = "simple_ai"
+
+# Embedding model and cache size for the local profile/job match index
+_EMBEDDING_MODEL = "text-embedding-3-small"
+_PROFILE_INDEX_SIZE = 256
+_TOP_MATCHES = 5
+
+
+def _profile_texts(profile: CompleteProfile) -> List[str]:
+    """Collect the experience bullets and skill names that make up a profile's match index"""
+    texts = []
+    for exp in profile.experience:
+        texts.extend(achievement for achievement in exp.achievements or [] if achievement)
+        if exp.description:
+            texts.append(exp.description)
+    texts.extend(getattr(skill, "name", skill) for skill in profile.skills)
+    return texts
+
+
+def _result_cache_key(operation: str, profile: CompleteProfile, job: Job) -> str:
+    """Content-addressed cache key for an operation on a profile/job pair"""
+    payload = json.dumps(
+        {"op": operation, "profile": profile.dict(), "job": job.dict()},
+        sort_keys=True,
+        default=str
+    )
+    return f"{_RESULT_CACHE_PREFIX}:{operation}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _build_context(profile: CompleteProfile, job: Job) -> Dict[str, str]:
+    """Serialize the profile/job fields shared by all prompt templates once"""
+    return {**_build_job_context(job), **_build_profile_context(profile)}
+
+
+def _build_job_context(job: Job) -> Dict[str, str]:
+    """Job fields used by the prompt templates"""
+    return {
+        "job_title": job.title,
+        "job_company": job.company,
+        "job_description": job.description,
+        "job_requirements": job.requirements,
+    }
+
+
+def _build_profile_context(profile: CompleteProfile) -> Dict[str, str]:
+    """Serialize the profile fields used by the prompt templates"""
+    experience = [exp.dict() for exp in profile.experience]
+    
+    return {
+        "full_name": profile.personal_info.full_name,
+        "email": profile.personal_info.email,
+        "phone": profile.personal_info.phone,
+        "location": profile.personal_info.location,
+        "experience_json": json.dumps(experience, indent=2),
+        "key_experience_json": json.dumps(experience[:3], indent=2),
+        "education_json": json.dumps([edu.dict() for edu in profile.education], indent=2),
+        "skills_str": ', '.join(profile.skills),
+        "top_skills_str": ', '.join(profile.skills[:10]),
+    }
+
 
 class SimpleAIService:
     """Simple AI service using direct LLM calls"""
@@ -21,6 +263,12 @@ class SimpleAIService:
     def __init__(self):
         self.openai_client = None
         self.gemini_model = None
+        # Monotonic deadline before which OpenAI calls fail fast after a 429/5xx
+        self._cooldown_until: float = 0.0
+        # Profile embeddings keyed by a hash of the indexed texts
+        self._profile_index: Dict[str, Tuple[List[str], List[List[float]]]] = {}
+        # Redis client for the result cache, created on first use
+        self._redis = None
         
         if settings.OPENAI_API_KEY:
             self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
@@ -29,6 +277,68 @@ class SimpleAIService:
             genai.configure(api_key=settings.GOOGLE_API_KEY)
             self.gemini_model = genai.GenerativeModel('gemini-pro')
     
+    def _get_redis(self):
+        """Return the Redis client for the result cache, or None if Redis is unavailable"""
+        if self._redis is None and settings.REDIS_URL:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+            except ImportError:
+                logger.warning("Redis not available, generated results will not be cached")
+                self._redis = False
+        return self._redis or None
+    
+    async def _get_cached_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result; cache errors count as a miss"""
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return None
+        try:
+            cached = await redis_client.get(key)
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.debug(f"Result cache lookup failed: {e}")
+            return None
+    
+    async def _set_cached_result(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result in the cache; failures are ignored"""
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.setex(key, _RESULT_CACHE_TTL, json.dumps(result, default=str))
+        except Exception as e:
+            logger.debug(f"Result cache store failed: {e}")
+    
+    async def _call_openai(self, create, **kwargs):
+        """Call an OpenAI client method, backing off after rate-limit or server errors"""
+        
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            raise RateLimitError(
+                f"OpenAI is cooling down, retry in {remaining:.1f}s",
+                window=f"{remaining:.1f}s"
+            )
+        
+        try:
+            return await create(**kwargs)
+        except (OpenAIRateLimitError, InternalServerError) as e:
+            retry_after = e.response.headers.get("retry-after", "5")
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = 5.0
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            raise
+    
+    async def _create_completion(self, **kwargs):
+        """Create an OpenAI chat completion, honouring the shared cooldown"""
+        return await self._call_openai(self.openai_client.chat.completions.create, **kwargs)
+    
+    async def _create_embeddings(self, **kwargs):
+        """Create OpenAI embeddings, honouring the shared cooldown"""
+        return await self._call_openai(self.openai_client.embeddings.create, **kwargs)
+    
     async def _call_llm(self, prompt: str, system_prompt: str = "") -> str:
         """Call the available LLM with the given prompt"""
         
@@ -38,7 +348,7 @@ class SimpleAIService:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            response = await self.openai_client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-3.5-turbo",
                 messages=messages,
                 temperature=0.7,
@@ -54,143 +364,283 @@ class SimpleAIService:
         else:
             raise ValueError("No LLM API key configured")
     
-    async def generate_tailored_cv(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
-        """Generate a tailored CV"""
-        
-        system_prompt = """You are an expert CV writer with years of experience in recruitment. 
-        Create professional, ATS-optimized CVs that highlight relevant experience and match job requirements."""
+    async def _call_llm_stream(self, prompt: str, system_prompt: str = "") -> AsyncIterator[str]:
+        """Call the available LLM and yield the response text as it is generated"""
         
-        prompt = f"""
-        Create a tailored CV for this job application:
-        
-        JOB DETAILS:
-        Title: {job.title}
-        Company: {job.company}
-        Description: {job.description}
-        Requirements: {job.requirements}
-        
-        CANDIDATE PROFILE:
-        Name: {profile.personal_info.full_name}
-        Email: {profile.personal_info.email}
-        Phone: {profile.personal_info.phone}
-        Location: {profile.personal_info.location}
+        if self.openai_client:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            
+            stream = await self._create_completion(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         
-        EXPERIENCE:
-        {json.dumps([exp.dict() for exp in profile.experience], indent=2)}
+        elif self.gemini_model:
+            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+            # The Gemini client is synchronous, so pull each chunk in a worker thread
+            response = await asyncio.to_thread(self.gemini_model.generate_content, full_prompt, stream=True)
+            chunks = iter(response)
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                yield chunk.text
         
-        EDUCATION:
-        {json.dumps([edu.dict() for edu in profile.education], indent=2)}
+        else:
+            raise ValueError("No LLM API key configured")
+    
+    async def _call_openai_tool(self, prompt: str, system_prompt: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+        """Force OpenAI to answer through the given function tool and return its arguments"""
+        
+        response = await self._create_completion(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=2000,
+            tools=[tool],
+            tool_choice={"type": "function", "function": {"name": tool["function"]["name"]}}
+        )
+        return json.loads(response.choices[0].message.tool_calls[0].function.arguments)
+    
+    async def warm_profile_index(self, profile: CompleteProfile) -> Optional[Tuple[List[str], List[List[float]]]]:
+        """Embed a profile's experience bullets and skills so match scores can be computed locally"""
+        
+        texts = _profile_texts(profile)
+        if not self.openai_client or not texts:
+            return None
+        
+        key = hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+        index = self._profile_index.get(key)
+        if index is None:
+            response = await self._create_embeddings(model=_EMBEDDING_MODEL, input=texts)
+            index = (texts, [item.embedding for item in response.data])
+            if len(self._profile_index) >= _PROFILE_INDEX_SIZE:
+                self._profile_index.pop(next(iter(self._profile_index)))
+            self._profile_index[key] = index
+        return index
+    
+    async def _score_match_locally(
+        self,
+        profile: CompleteProfile,
+        job: Job,
+        index: Optional[Tuple[List[str], List[List[float]]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Score a job against the profile index by cosine similarity of embeddings"""
+        
+        if index is None:
+            index = await self.warm_profile_index(profile)
+        job_text = "\n".join(filter(None, [job.description, job.requirements]))
+        if index is None or not job_text:
+            return None
+        
+        texts, vectors = index
+        response = await self._create_embeddings(model=_EMBEDDING_MODEL, input=job_text)
+        job_vector = response.data[0].embedding
+        
+        # OpenAI embeddings are unit length, so the dot product is the cosine similarity
+        scores = [sum(a * b for a, b in zip(vector, job_vector)) for vector in vectors]
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:_TOP_MATCHES]
         
-        SKILLS: {', '.join(profile.skills)}
+        return {
+            "score": max(0, min(100, int(100 * scores[ranked[0]]))),
+            "top_matches": [texts[i] for i in ranked]
+        }
+    
+    async def generate_tailored_cv(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
+        """Generate a tailored CV"""
         
-        Create a professional CV that:
-        1. Highlights the most relevant experience for this role
-        2. Uses keywords from the job description for ATS optimization
-        3. Shows quantifiable achievements
-        4. Is well-structured with clear sections
-        5. Matches the job requirements
+        cache_key = _result_cache_key("cv", profile, job)
+        cached = await self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
         
-        Format as a complete, professional CV ready for submission.
-        """
+        prompt = _CV_PROMPT.format(**_build_context(profile, job))
         
-        cv_content = await self._call_llm(prompt, system_prompt)
+        cv_content = await self._call_llm(prompt, _CV_SYSTEM_PROMPT)
         
-        return {
+        result = {
             "cv_content": cv_content,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "method": "simple_ai"
         }
+        await self._set_cached_result(cache_key, result)
+        return result
     
-    async def generate_cover_letter(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
-        """Generate a personalized cover letter"""
-        
-        system_prompt = """You are a professional cover letter writer. Write compelling, 
-        personalized cover letters that get interviews."""
+    async def stream_tailored_cv(self, profile: CompleteProfile, job: Job) -> AsyncIterator[str]:
+        """Stream a tailored CV as it is generated"""
         
-        prompt = f"""
-        Write a cover letter for this job application:
-        
-        JOB: {job.title} at {job.company}
-        DESCRIPTION: {job.description}
+        prompt = _CV_PROMPT.format(**_build_context(profile, job))
         
-        CANDIDATE:
-        Name: {profile.personal_info.full_name}
-        Key Experience: {json.dumps([exp.dict() for exp in profile.experience[:3]], indent=2)}
-        Skills: {', '.join(profile.skills[:10])}
+        async for text in self._call_llm_stream(prompt, _CV_SYSTEM_PROMPT):
+            yield text
+    
+    async def generate_cover_letter(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
+        """Generate a personalized cover letter"""
         
-        Write a cover letter that:
-        1. Shows genuine interest in the company and role
-        2. Highlights most relevant experience
-        3. Demonstrates enthusiasm and cultural fit
-        4. Is concise but impactful (max 400 words)
-        5. Has a strong opening and compelling closing
+        cache_key = _result_cache_key("cover_letter", profile, job)
+        cached = await self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
         
-        Make it personal and engaging while maintaining professionalism.
-        """
+        prompt = _COVER_LETTER_PROMPT.format(**_build_context(profile, job))
         
-        cover_letter = await self._call_llm(prompt, system_prompt)
+        cover_letter = await self._call_llm(prompt, _COVER_LETTER_SYSTEM_PROMPT)
         
-        return {
+        result = {
             "cover_letter": cover_letter,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "method": "simple_ai"
         }
+        await self._set_cached_result(cache_key, result)
+        return result
     
-    async def analyze_job_match(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
-        """Analyze job match compatibility"""
-        
-        system_prompt = """You are an expert recruiter and job matching specialist. 
-        Analyze candidate-job compatibility and provide actionable insights."""
+    async def stream_cover_letter(self, profile: CompleteProfile, job: Job) -> AsyncIterator[str]:
+        """Stream a personalized cover letter as it is generated"""
         
-        prompt = f"""
-        Analyze how well this candidate matches the job:
+        prompt = _COVER_LETTER_PROMPT.format(**_build_context(profile, job))
         
-        JOB: {job.title} at {job.company}
-        REQUIREMENTS: {job.requirements}
-        DESCRIPTION: {job.description}
+        async for text in self._call_llm_stream(prompt, _COVER_LETTER_SYSTEM_PROMPT):
+            yield text
+    
+    async def analyze_job_match(self, profile: CompleteProfile, job: Job) -> Dict[str, Any]:
+        """Analyze job match compatibility"""
         
-        CANDIDATE:
-        Experience: {json.dumps([exp.dict() for exp in profile.experience], indent=2)}
-        Education: {json.dumps([edu.dict() for edu in profile.education], indent=2)}
-        Skills: {', '.join(profile.skills)}
+        return await self._analyze_job_match_with_context(profile, _build_profile_context(profile), job)
+    
+    async def _analyze_job_match_with_context(
+        self,
+        profile: CompleteProfile,
+        profile_context: Dict[str, str],
+        job: Job
+    ) -> Dict[str, Any]:
+        """Analyze one job using an already-serialized profile context"""
+        
+        cache_key = _result_cache_key("match", profile, job)
+        cached = await self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+        
+        context = {**_build_job_context(job), **profile_context}
+        local_match = None
         
-        Provide analysis in JSON format:
-        {{
-            "match_score": 0.85,
-            "matching_skills": ["skill1", "skill2"],
-            "missing_skills": ["skill3", "skill4"],
-            "recommendations": ["recommendation1", "recommendation2"],
-            "interview_likelihood": "high/medium/low",
-            "key_strengths": ["strength1", "strength2"],
-            "areas_to_improve": ["area1", "area2"]
-        }}
+        if self.openai_client:
+            try:
+                local_match = await self._score_match_locally(profile, job)
+            except Exception:
+                local_match = None
         
-        Be specific and actionable in recommendations.
-        """
+        # Only the best-matching bullets are sent when the score was computed locally
+        if local_match:
+            context["experience_json"] = json.dumps(local_match["top_matches"], indent=2)
         
-        analysis_text = await self._call_llm(prompt, system_prompt)
+        prompt = _MATCH_PROMPT.format(**context)
         
-        # Try to parse JSON, fallback to text if parsing fails
-        try:
-            analysis_data = json.loads(analysis_text)
-        except json.JSONDecodeError:
-            analysis_data = {"raw_analysis": analysis_text}
+        if self.openai_client:
+            analysis_data = await self._call_openai_tool(prompt, _MATCH_SYSTEM_PROMPT, _MATCH_TOOL)
+            if local_match:
+                analysis_data.update(local_match)
+        else:
+            analysis_text = await self._call_llm(prompt, _MATCH_SYSTEM_PROMPT)
+            
+            # Try to parse JSON, fallback to text if parsing fails
+            try:
+                analysis_data = json.loads(analysis_text)
+            except json.JSONDecodeError:
+                analysis_data = {"raw_analysis": analysis_text}
         
-        return {
+        result = {
             "analysis": analysis_data,
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "method": "simple_ai"
         }
+        await self._set_cached_result(cache_key, result)
+        return result
     
-    async def batch_process_jobs(self, profile: CompleteProfile, jobs: List[Job]) -> List[Dict[str, Any]]:
-        """Process multiple jobs in parallel"""
+    async def _analyze_job_batch(self, profile_context: Dict[str, str], jobs: List[Job]) -> Dict[str, Dict[str, Any]]:
+        """Analyze several jobs in one LLM call; returns the analyses keyed by job id"""
+        
+        jobs_json = json.dumps([
+            {
+                "job_id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "requirements": job.requirements,
+                "description": job.description
+            }
+            for job in jobs
+        ], indent=2)
+        prompt = _BATCH_MATCH_PROMPT.format(jobs_json=jobs_json, **profile_context)
         
-        tasks = []
-        for job in jobs:
-            task = self.analyze_job_match(profile, job)
-            tasks.append(task)
+        if self.openai_client:
+            arguments = await self._call_openai_tool(prompt, _MATCH_SYSTEM_PROMPT, _BATCH_MATCH_TOOL)
+            matches = arguments.get("matches", [])
+        else:
+            analysis_text = await self._call_llm(prompt, _MATCH_SYSTEM_PROMPT)
+            try:
+                matches = json.loads(analysis_text)
+            except json.JSONDecodeError:
+                matches = []
+        
+        if not isinstance(matches, list):
+            return {}
+        return {
+            str(match.pop("job_id")): match
+            for match in matches
+            if isinstance(match, dict) and match.get("job_id") is not None
+        }
+    
+    async def batch_process_jobs(self, profile: CompleteProfile, jobs: List[Job]) -> List[Dict[str, Any]]:
+        """Process multiple jobs, sending the profile once per batch of jobs"""
+        
+        # One prompt per batch of jobs, batches run in parallel
+        profile_context = _build_profile_context(profile)
+        batches = [jobs[i:i + _BATCH_SIZE] for i in range(0, len(jobs), _BATCH_SIZE)]
+        analyses: Dict[str, Dict[str, Any]] = {}
+        for batch_analyses in await asyncio.gather(
+            *(self._analyze_job_batch(profile_context, batch) for batch in batches)
+        ):
+            analyses.update(batch_analyses)
+        
+        # Embed the profile once and score every job against the same index
+        local_matches: List[Any] = [None] * len(jobs)
+        index = None
+        if self.openai_client:
+            try:
+                index = await self.warm_profile_index(profile)
+            except Exception:
+                index = None
+        if index is not None:
+            local_matches = await asyncio.gather(
+                *(self._score_match_locally(profile, job, index) for job in jobs),
+                return_exceptions=True
+            )
         
-        results = await asyncio.gather(*tasks)
+        async def job_result(job: Job, local_match: Any) -> Dict[str, Any]:
+            analysis_data = analyses.get(str(job.id))
+            if analysis_data is None:
+                # The model skipped this job, so analyze it on its own
+                return await self._analyze_job_match_with_context(profile, profile_context, job)
+            
+            if isinstance(local_match, dict):
+                analysis_data.update(local_match)
+            return {
+                "analysis": analysis_data,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "method": "simple_ai"
+            }
+        
+        results = await asyncio.gather(
+            *(job_result(job, local_match) for job, local_match in zip(jobs, local_matches))
+        )
         
         # Add job info to results
         for i, result in enumerate(results):
@@ -2,13 +2,41 @@
 File storage service using Supabase Storage
 """
 
+import asyncio
+import hashlib
+import mimetypes
 import os
+import time
 import uuid
-from typing import Optional, Tuple
+from collections import OrderedDict
+from pathlib import PurePosixPath
+from typing import List, Optional, Tuple
 from supabase import Client
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
 
+# Uploads are read in chunks of this size
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Signed URLs are reused until they are this close to expiring. Several
+# services build their own StorageService, so the cache lives at module level
+# where they all share it (LRU-bounded).
+_SIGNED_URL_SAFETY_MARGIN = 60  # seconds
+_SIGNED_URL_CACHE_MAX_SIZE = 10_000
+_signed_url_cache: "OrderedDict[Tuple[str, str, int], Tuple[float, str]]" = OrderedDict()
+
+
+def _is_user_path(user_id: str, file_path: str) -> bool:
+    """Check that a storage path lies inside the user's folder, without traversal"""
+    parts = PurePosixPath(file_path).parts
+    return len(parts) > 1 and parts[0] == user_id and ".." not in parts
+
+
+def _invalidate_signed_urls(bucket: str, file_path: str) -> None:
+    """Drop cached signed URLs for a file that was deleted or moved"""
+    for key in [k for k in _signed_url_cache if k[0] == bucket and k[1] == file_path]:
+        del _signed_url_cache[key]
+
 
 class StorageService:
     """Service for file storage operations"""
@@ -18,6 +46,25 @@ class StorageService:
         self.uploads_bucket = "uploads"
         self.documents_bucket = "documents"
     
+    def _move_object(self, source_bucket: str, source_path: str, dest_bucket: str, dest_path: str) -> None:
+        """
+        Move one object; storage3 raises on failure.
+        Supabase can only move within a bucket, so moves across buckets are a
+        download, upload and remove.
+        """
+        if source_bucket == dest_bucket:
+            self.db.storage.from_(source_bucket).move(source_path, dest_path)
+            return
+        
+        content = self.db.storage.from_(source_bucket).download(source_path)
+        content_type = mimetypes.guess_type(dest_path)[0] or "application/octet-stream"
+        self.db.storage.from_(dest_bucket).upload(
+            dest_path,
+            content,
+            file_options={"content-type": content_type}
+        )
+        self.db.storage.from_(source_bucket).remove([source_path])
+    
     async def upload_file(
         self, 
         user_id: str, 
@@ -28,6 +75,19 @@ class StorageService:
         Upload file to Supabase Storage
         Returns (file_path, file_url)
         """
+        file_path, file_url, _, _ = await self.upload_file_with_digest(user_id, file, bucket)
+        return file_path, file_url
+    
+    async def upload_file_with_digest(
+        self, 
+        user_id: str, 
+        file: UploadFile, 
+        bucket: str = None
+    ) -> Tuple[str, str, int, str]:
+        """
+        Upload file to Supabase Storage, hashing it while it is read
+        Returns (file_path, file_url, file_size, sha256 hex digest)
+        """
         if bucket is None:
             bucket = self.uploads_bucket
         
@@ -38,15 +98,34 @@ class StorageService:
                 detail="Only PDF files are allowed"
             )
         
-        # Validate file size (50MB limit)
+        # Validate file size (50MB limit) while reading, so oversized uploads
+        # are rejected without buffering them whole
         max_size = 50 * 1024 * 1024  # 50MB
-        file_content = await file.read()
-        if len(file_content) > max_size:
+        if file.size is not None and file.size > max_size:
             raise HTTPException(
                 status_code=400,
                 detail="File size exceeds 50MB limit"
             )
         
+        buffer = bytearray()
+        digest = hashlib.sha256()
+        while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+            buffer.extend(chunk)
+            digest.update(chunk)
+            if len(buffer) > max_size:
+                raise HTTPException(
+                    status_code=400,
+                    detail="File size exceeds 50MB limit"
+                )
+        file_content = bytes(buffer)
+        
+        # Reject files whose content isn't actually a PDF
+        if not file_content.startswith(b"%PDF-"):
+            raise HTTPException(
+                status_code=400,
+                detail="Only PDF files are allowed"
+            )
+        
         # Generate unique filename
         file_extension = os.path.splitext(file.filename)[1]
         unique_filename = f"{uuid.uuid4()}{file_extension}"
@@ -72,7 +151,7 @@ class StorageService:
             # Get public URL
             file_url = self.db.storage.from_(bucket).get_public_url(file_path)
             
-            return file_path, file_url
+            return file_path, file_url, len(file_content), digest.hexdigest()
             
         except Exception as e:
             raise HTTPException(
@@ -94,24 +173,36 @@ class StorageService:
             bucket = self.uploads_bucket
         
         # Verify user owns the file
-        if not file_path.startswith(f"{user_id}/"):
+        if not _is_user_path(user_id, file_path):
             raise HTTPException(
                 status_code=403,
                 detail="Access denied to file"
             )
         
+        cache_key = (bucket, file_path, expires_in)
+        cached = _signed_url_cache.get(cache_key)
+        if cached and cached[0] > time.time() + _SIGNED_URL_SAFETY_MARGIN:
+            _signed_url_cache.move_to_end(cache_key)
+            return cached[1]
+        
         try:
             signed_url = self.db.storage.from_(bucket).create_signed_url(
                 file_path, 
                 expires_in
             )
-            return signed_url["signedURL"]
+            url = signed_url["signedURL"]
             
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to generate signed URL: {str(e)}"
             )
+        
+        _signed_url_cache[cache_key] = (time.time() + expires_in, url)
+        _signed_url_cache.move_to_end(cache_key)
+        if len(_signed_url_cache) > _SIGNED_URL_CACHE_MAX_SIZE:
+            _signed_url_cache.popitem(last=False)
+        return url
     
     async def delete_file(
         self, 
@@ -126,14 +217,15 @@ class StorageService:
             bucket = self.uploads_bucket
         
         # Verify user owns the file
-        if not file_path.startswith(f"{user_id}/"):
+        if not _is_user_path(user_id, file_path):
             raise HTTPException(
                 status_code=403,
                 detail="Access denied to file"
             )
         
         try:
-            result = self.db.storage.from_(bucket).remove([file_path])
+            result = await asyncio.to_thread(self.db.storage.from_(bucket).remove, [file_path])
+            _invalidate_signed_urls(bucket, file_path)
             return len(result) > 0
             
         except Exception as e:
@@ -159,13 +251,13 @@ class StorageService:
             dest_bucket = self.documents_bucket
         
         # Verify user owns the file
-        if not source_path.startswith(f"{user_id}/"):
+        if not _is_user_path(user_id, source_path):
             raise HTTPException(
                 status_code=403,
                 detail="Access denied to source file"
             )
         
-        if not dest_path.startswith(f"{user_id}/"):
+        if not _is_user_path(user_id, dest_path):
             raise HTTPException(
                 status_code=403,
                 detail="Access denied to destination path"
@@ -173,22 +265,62 @@ class StorageService:
         
         try:
             # Move file
-            result = self.db.storage.from_(source_bucket).move(
-                source_path, 
-                dest_path,
-                dest_bucket
-            )
-            
-            if result.status_code != 200:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to move file"
-                )
+            await asyncio.to_thread(self._move_object, source_bucket, source_path, dest_bucket, dest_path)
             
+            _invalidate_signed_urls(source_bucket, source_path)
             return dest_path
             
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to move file: {str(e)}"
-            )
\ No newline at end of file
+            )
+    
+    async def move_files_bulk(
+        self, 
+        user_id: str, 
+        pairs: List[Tuple[str, str]],
+        source_bucket: str = None,
+        dest_bucket: str = None
+    ) -> List[str]:
+        """
+        Move several files concurrently.
+        Returns the destination paths; fails if any move failed.
+        """
+        if source_bucket is None:
+            source_bucket = self.uploads_bucket
+        if dest_bucket is None:
+            dest_bucket = self.documents_bucket
+        
+        # Verify user owns every file before moving any of them
+        if not all(
+            _is_user_path(user_id, source) and _is_user_path(user_id, dest)
+            for source, dest in pairs
+        ):
+            raise HTTPException(
+                status_code=403,
+                detail="Access denied to file"
+            )
+        
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._move_object, source_bucket, source, dest_bucket, dest)
+                for source, dest in pairs
+            ),
+            return_exceptions=True
+        )
+        
+        failed = []
+        for (source, _), result in zip(pairs, results):
+            if isinstance(result, Exception):
+                failed.append(source)
+            else:
+                _invalidate_signed_urls(source_bucket, source)
+        
+        if failed:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to move {len(failed)} of {len(pairs)} files: {', '.join(failed)}"
+            )
+        
+        return [dest for _, dest in pairs]
\ No newline at end of file
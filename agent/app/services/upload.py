@@ -2,14 +2,35 @@
 Upload management service
 """
 
-from typing import List, Optional
+import asyncio
+import json
+import logging
 from datetime import datetime
+from typing import List, Optional, Tuple
 from supabase import Client
 from fastapi import UploadFile, HTTPException
+from app.core.cache import get_redis
 from app.models.upload import Upload, UploadCreate, UploadStatus, ParsedData
+from app.models.job_processing import JobQueueCreate, JobType
 from app.services.storage import StorageService
 from app.services.parser import CVParserService
 
+logger = logging.getLogger(__name__)
+
+# Upload columns for listings; parsed_data (the large jsonb document) is left
+# out and fetched on demand via get_parsed_data
+_UPLOAD_LIST_COLUMNS = (
+    "id, user_id, filename, file_size, mime_type, file_path, status, "
+    "error_message, content_sha256, created_at, processed_at"
+)
+
+# Upload rows are cached briefly so status/parsed-data polling while a parse is
+# in flight does not hit the database on every request (seconds)
+_UPLOAD_CACHE_TTL = 2
+
+# Wire values for each upload status, looked up once instead of per update
+_STATUS_VALUES = {status: status.value for status in UploadStatus}
+
 
 class UploadService:
     """Service for managing file uploads and parsing"""
@@ -17,9 +38,62 @@ class UploadService:
     def __init__(self, db: Client):
         self.db = db
         self.storage_service = StorageService(db)
-        self.parser_service = CVParserService(db)
+        self.parser_service = CVParserService(db, self.storage_service)
+        # Strong references to fire-and-forget storage cleanups
+        self._cleanup_tasks: set = set()
+    
+    async def _run(self, query):
+        """Execute a supabase query without blocking the event loop"""
+        return await asyncio.to_thread(query.execute)
     
-    async def create_upload_record(self, user_id: str, upload_data: UploadCreate, file_path: str) -> Upload:
+    @staticmethod
+    def _upload_cache_key(upload_id: str) -> str:
+        # Keyed by upload only so status updates (which have no user id) can
+        # invalidate it; ownership is checked against the cached row
+        return f"upload:{upload_id}"
+    
+    async def _get_upload_row(self, user_id: str, upload_id: str) -> Optional[dict]:
+        """Get an upload row, served from the short-lived cache when possible"""
+        redis_client = get_redis()
+        key = self._upload_cache_key(upload_id)
+        if redis_client is not None:
+            try:
+                cached = await redis_client.get(key)
+                if cached:
+                    row = json.loads(cached)
+                    return row if row["user_id"] == user_id else None
+            except Exception as e:
+                logger.debug(f"Upload cache lookup failed: {e}")
+        
+        result = await self._run(self.db.table("uploads").select("*").eq("id", upload_id).eq("user_id", user_id))
+        if not result.data:
+            return None
+        
+        row = result.data[0]
+        if redis_client is not None:
+            try:
+                await redis_client.setex(key, _UPLOAD_CACHE_TTL, json.dumps(row))
+            except Exception as e:
+                logger.debug(f"Upload cache store failed: {e}")
+        return row
+    
+    async def _invalidate_upload(self, upload_id: str) -> None:
+        """Drop a cached upload row; failures only mean a read up to the TTL stale"""
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.delete(self._upload_cache_key(upload_id))
+        except Exception as e:
+            logger.debug(f"Upload cache invalidation failed: {e}")
+    
+    async def create_upload_record(
+        self, 
+        user_id: str, 
+        upload_data: UploadCreate, 
+        file_path: str,
+        content_sha256: Optional[str] = None
+    ) -> Upload:
         """Create upload record in database"""
         insert_data = {
             "user_id": user_id,
@@ -27,11 +101,11 @@ class UploadService:
             "file_size": upload_data.file_size,
             "mime_type": upload_data.mime_type,
             "file_path": file_path,
-            "status": UploadStatus.PENDING.value,
-            "created_at": datetime.utcnow().isoformat()
+            "status": _STATUS_VALUES[UploadStatus.PENDING],
+            "content_sha256": content_sha256
         }
         
-        result = self.db.table("uploads").insert(insert_data).execute()
+        result = await self._run(self.db.table("uploads").insert(insert_data))
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create upload record")
         
@@ -39,15 +113,38 @@ class UploadService:
     
     async def get_upload(self, user_id: str, upload_id: str) -> Optional[Upload]:
         """Get upload record by ID"""
-        result = self.db.table("uploads").select("*").eq("id", upload_id).eq("user_id", user_id).execute()
-        if result.data:
-            return Upload(**result.data[0])
+        row = await self._get_upload_row(user_id, upload_id)
+        if row:
+            return Upload.model_validate(row)
         return None
     
-    async def get_user_uploads(self, user_id: str) -> List[Upload]:
-        """Get all uploads for a user"""
-        result = self.db.table("uploads").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return [Upload(**item) for item in result.data]
+    async def get_user_uploads(
+        self, 
+        user_id: str, 
+        after: Optional[Tuple[datetime, str]] = None,
+        limit: int = 50
+    ) -> List[Upload]:
+        """
+        Get a page of a user's uploads, newest first.
+        `after` is the (created_at, id) of the last upload on the previous page.
+        """
+        # postgrest-py in our pinned range has no or_() helper and emits one
+        # "order" parameter per order() call, so the keyset filter and the
+        # two-column sort are written as PostgREST parameters directly
+        query = self.db.table("uploads").select(_UPLOAD_LIST_COLUMNS).eq("user_id", user_id)
+        if after:
+            # Rows strictly after the cursor in (created_at DESC, id DESC) order
+            created_at, upload_id = after
+            created_at = created_at.isoformat()
+            query.params = query.params.add(
+                "or",
+                f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{upload_id}))'
+            )
+        query.params = query.params.add("order", "created_at.desc,id.desc")
+        query = query.limit(limit)
+        
+        result = await self._run(query)
+        return [Upload.model_validate(item) for item in result.data]
     
     async def update_upload_status(
         self, 
@@ -57,49 +154,88 @@ class UploadService:
         error_message: Optional[str] = None
     ) -> bool:
         """Update upload status and parsed data"""
-        update_data = {
-            "status": status.value,
-            "processed_at": datetime.utcnow().isoformat() if status in [UploadStatus.COMPLETED, UploadStatus.FAILED] else None
-        }
+        # created_at and processed_at are set by the database (see migration 013)
+        update_data = {"status": _STATUS_VALUES[status]}
         
         if parsed_data:
-            update_data["parsed_data"] = parsed_data.dict()
+            update_data["parsed_data"] = parsed_data.model_dump(mode="json")
         
         if error_message:
             update_data["error_message"] = error_message
         
-        result = self.db.table("uploads").update(update_data).eq("id", upload_id).execute()
+        result = await self._run(self.db.table("uploads").update(update_data).eq("id", upload_id))
+        await self._invalidate_upload(upload_id)
         return len(result.data) > 0
     
     async def upload_and_parse_cv(self, user_id: str, file: UploadFile) -> Upload:
         """Upload CV file and initiate parsing"""
         try:
-            # Upload file to storage
-            file_path, file_url = await self.storage_service.upload_file(user_id, file)
+            # Upload file to storage; size and hash are taken in the same pass
+            file_path, file_url, file_size, content_sha256 = (
+                await self.storage_service.upload_file_with_digest(user_id, file)
+            )
             
             # Create upload record
             upload_data = UploadCreate(
                 filename=file.filename,
-                file_size=len(await file.read()),
+                file_size=file_size,
                 mime_type=file.content_type
             )
             
-            # Reset file pointer
-            await file.seek(0)
-            
-            upload_record = await self.create_upload_record(user_id, upload_data, file_path)
+            upload_record = await self.create_upload_record(user_id, upload_data, file_path, content_sha256)
             
-            # Start parsing process
-            await self._parse_upload_async(upload_record.id, user_id, file_path)
+            # Queue parsing for the background worker (imported here: the job
+            # processor pulls in the generation services)
+            from app.services.job_processor import get_job_processor
+            await get_job_processor().create_job(JobQueueCreate(
+                user_id=user_id,
+                job_type=JobType.CV_PARSE,
+                input_data={
+                    "upload_id": upload_record.id,
+                    "file_path": file_path,
+                    "content_sha256": content_sha256
+                }
+            ))
             
             return upload_record
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     
-    async def _parse_upload_async(self, upload_id: str, user_id: str, file_path: str):
-        """Parse uploaded CV asynchronously"""
+    async def _find_parsed_duplicate(self, user_id: str, content_sha256: str) -> Optional[ParsedData]:
+        """Get parsed data from an earlier upload of the same file, if any"""
+        result = await self._run(
+            self.db.table("uploads")
+            .select("parsed_data")
+            .eq("user_id", user_id)
+            .eq("content_sha256", content_sha256)
+            .not_.is_("parsed_data", "null")
+            .limit(1)
+        )
+        if result.data:
+            return ParsedData.model_validate(result.data[0]["parsed_data"])
+        return None
+    
+    async def parse_upload(
+        self, 
+        upload_id: str, 
+        user_id: str, 
+        file_path: str, 
+        content_sha256: Optional[str] = None
+    ):
+        """
+        Parse an uploaded CV and store the result on the upload.
+        On failure the upload is marked FAILED and the error is re-raised,
+        so the CV_PARSE job that runs this fails (and can be retried).
+        """
         try:
+            # Re-uploads of an already parsed file reuse its result
+            if content_sha256:
+                parsed_data = await self._find_parsed_duplicate(user_id, content_sha256)
+                if parsed_data:
+                    await self.update_upload_status(upload_id, UploadStatus.COMPLETED, parsed_data)
+                    return
+            
             # Update status to processing
             await self.update_upload_status(upload_id, UploadStatus.PROCESSING)
             
@@ -116,35 +252,49 @@ class UploadService:
                 UploadStatus.FAILED, 
                 error_message=str(e)
             )
+            raise
     
     async def get_parsed_data(self, user_id: str, upload_id: str) -> Optional[ParsedData]:
         """Get parsed data for an upload"""
-        upload = await self.get_upload(user_id, upload_id)
-        if upload and upload.parsed_data:
-            return upload.parsed_data
+        row = await self._get_upload_row(user_id, upload_id)
+        if row and row["parsed_data"]:
+            return ParsedData.model_validate(row["parsed_data"])
         return None
     
     async def delete_upload(self, user_id: str, upload_id: str) -> bool:
         """Delete upload record and associated file"""
-        upload = await self.get_upload(user_id, upload_id)
-        if not upload:
-            return False
-        
         try:
-            # Delete file from storage
-            await self.storage_service.delete_file(user_id, upload.file_path)
+            # Delete database record; the deleted row tells us which file to remove
+            result = await self._run(self.db.table("uploads").delete().eq("id", upload_id).eq("user_id", user_id))
+            if not result.data:
+                return False
+            await self._invalidate_upload(upload_id)
             
-            # Delete database record
-            result = self.db.table("uploads").delete().eq("id", upload_id).eq("user_id", user_id).execute()
-            return len(result.data) > 0
+            # Remove the file off the request path; the upload is already gone
+            # for the user, so a storage failure only leaves an orphaned object
+            task = asyncio.create_task(
+                self._delete_upload_file(user_id, result.data[0]["file_path"])
+            )
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
+            return True
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to delete upload: {str(e)}")
     
+    async def _delete_upload_file(self, user_id: str, file_path: str):
+        """Delete an upload's stored file, logging rather than raising on failure"""
+        try:
+            await self.storage_service.delete_file(user_id, file_path)
+        except Exception as e:
+            logger.error(f"Failed to delete stored file {file_path}: {e}")
+    
     async def get_download_url(self, user_id: str, upload_id: str) -> str:
         """Get signed download URL for uploaded file"""
-        upload = await self.get_upload(user_id, upload_id)
-        if not upload:
+        result = await self._run(
+            self.db.table("uploads").select("file_path").eq("id", upload_id).eq("user_id", user_id)
+        )
+        if not result.data:
             raise HTTPException(status_code=404, detail="Upload not found")
         
-        return await self.storage_service.get_signed_url(user_id, upload.file_path)
\ No newline at end of file
+        return await self.storage_service.get_signed_url(user_id, result.data[0]["file_path"])
\ No newline at end of file
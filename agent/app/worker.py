@@ -3,10 +3,11 @@ Background worker for processing jobs
 """
 
 import asyncio
+import importlib
 import logging
 import signal
 import sys
-from typing import Optional
+from typing import List, Optional
 
 from app.core.database import get_db
 from app.services.job_processor import JobProcessor
@@ -19,6 +20,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Jobs claimed and processed together per loop iteration
+JOB_BATCH_SIZE = 4
+# Idle polling backs off from the shortest to the longest wait (seconds)
+IDLE_WAIT_MIN = 0.5
+IDLE_WAIT_MAX = 5
+# How long in-flight jobs may keep running after a shutdown signal (seconds)
+SHUTDOWN_GRACE_PERIOD = 30
+# Modules job handlers import lazily; loaded before polling starts so the
+# import cost does not land on the first job that needs them
+PREWARM_MODULES = ("app.services.upload",)
+
 
 class JobWorker:
     """Background job worker"""
@@ -27,63 +39,111 @@ class JobWorker:
         self.db = get_db()
         self.processor = JobProcessor(self.db)
         self.running = False
-        self.current_job: Optional[str] = None
+        self.current_jobs: List[str] = []
+        self._shutdown = asyncio.Event()
+        self._current_task: Optional[asyncio.Future] = None
     
     async def start(self):
         """Start the worker"""
         logger.info("Starting job worker...")
         self.running = True
         
-        # Set up signal handlers
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        for module in PREWARM_MODULES:
+            importlib.import_module(module)
+        self._shutdown.clear()
+        
+        # Set up signal handlers on the event loop so shutdown is cooperative
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._signal_handler, sig)
         
         try:
             await self._worker_loop()
         except Exception as e:
             logger.error(f"Worker error: {e}")
         finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            self.running = False
             logger.info("Job worker stopped")
     
+    async def _wait_for_shutdown(self, timeout: float) -> bool:
+        """Sleep for up to ``timeout`` seconds, returning True early on shutdown"""
+        try:
+            await asyncio.wait_for(self._shutdown.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _run_batch(self, jobs) -> Optional[List[bool]]:
+        """Process a batch, giving it a grace period if shutdown is requested"""
+        self._current_task = asyncio.gather(
+            *(self.processor.process_job(job, claimed=True) for job in jobs)
+        )
+        shutdown_waiter = asyncio.create_task(self._shutdown.wait())
+        try:
+            await asyncio.wait(
+                {self._current_task, shutdown_waiter},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if self._current_task.done():
+                return self._current_task.result()
+            
+            logger.info(f"Waiting up to {SHUTDOWN_GRACE_PERIOD}s for current jobs {', '.join(self.current_jobs)} to complete...")
+            try:
+                return await asyncio.wait_for(self._current_task, timeout=SHUTDOWN_GRACE_PERIOD)
+            except asyncio.TimeoutError:
+                logger.warning(f"Cancelled unfinished jobs {', '.join(self.current_jobs)}")
+                return None
+        finally:
+            shutdown_waiter.cancel()
+            self._current_task = None
+    
     async def _worker_loop(self):
         """Main worker loop"""
-        while self.running:
+        idle_wait = IDLE_WAIT_MIN
+        while not self._shutdown.is_set():
             try:
-                # Get next job
-                job = await self.processor.get_next_job()
+                # Claim a batch of jobs
+                jobs = await self.processor.claim_jobs(JOB_BATCH_SIZE)
                 
-                if job:
-                    logger.info(f"Processing job {job.id} of type {job.job_type}")
-                    self.current_job = job.id
+                if jobs:
+                    idle_wait = IDLE_WAIT_MIN
+                    for job in jobs:
+                        logger.info(f"Processing job {job.id} of type {job.job_type}")
+                    self.current_jobs = [job.id for job in jobs]
                     
-                    # Process job
-                    success = await self.processor.process_job(job)
+                    # Process the batch concurrently
+                    results = await self._run_batch(jobs)
+                    if results is None:
+                        break
                     
-                    if success:
-                        logger.info(f"Job {job.id} completed successfully")
-                    else:
-                        logger.error(f"Job {job.id} failed")
+                    for job, success in zip(jobs, results):
+                        if success:
+                            logger.info(f"Job {job.id} completed successfully")
+                        else:
+                            logger.error(f"Job {job.id} failed")
                     
-                    self.current_job = None
+                    self.current_jobs = []
                 else:
-                    # No jobs available, wait before checking again
-                    await asyncio.sleep(5)
+                    # No jobs available, wait (backing off) before checking again
+                    await self._wait_for_shutdown(idle_wait)
+                    idle_wait = min(idle_wait * 2, IDLE_WAIT_MAX)
                     
             except Exception as e:
                 logger.error(f"Error in worker loop: {e}")
-                await asyncio.sleep(10)  # Wait longer on error
+                await self._wait_for_shutdown(10)  # Wait longer on error
     
-    def _signal_handler(self, signum, frame):
+    def _signal_handler(self, signum):
         """Handle shutdown signals"""
         logger.info(f"Received signal {signum}, shutting down gracefully...")
         self.running = False
-        
-        if self.current_job:
-            logger.info(f"Waiting for current job {self.current_job} to complete...")
+        self._shutdown.set()
     
     async def stop(self):
         """Stop the worker"""
         self.running = False
+        self._shutdown.set()
 
 
 async def main():
@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for production
+
+Run with: gunicorn -c gunicorn_conf.py main:app
+`python main.py` remains the development entry point.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# One async worker per core, matching main.py; WEB_CONCURRENCY overrides
+workers = int(os.getenv("WEB_CONCURRENCY") or os.getenv("UVICORN_WORKERS") or os.cpu_count() or 1)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with the modules (and
+# pydantic models) already built and share those pages copy-on-write
+preload_app = True
+
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+backlog = 2048
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
@@ -3,23 +3,32 @@ AI CV Agent FastAPI Application
 Main entry point for the CV generation and tailoring service.
 """
 
+import hashlib
+import importlib.util
+
 # Suppress cryptography deprecation warnings from PyPDF
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="pypdf")
 warnings.filterwarnings("ignore", message=".*ARC4.*", category=DeprecationWarning)
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import uvicorn
-import redis
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
 
+# ORJSONResponse imports orjson itself; only its presence matters here
+ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.logging import setup_logging
+from app.core.database import Database
+from app.core.logging import logger
+from app.services.cv_generator import shutdown_pdf_executor
+from app.services.document_vault import get_document_vault_service
+from app.services.job_processor import get_job_processor, shutdown_job_processor
 # from app.services.background_jobs import start_background_jobs, stop_background_jobs
 from app.middleware.security import SecurityMiddleware, CSRFMiddleware
+from app.middleware.cors import ProbeExemptCORSMiddleware
 
 
 @asynccontextmanager
@@ -28,6 +37,14 @@ async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     
+    # Build the database client and shared services now, in each worker,
+    # rather than on the first request that needs them
+    try:
+        get_document_vault_service()
+        get_job_processor()
+    except Exception as e:
+        logger.warning(f"Service warm-up failed, services will be created on first use: {e}")
+    
     # Start background jobs for crawling and matching
     if settings.ENABLE_BACKGROUND_JOBS:
         pass  # start_background_jobs()
@@ -37,6 +54,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     if settings.ENABLE_BACKGROUND_JOBS:
         pass  # stop_background_jobs()
+    
+    await shutdown_job_processor()
+    Database.close()
+    shutdown_pdf_executor()
 
 
 app = FastAPI(
@@ -44,6 +65,7 @@ app = FastAPI(
     description="Intelligent resume assistant for job seekers",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
 )
 
 # Add security and validation middleware
@@ -56,23 +78,33 @@ app.add_middleware(InputValidationMiddleware)
 # app.add_middleware(BurstRateLimitMiddleware)  # Requires Redis
 # app.add_middleware(RateLimitMiddleware)  # Requires Redis
 
-# CORS middleware
+# CORS middleware (health probes bypass it)
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["https://3000-cs-9791e14b-8896-4b7c-9685-0abcdee075c6.cs-europe-west1-haha.cloudshell.dev"],
+    ProbeExemptCORSMiddleware,
+    allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.CORS_MAX_AGE,
 )
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
 
+# The health payload never changes, so it is serialised (and tagged) once at
+# import; probes that send the ETag back get an empty 304
+_HEALTH_BODY = b'{"status":"healthy","service":"ai-cv-agent"}'
+_HEALTH_ETAG = '"' + hashlib.blake2b(_HEALTH_BODY, digest_size=8).hexdigest() + '"'
+_HEALTH_HEADERS = {"ETag": _HEALTH_ETAG, "Cache-Control": "max-age=5"}
+
+
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
-    return {"status": "healthy", "service": "ai-cv-agent"}
+    if request.headers.get("if-none-match") == _HEALTH_ETAG:
+        return Response(status_code=304, headers=_HEALTH_HEADERS)
+    return Response(content=_HEALTH_BODY, media_type="application/json", headers=_HEALTH_HEADERS)
 
 
 @app.exception_handler(Exception)
@@ -134,12 +166,34 @@ async def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import os
+    import uvicorn
     port = int(os.getenv("PORT", 8000))
+    development = settings.ENVIRONMENT == "development"
+    
+    # Outside development run one worker per core; WEB_CONCURRENCY (or
+    # UVICORN_WORKERS) overrides this in any environment. uvicorn cannot
+    # reload with several workers, so reload only runs with a single one.
+    workers = int(
+        os.getenv("WEB_CONCURRENCY")
+        or os.getenv("UVICORN_WORKERS")
+        or (1 if development else os.cpu_count() or 1)
+    )
+    # One pre-formatted line, flushed so it is not held in the block buffer
+    # stdout uses when not attached to a terminal (containers)
+    print(f"Starting AI CV Agent API on port {port} with {workers} worker(s) (override with WEB_CONCURRENCY)", flush=True)
     
+    # "auto" picks uvloop and httptools when they are installed (they ship
+    # with uvicorn[standard]) and falls back to asyncio/h11, e.g. on Windows
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=settings.ENVIRONMENT == "development",
+        reload=development and workers == 1,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        limit_concurrency=1000,
+        backlog=2048,
         log_level="info",
     )
\ No newline at end of file
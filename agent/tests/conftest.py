@@ -4,23 +4,41 @@ Pytest configuration and fixtures
 
 import pytest
 import asyncio
+from types import MappingProxyType
 from unittest.mock import Mock, AsyncMock
 from supabase import Client
 
 from app.core.config import settings
-from app.services.crew_agents import CrewAIService
-from app.services.job_processor import JobProcessor
-from app.services.document_vault import DocumentVaultService
+
+# Run tests on the same event loop implementation as production (main.py
+# serves with uvloop) where it is available
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+# Service modules are imported inside their fixtures: conftest is loaded for
+# every run, and the AI/PDF stacks behind them are slow to import
 
 
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
     yield loop
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_vault_caches():
+    """Keep the document vault's module-level read caches from leaking between tests"""
+    yield
+    from app.services.document_vault import _clear_caches
+    _clear_caches()
+
+
 @pytest.fixture
 def mock_db():
     """Mock Supabase client"""
@@ -44,6 +62,7 @@ def mock_db():
 @pytest.fixture
 def mock_crew_service():
     """Mock CrewAI service"""
+    from app.services.crew_agents import CrewAIService
     service = Mock(spec=CrewAIService)
     service.process_cv_generation = AsyncMock(return_value={
         "success": True,
@@ -59,21 +78,26 @@ def mock_crew_service():
 
 
 @pytest.fixture
-def job_processor(mock_db):
+def job_processor(mock_db, event_loop):
     """Job processor instance with mocked dependencies"""
-    return JobProcessor(mock_db)
+    from app.services.job_processor import JobProcessor
+    processor = JobProcessor(mock_db)
+    yield processor
+    # Flush buffered writes so no delayed flush task outlives the test
+    event_loop.run_until_complete(processor.close())
 
 
 @pytest.fixture
 def document_vault_service(mock_db):
     """Document vault service with mocked dependencies"""
+    from app.services.document_vault import DocumentVaultService
     return DocumentVaultService(mock_db)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_user_profile():
     """Sample user profile for testing"""
-    return {
+    return MappingProxyType({
         "user_id": "test-user-123",
         "full_name": "John Doe",
         "email": "john.doe@example.com",
@@ -103,13 +127,13 @@ def sample_user_profile():
             {"id": "skill1", "skill_name": "Python", "proficiency_level": "Advanced"},
             {"id": "skill2", "skill_name": "JavaScript", "proficiency_level": "Intermediate"}
         ]
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_job():
     """Sample job for testing"""
-    return {
+    return MappingProxyType({
         "id": "job-123",
         "title": "Senior Software Engineer",
         "company": "Example Corp",
@@ -121,13 +145,13 @@ def sample_job():
         "work_mode": "hybrid",
         "posted_date": "2024-01-15",
         "application_deadline": "2024-02-15"
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_job_queue_item():
     """Sample job queue item for testing"""
-    return {
+    return MappingProxyType({
         "id": "queue-123",
         "user_id": "test-user-123",
         "job_type": "cv_generation",
@@ -141,13 +165,13 @@ def sample_job_queue_item():
         "total_steps": 7,
         "retry_count": 0,
         "max_retries": 3
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_document():
     """Sample document for testing"""
-    return {
+    return MappingProxyType({
         "id": "doc-123",
         "user_id": "test-user-123",
         "document_type": "cv",
@@ -159,7 +183,7 @@ def sample_document():
         "mime_type": "application/pdf",
         "template_used": "modern_one_page",
         "status": "active"
-    }
+    })
 
 
 # Test data constants
@@ -5,6 +5,7 @@ Tests for document vault system
 import pytest
 import os
 import tempfile
+from datetime import datetime
 from unittest.mock import Mock, AsyncMock, patch
 from pathlib import Path
 
@@ -90,11 +91,25 @@ class TestDocumentVaultService:
         assert "Duplicate document" in result["error"]
         assert result["existing_document_id"] == "existing-doc"
     
+    @pytest.mark.asyncio
+    async def test_find_duplicate_by_client_hash(self, document_vault_service):
+        """Test the hash-first duplicate check used before uploading"""
+        # Setup
+        check = AsyncMock(return_value={"id": "existing-doc"})
+        with patch.object(document_vault_service, '_check_duplicate', check):
+            # Execute
+            result = await document_vault_service.find_duplicate("test-user-123", "AB" * 32)
+        
+        # Assert
+        assert result["id"] == "existing-doc"
+        check.assert_called_once_with("test-user-123", "ab" * 32)
+    
     @pytest.mark.asyncio
     async def test_get_documents(self, document_vault_service, mock_db):
         """Test document retrieval with filtering"""
         # Setup
-        mock_db.table.return_value.select.return_value.eq.return_value.order.return_value.range.return_value.execute.return_value = Mock(
+        mock_db.table.return_value.select.return_value.eq.return_value.eq.return_value.eq.return_value.limit.return_value.execute.return_value = Mock(
+            count=2,
             data=[
                 {
                     "id": "doc-1",
@@ -122,6 +137,56 @@ class TestDocumentVaultService:
         assert result["success"] is True
         assert len(result["documents"]) == 2
         assert result["limit"] == 10
+        assert result["total_count"] == 2
+        mock_db.table.return_value.select.assert_called_with("*", count="exact")
+    
+    @pytest.mark.asyncio
+    async def test_get_documents_after_cursor(self, document_vault_service, mock_db):
+        """Test that cursor pages skip the count instead of counting past the cursor"""
+        # Setup
+        mock_db.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value.execute.return_value = Mock(
+            count=None,
+            data=[{"id": "doc-1", "title": "CV 1", "document_type": "cv", "created_at": "2024-01-01T00:00:00Z"}]
+        )
+        
+        # Execute
+        result = await document_vault_service.get_documents(
+            user_id="test-user-123",
+            limit=10,
+            after=(datetime(2024, 1, 2), "doc-2"),
+            offset=20
+        )
+        
+        # Assert
+        assert result["success"] is True
+        assert result["total_count"] is None
+        assert result["offset"] == 0
+        mock_db.table.return_value.select.assert_called_with("*", count=None)
+    
+    @pytest.mark.asyncio
+    async def test_get_documents_columnar(self, document_vault_service):
+        """Test the column-per-field document listing"""
+        # Setup
+        page = AsyncMock(return_value={
+            "success": True,
+            "documents": [
+                {"id": "doc-2", "title": "CV 2", "document_type": "cv", "created_at": "2024-01-02T00:00:00Z"},
+                {"id": "doc-1", "title": "CV 1", "document_type": "cv", "created_at": "2024-01-01T00:00:00Z"}
+            ],
+            "total_count": 2,
+            "limit": 10,
+            "next_cursor": None
+        })
+        with patch.object(document_vault_service, 'get_documents', page):
+            # Execute
+            result = await document_vault_service.get_documents_columnar("test-user-123", limit=10)
+        
+        # Assert
+        page.assert_called_once_with("test-user-123", columns="id,title,document_type,created_at", limit=10)
+        assert "documents" not in result
+        assert result["columns"]["id"] == ["doc-2", "doc-1"]
+        assert result["columns"]["document_type"] == ["cv", "cv"]
+        assert result["total_count"] == 2
     
     @pytest.mark.asyncio
     async def test_get_document(self, document_vault_service, mock_db):
@@ -144,6 +209,25 @@ class TestDocumentVaultService:
         assert result["id"] == "doc-123"
         assert result["title"] == "Test Document"
     
+    @pytest.mark.asyncio
+    async def test_get_document_cache_follows_vault_version(self, document_vault_service, mock_db):
+        """Test that a version bump from any worker makes cached documents stale"""
+        # Setup
+        execute = mock_db.table.return_value.select.return_value.eq.return_value.eq.return_value.execute
+        execute.return_value = Mock(data=[{"id": "doc-123", "title": "Test Document"}])
+        redis_client = AsyncMock()
+        redis_client.get.return_value = b"1"
+        
+        with patch("app.services.document_vault.get_redis", return_value=redis_client):
+            # Execute
+            await document_vault_service.get_document("doc-123", "test-user-123")
+            await document_vault_service.get_document("doc-123", "test-user-123")
+            redis_client.get.return_value = b"2"
+            await document_vault_service.get_document("doc-123", "test-user-123")
+        
+        # Assert
+        assert execute.call_count == 2
+    
     @pytest.mark.asyncio
     async def test_update_document(self, document_vault_service, mock_db):
         """Test document metadata update"""
@@ -193,24 +277,27 @@ class TestDocumentVaultService:
     async def test_delete_document_permanent(self, document_vault_service, mock_db):
         """Test permanent document deletion"""
         # Setup
-        with patch.object(document_vault_service, 'get_document', return_value={
-            "id": "doc-123",
-            "file_path": "/documents/test.pdf"
-        }):
-            with patch('app.services.document_vault.storage_service') as mock_storage:
-                mock_storage.delete_file = AsyncMock(return_value=True)
-                
-                # Execute
-                result = await document_vault_service.delete_document(
-                    document_id="doc-123",
-                    user_id="test-user-123",
-                    permanent=True
-                )
+        mock_db.rpc.return_value.execute.return_value = Mock(data=["test-user-123/cv/test.pdf"])
+        with patch.object(document_vault_service, 'storage') as mock_storage:
+            mock_storage.delete_file = AsyncMock(return_value=True)
+            
+            # Execute
+            result = await document_vault_service.delete_document(
+                document_id="doc-123",
+                user_id="test-user-123",
+                permanent=True
+            )
         
         # Assert
         assert result["success"] is True
         assert "permanently deleted" in result["message"]
-        mock_storage.delete_file.assert_called_once_with("/documents/test.pdf")
+        mock_db.rpc.assert_called_once_with("delete_document_permanent", {
+            "doc_ids": ["doc-123"],
+            "user_id": "test-user-123"
+        })
+        mock_storage.delete_file.assert_called_once_with(
+            "test-user-123", "test-user-123/cv/test.pdf", bucket="documents"
+        )
     
     @pytest.mark.asyncio
     async def test_create_share_link(self, document_vault_service, mock_db):
@@ -291,6 +378,26 @@ class TestDocumentVaultService:
         assert result["id"] == "doc-123"
         assert result["share_permissions"] == ["view"]
     
+    @pytest.mark.asyncio
+    async def test_archive_drops_cached_share_links(self, document_vault_service, mock_db):
+        """Test that archiving a document removes its share links from the cache"""
+        # Setup
+        mock_db.table.return_value.update.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{"id": "doc-123", "status": "deleted"}]
+        )
+        redis_client = AsyncMock()
+        redis_client.get.return_value = None
+        redis_client.smembers.return_value = {b"abc123token"}
+        
+        with patch.object(document_vault_service, 'get_document', return_value={"id": "doc-123"}), \
+                patch("app.services.document_vault.get_redis", return_value=redis_client):
+            # Execute
+            result = await document_vault_service.delete_document("doc-123", "test-user-123")
+        
+        # Assert
+        assert result["success"] is True
+        redis_client.delete.assert_called_once_with("share_tokens:doc-123", "share:abc123token")
+    
     @pytest.mark.asyncio
     async def test_get_folders(self, document_vault_service, mock_db):
         """Test folder retrieval"""
@@ -399,7 +506,7 @@ class TestDocumentVaultHelpers:
     async def test_check_duplicate(self, document_vault_service, mock_db):
         """Test duplicate file detection"""
         # Setup
-        mock_db.table.return_value.select.return_value.eq.return_value.eq.return_value.eq.return_value.execute.return_value = Mock(
+        mock_db.rpc.return_value.execute.return_value = Mock(
             data=[{"id": "existing-doc", "title": "Existing Document"}]
         )
         
@@ -409,20 +516,26 @@ class TestDocumentVaultHelpers:
         # Assert
         assert result is not None
         assert result["id"] == "existing-doc"
+        mock_db.rpc.assert_called_with("find_duplicate_document", {
+            "user_id": "test-user-123",
+            "file_hash": "test-hash"
+        })
     
     @pytest.mark.asyncio
     async def test_get_default_folder(self, document_vault_service, mock_db):
         """Test default folder retrieval"""
         # Setup
-        mock_db.table.return_value.select.return_value.eq.return_value.eq.return_value.eq.return_value.execute.return_value = Mock(
-            data=[{"id": "cv-folder-123"}]
-        )
+        mock_db.rpc.return_value.execute.return_value = Mock(data="cv-folder-123")
         
         # Execute
         result = await document_vault_service._get_default_folder("test-user-123", "cv")
         
         # Assert
         assert result == "cv-folder-123"
+        mock_db.rpc.assert_called_with("get_system_folder_id", {
+            "user_id": "test-user-123",
+            "folder_name": "CVs"
+        })
     
     def test_generate_share_token(self, document_vault_service):
         """Test share token generation"""
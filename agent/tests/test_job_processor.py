@@ -2,12 +2,13 @@
 Tests for job processing system
 """
 
+import json
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
 
 from app.services.job_processor import JobProcessor
-from app.models.job_processing import JobQueue, JobQueueCreate, JobType, JobStatus
+from app.models.job_processing import JobQueue, JobQueueCreate, JobType, JobStatus, LogLevel, StepStatus
 
 
 class TestJobProcessor:
@@ -53,11 +54,14 @@ class TestJobProcessor:
         # Setup
         mock_db.rpc.return_value.execute.return_value = Mock(
             data=[{
-                "job_id": "job-123",
+                "id": "job-123",
                 "user_id": "test-user-123",
                 "job_type": "cv_generation",
+                "status": "processing",
                 "input_data": {"template": "modern_one_page"},
-                "priority": 5
+                "priority": 5,
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
             }]
         )
         
@@ -93,11 +97,29 @@ class TestJobProcessor:
         
         # Execute
         await job_processor._update_job_progress(job_id, progress, message)
+        await job_processor._flush_writes()
         
         # Assert
-        mock_db.table.assert_called_with("job_queue")
-        update_call = mock_db.table.return_value.update
-        assert update_call.called
+        mock_db.table.assert_any_call("job_queue")
+        update_data = mock_db.table.return_value.update.call_args_list[0][0][0]
+        assert update_data["progress_percentage"] == progress
+        assert update_data["current_step"] == message
+        assert job_processor._pending_progress == {}
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_writes(self, job_processor, mock_db):
+        """Test that buffered writes survive a failed flush"""
+        # Setup
+        mock_db.table.return_value.update.return_value.eq.return_value.execute.side_effect = Exception("Connection reset")
+        
+        # Execute
+        await job_processor._update_job_progress("job-123", 50, "Processing step 3")
+        await job_processor._log_job_event("job-123", LogLevel.INFO, "Step started")
+        await job_processor._flush_writes()
+        
+        # Assert
+        assert job_processor._pending_progress["job-123"]["progress_percentage"] == 50
+        assert [log["message"] for log in job_processor._pending_logs] == ["Processing step 3", "Step started"]
     
     @pytest.mark.asyncio
     async def test_process_cv_generation_job(self, job_processor, sample_job_queue_item, mock_crew_service):
@@ -152,6 +174,25 @@ class TestJobProcessor:
         assert "output_data" in result
         assert result["output_data"]["cover_letter_url"] == "https://example.com/cover_letter.pdf"
     
+    @pytest.mark.asyncio
+    async def test_process_cv_parse_job_failure(self, job_processor, sample_job_queue_item):
+        """Test that a failed parse fails the CV parse job"""
+        # Setup
+        job = JobQueue(**sample_job_queue_item, created_at=datetime.utcnow(), updated_at=datetime.utcnow())
+        job.job_type = JobType.CV_PARSE
+        job.input_data = {"upload_id": "upload-123", "file_path": "test-user-123/cv.pdf"}
+        
+        parse = AsyncMock(side_effect=ValueError("Unreadable PDF"))
+        with patch('app.services.upload.UploadService.parse_upload', parse):
+            # Execute
+            result = await job_processor._process_cv_parse(job)
+            await job_processor._flush_writes()
+        
+        # Assert
+        parse.assert_awaited_once_with("upload-123", "test-user-123", "test-user-123/cv.pdf", None)
+        assert result["success"] is False
+        assert result["error"] == "Unreadable PDF"
+    
     @pytest.mark.asyncio
     async def test_complete_job(self, job_processor, mock_db):
         """Test job completion"""
@@ -163,11 +204,11 @@ class TestJobProcessor:
         await job_processor._complete_job(job_id, output_data)
         
         # Assert
-        mock_db.rpc.assert_called_with("complete_job_processing", {
-            "job_id": job_id,
-            "output_data": '{"result": "success"}',
-            "success": True
-        })
+        rpc_name, params = mock_db.rpc.call_args.args
+        assert rpc_name == "complete_job_processing"
+        assert params["job_id"] == job_id
+        assert json.loads(params["output_data"]) == output_data
+        assert params["success"] is True
     
     @pytest.mark.asyncio
     async def test_fail_job(self, job_processor, mock_db):
@@ -195,26 +236,29 @@ class TestJobProcessor:
     async def test_get_dashboard_stats(self, job_processor, mock_db):
         """Test dashboard statistics retrieval"""
         # Setup
-        mock_db.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
-            count=10
-        )
-        
-        mock_db.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value = Mock(
-            data=[
+        mock_db.rpc.return_value.execute.return_value = Mock(data={
+            "total_jobs": 10,
+            "completed_jobs": 8,
+            "jobs_by_type": {"cv_generation": 10},
+            "recent_jobs": [
                 {
                     "id": "job-1",
+                    "user_id": "test-user-123",
                     "job_type": "cv_generation",
                     "status": "completed",
-                    "created_at": datetime.utcnow().isoformat()
+                    "created_at": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow().isoformat()
                 }
             ]
-        )
+        })
         
         # Execute
         result = await job_processor.get_dashboard_stats("test-user-123")
         
         # Assert
+        mock_db.rpc.assert_called_once_with("get_job_dashboard_stats", {"uid": "test-user-123"})
         assert result.total_jobs == 10
+        assert result.success_rate == 0.8
         assert len(result.recent_jobs) == 1
         assert result.recent_jobs[0].job_type == JobType.CV_GENERATION
 
@@ -228,33 +272,39 @@ class TestJobProcessingSteps:
         # Setup
         job_id = "job-123"
         step_name = "profile_analysis"
-        status = "processing"
         progress = 50
         
         # Execute
-        await job_processor._update_step_progress(job_id, step_name, status, progress)
+        await job_processor._update_step_progress(job_id, step_name, StepStatus.PROCESSING, progress)
+        await job_processor._update_step_progress(job_id, step_name, StepStatus.COMPLETED, 100)
+        await job_processor._flush_writes()
         
         # Assert
-        mock_db.table.assert_called_with("job_processing_steps")
-        update_call = mock_db.table.return_value.update
-        assert update_call.called
+        mock_db.table.assert_called_once_with("job_processing_steps")
+        update_data = mock_db.table.return_value.update.call_args[0][0]
+        assert update_data["status"] == StepStatus.COMPLETED.value
+        assert "started_at" in update_data and "completed_at" in update_data
+        mock_db.rpc.assert_called_once_with("calculate_job_progress", {"job_id": job_id})
     
     @pytest.mark.asyncio
     async def test_log_job_event(self, job_processor, mock_db):
         """Test job event logging"""
         # Setup
         job_id = "job-123"
-        level = "info"
         message = "Job started"
         metadata = {"step": "initialization"}
         
         # Execute
-        await job_processor._log_job_event(job_id, level, message, metadata)
+        await job_processor._log_job_event(job_id, LogLevel.INFO, message, metadata)
+        await job_processor._log_job_event(job_id, LogLevel.INFO, "Step started")
+        await job_processor._flush_writes()
         
         # Assert
-        mock_db.table.assert_called_with("job_processing_logs")
-        insert_call = mock_db.table.return_value.insert
-        assert insert_call.called
+        mock_db.table.assert_called_once_with("job_processing_logs")
+        logs = mock_db.table.return_value.insert.call_args[0][0]
+        assert [log["message"] for log in logs] == [message, "Step started"]
+        assert logs[0]["log_level"] == LogLevel.INFO.value
+        assert logs[0]["metadata"] == metadata
 
 
 class TestJobProcessingIntegration:
@@ -0,0 +1,70 @@
+"""
+Tests for profile updates
+"""
+
+import json
+import pytest
+from datetime import date, datetime
+from unittest.mock import Mock, patch
+from pydantic import ValidationError
+
+from app.models.profile import PersonalInfoUpdate, ExperienceCreate
+from app.services.profile import ProfileService
+
+
+class TestProfileUpdates:
+    """Test how profile update payloads treat explicit nulls"""
+    
+    def test_explicit_null_rejected_for_required_field(self):
+        """Test that a required personal info field cannot be cleared"""
+        # Execute / Assert
+        with pytest.raises(ValidationError):
+            PersonalInfoUpdate.model_validate({"first_name": None})
+    
+    @pytest.mark.asyncio
+    async def test_explicit_null_clears_optional_field(self, mock_db):
+        """Test that an explicit null on an optional field is written, and omitted fields are not"""
+        # Setup
+        mock_db.table.return_value.execute.return_value = Mock(data=[])
+        service = ProfileService(mock_db)
+        data = PersonalInfoUpdate.model_validate({"phone": None})
+        
+        # Execute
+        with patch("app.services.profile.get_redis", return_value=None):
+            await service.update_personal_info("test-user-123", data)
+        
+        # Assert
+        update_data = mock_db.table.return_value.update.call_args[0][0]
+        assert update_data["phone"] is None
+        assert "first_name" not in update_data
+
+
+
+class TestProfileBulkCreate:
+    """Test bulk inserts used when applying a parsed CV"""
+    
+    @pytest.mark.asyncio
+    async def test_bulk_insert_payload_is_json_serialisable(self, mock_db):
+        """Test that dated entries produce an insert payload the client can encode"""
+        # Setup
+        mock_db.table.return_value.execute.return_value = Mock(data=[{
+            "id": 1,
+            "user_id": "test-user-123",
+            "title": "Engineer",
+            "start_date": "2020-01-01",
+            "end_date": "2022-06-30",
+            "created_at": datetime.utcnow().isoformat(),
+        }])
+        service = ProfileService(mock_db)
+        items = [ExperienceCreate(title="Engineer", start_date=date(2020, 1, 1), end_date=date(2022, 6, 30))]
+        
+        # Execute
+        with patch("app.services.profile.get_redis", return_value=None):
+            result = await service.create_experience_bulk("test-user-123", items)
+        
+        # Assert
+        rows = mock_db.table.return_value.insert.call_args[0][0]
+        payload = json.loads(json.dumps(rows))
+        assert payload[0]["start_date"] == "2020-01-01"
+        assert payload[0]["user_id"] == "test-user-123"
+        assert result[0].end_date == date(2022, 6, 30)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Tests for storage service
+"""
+
+import pytest
+from unittest.mock import create_autospec
+from fastapi import HTTPException
+from storage3._sync.file_api import SyncBucketActionsMixin
+
+from app.services.storage import StorageService
+
+
+@pytest.fixture
+def mock_bucket(mock_db):
+    """Bucket mock with storage3's real method signatures"""
+    bucket = create_autospec(SyncBucketActionsMixin, instance=True)
+    bucket.move.return_value = {"message": "Successfully moved"}
+    bucket.download.return_value = b"%PDF-1.4 test"
+    mock_db.storage.from_.return_value = bucket
+    return bucket
+
+
+class TestStorageMoves:
+    """Test moving files within and across buckets"""
+    
+    @pytest.mark.asyncio
+    async def test_move_files_bulk_same_bucket(self, mock_db, mock_bucket):
+        """Test that moves within a bucket use storage move"""
+        # Setup
+        service = StorageService(mock_db)
+        pairs = [("user-1/a.pdf", "user-1/docs/a.pdf"), ("user-1/b.pdf", "user-1/docs/b.pdf")]
+        
+        # Execute
+        result = await service.move_files_bulk("user-1", pairs, source_bucket="uploads", dest_bucket="uploads")
+        
+        # Assert
+        assert result == ["user-1/docs/a.pdf", "user-1/docs/b.pdf"]
+        mock_bucket.move.assert_any_call("user-1/a.pdf", "user-1/docs/a.pdf")
+        assert mock_bucket.move.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_move_files_bulk_across_buckets(self, mock_db, mock_bucket):
+        """Test that moves across buckets copy the content and remove the source"""
+        # Setup
+        service = StorageService(mock_db)
+        
+        # Execute
+        result = await service.move_files_bulk("user-1", [("user-1/a.pdf", "user-1/a.pdf")])
+        
+        # Assert
+        assert result == ["user-1/a.pdf"]
+        mock_bucket.move.assert_not_called()
+        mock_bucket.upload.assert_called_once_with(
+            "user-1/a.pdf", b"%PDF-1.4 test", file_options={"content-type": "application/pdf"}
+        )
+        mock_bucket.remove.assert_called_once_with(["user-1/a.pdf"])
+    
+    @pytest.mark.asyncio
+    async def test_move_files_bulk_reports_failures(self, mock_db, mock_bucket):
+        """Test that a failed move is reported with its source path"""
+        # Setup
+        mock_bucket.move.side_effect = [{"message": "ok"}, Exception("not found")]
+        service = StorageService(mock_db)
+        pairs = [("user-1/a.pdf", "user-1/x/a.pdf"), ("user-1/b.pdf", "user-1/x/b.pdf")]
+        
+        # Execute / Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await service.move_files_bulk("user-1", pairs, source_bucket="uploads", dest_bucket="uploads")
+        assert "Failed to move 1 of 2 files" in str(exc_info.value.detail)
\ No newline at end of file
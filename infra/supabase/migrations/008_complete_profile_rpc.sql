@@ -0,0 +1,22 @@
+-- Complete profile in one round trip
+-- Returns every profile section as a single JSON document so the API loads a
+-- profile with one RPC instead of one request per table
+
+CREATE OR REPLACE FUNCTION get_complete_profile(uid uuid)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'personal_info', (SELECT row_to_json(pi) FROM core.personal_info pi WHERE pi.user_id = uid),
+    'profile', (SELECT row_to_json(p) FROM core.profiles p WHERE p.user_id = uid),
+    'education', COALESCE((SELECT json_agg(e ORDER BY e.start_date DESC) FROM core.education e WHERE e.user_id = uid), '[]'::json),
+    'experience', COALESCE((SELECT json_agg(x ORDER BY x.start_date DESC) FROM core.experience x WHERE x.user_id = uid), '[]'::json),
+    'skills', COALESCE((SELECT json_agg(s ORDER BY s.name) FROM core.skills s WHERE s.user_id = uid), '[]'::json),
+    'certifications', COALESCE((SELECT json_agg(c ORDER BY c.issue_date DESC) FROM core.certifications c WHERE c.user_id = uid), '[]'::json),
+    'referees', COALESCE((SELECT json_agg(r ORDER BY r.name) FROM core.referees r WHERE r.user_id = uid), '[]'::json)
+  );
+$$;
+
+-- Runs with the caller's privileges, so row level security still applies
+GRANT EXECUTE ON FUNCTION get_complete_profile TO authenticated, service_role;
\ No newline at end of file
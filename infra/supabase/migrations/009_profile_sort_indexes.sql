@@ -0,0 +1,18 @@
+-- Composite indexes for profile section reads
+-- Each getter (and get_complete_profile) filters on user_id and sorts within
+-- the user's rows; these indexes serve both, replacing the plain user_id ones
+
+CREATE INDEX IF NOT EXISTS idx_education_user_start_date ON core.education(user_id, start_date DESC);
+CREATE INDEX IF NOT EXISTS idx_experience_user_start_date ON core.experience(user_id, start_date DESC);
+CREATE INDEX IF NOT EXISTS idx_skills_user_name ON core.skills(user_id, name);
+CREATE INDEX IF NOT EXISTS idx_certifications_user_issue_date ON core.certifications(user_id, issue_date DESC);
+CREATE INDEX IF NOT EXISTS idx_referees_user_name ON core.referees(user_id, name);
+
+-- The composite indexes lead with user_id, and personal_info/profiles are
+-- keyed by user_id already, so the single-column indexes are redundant
+DROP INDEX IF EXISTS core.idx_education_user_id;
+DROP INDEX IF EXISTS core.idx_experience_user_id;
+DROP INDEX IF EXISTS core.idx_skills_user_id;
+DROP INDEX IF EXISTS core.idx_certifications_user_id;
+DROP INDEX IF EXISTS core.idx_referees_user_id;
+DROP INDEX IF EXISTS core.idx_profiles_user_id;
\ No newline at end of file
@@ -0,0 +1,8 @@
+-- Content hash for uploads
+-- Lets a re-upload of an already parsed file reuse its parsed data
+
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS content_sha256 text;
+
+CREATE INDEX IF NOT EXISTS idx_uploads_user_content_sha256
+  ON uploads(user_id, content_sha256)
+  WHERE parsed_data IS NOT NULL;
\ No newline at end of file
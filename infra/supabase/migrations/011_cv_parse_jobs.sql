@@ -0,0 +1,6 @@
+-- Allow CV parsing jobs in the job queue
+-- Uploads enqueue a cv_parse job for the worker instead of parsing inline
+
+ALTER TABLE job_queue DROP CONSTRAINT IF EXISTS job_queue_job_type_check;
+ALTER TABLE job_queue ADD CONSTRAINT job_queue_job_type_check
+  CHECK (job_type IN ('cv_generation', 'cover_letter_generation', 'job_analysis', 'bulk_generation', 'cv_parse'));
\ No newline at end of file
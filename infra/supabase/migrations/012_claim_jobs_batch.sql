@@ -0,0 +1,25 @@
+-- Claim queued jobs in batches
+-- Pending rows are locked with SKIP LOCKED and marked as processing in the same
+-- statement, so concurrent workers never claim the same job
+
+CREATE OR REPLACE FUNCTION claim_jobs_from_queue(batch_size integer DEFAULT 4)
+RETURNS SETOF job_queue AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE job_queue
+    SET status = 'processing',
+        started_at = now(),
+        updated_at = now()
+    WHERE id IN (
+        SELECT jq.id
+        FROM job_queue jq
+        WHERE jq.status = 'pending'
+          AND jq.scheduled_at <= now()
+          AND jq.retry_count < jq.max_retries
+        ORDER BY jq.priority ASC, jq.scheduled_at ASC
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
\ No newline at end of file
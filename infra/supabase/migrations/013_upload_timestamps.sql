@@ -0,0 +1,23 @@
+-- Server-side upload timestamps
+-- processed_at is set when an upload reaches a final status and cleared when it
+-- moves back to pending/processing, so the API no longer sends timestamps
+
+CREATE OR REPLACE FUNCTION set_upload_processed_at()
+RETURNS trigger AS $$
+BEGIN
+    IF NEW.status IS DISTINCT FROM OLD.status THEN
+        NEW.processed_at := CASE
+            WHEN NEW.status IN ('completed', 'failed') THEN now()
+            ELSE NULL
+        END;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_uploads_processed_at
+    BEFORE UPDATE ON uploads
+    FOR EACH ROW
+    EXECUTE FUNCTION set_upload_processed_at();
+
+ALTER TABLE uploads ALTER COLUMN created_at SET NOT NULL;
\ No newline at end of file
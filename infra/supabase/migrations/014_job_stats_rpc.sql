@@ -0,0 +1,22 @@
+-- Job dashboard statistics in one round trip
+-- Returns every JobStats field as a single JSON document so the dashboard
+-- needs one RPC instead of six count queries
+
+CREATE OR REPLACE FUNCTION get_job_stats(uid uuid)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'total_watchlist_sites', (SELECT count(*) FROM job_sites_watchlist w WHERE w.user_id = uid),
+    'active_sites', (SELECT count(*) FROM job_sites_watchlist w WHERE w.user_id = uid AND w.is_active),
+    'last_crawl', (SELECT max(w.last_crawled_at) FROM job_sites_watchlist w WHERE w.user_id = uid),
+    'total_jobs_found', (SELECT count(*) FROM jobs j JOIN job_sites_watchlist w ON w.id = j.site_id WHERE w.user_id = uid),
+    'new_jobs_today', (SELECT count(*) FROM jobs j JOIN job_sites_watchlist w ON w.id = j.site_id WHERE w.user_id = uid AND j.created_at >= CURRENT_DATE),
+    'suggested_jobs', (SELECT count(*) FROM suggested_jobs s WHERE s.user_id = uid AND s.is_dismissed = false),
+    'unviewed_suggestions', (SELECT count(*) FROM suggested_jobs s WHERE s.user_id = uid AND s.is_viewed = false AND s.is_dismissed = false),
+    'generated_cvs', (SELECT count(*) FROM generated_cvs c WHERE c.user_id = uid)
+  );
+$$;
+
+GRANT EXECUTE ON FUNCTION get_job_stats(uuid) TO authenticated, service_role;
\ No newline at end of file
@@ -0,0 +1,8 @@
+-- Composite index for listing a user's uploads
+-- get_user_uploads filters on user_id and orders by created_at (newest first);
+-- id breaks ties so the index also serves keyset pagination
+
+CREATE INDEX IF NOT EXISTS idx_uploads_user_created_at ON uploads(user_id, created_at DESC, id DESC);
+
+-- Covered by the composite index above
+DROP INDEX IF EXISTS idx_uploads_user_id;
\ No newline at end of file
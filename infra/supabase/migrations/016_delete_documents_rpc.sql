@@ -0,0 +1,16 @@
+-- Permanent document deletion in one round trip
+-- Deletes the caller's documents (shares and access logs cascade) and
+-- returns their storage paths so the files can be removed afterwards
+
+CREATE OR REPLACE FUNCTION delete_document_permanent(doc_ids uuid[], user_id uuid)
+RETURNS SETOF text
+LANGUAGE sql
+VOLATILE
+AS $$
+  DELETE FROM document_vault d
+  WHERE d.id = ANY(doc_ids)
+    AND d.user_id = delete_document_permanent.user_id
+  RETURNING d.file_path;
+$$;
+
+GRANT EXECUTE ON FUNCTION delete_document_permanent(uuid[], uuid) TO authenticated, service_role;
\ No newline at end of file
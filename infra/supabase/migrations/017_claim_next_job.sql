@@ -0,0 +1,17 @@
+-- Claim the next queued job atomically
+-- get_next_job_from_queue only selected the head row, so the SKIP LOCKED lock
+-- ended with the statement and parallel pollers could read the same job. It
+-- now marks the row as processing in the same statement, like
+-- claim_jobs_from_queue, and returns the full job row
+
+DROP FUNCTION IF EXISTS get_next_job_from_queue();
+
+CREATE OR REPLACE FUNCTION get_next_job_from_queue()
+RETURNS SETOF job_queue
+LANGUAGE sql
+VOLATILE
+AS $$
+  SELECT * FROM claim_jobs_from_queue(1);
+$$;
+
+GRANT EXECUTE ON FUNCTION get_next_job_from_queue() TO authenticated, service_role;
\ No newline at end of file
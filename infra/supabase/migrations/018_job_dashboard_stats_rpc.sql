@@ -0,0 +1,30 @@
+-- Job queue dashboard statistics in one round trip
+-- Returns the status and type counts and the five most recent jobs as a
+-- single JSON document, so the dashboard needs one RPC instead of three
+-- queries (two of them reading every job the user has)
+
+CREATE OR REPLACE FUNCTION get_job_dashboard_stats(uid uuid)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'total_jobs', count(*),
+    'pending_jobs', count(*) FILTER (WHERE q.status = 'pending'),
+    'processing_jobs', count(*) FILTER (WHERE q.status = 'processing'),
+    'completed_jobs', count(*) FILTER (WHERE q.status = 'completed'),
+    'failed_jobs', count(*) FILTER (WHERE q.status = 'failed'),
+    'jobs_by_type', COALESCE((
+      SELECT json_object_agg(t.job_type, t.job_count)
+      FROM (SELECT job_type, count(*) AS job_count FROM job_queue WHERE user_id = uid GROUP BY job_type) t
+    ), '{}'::json),
+    'recent_jobs', COALESCE((
+      SELECT json_agg(r ORDER BY r.created_at DESC)
+      FROM (SELECT * FROM job_queue WHERE user_id = uid ORDER BY created_at DESC LIMIT 5) r
+    ), '[]'::json)
+  )
+  FROM job_queue q
+  WHERE q.user_id = uid;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_job_dashboard_stats(uuid) TO authenticated, service_role;
\ No newline at end of file
@@ -0,0 +1,16 @@
+-- Count share link opens atomically
+-- The share link handler incremented access_count from the value it had read,
+-- so concurrent opens lost counts; the increment now happens in the database
+
+CREATE OR REPLACE FUNCTION record_share_access(share_id uuid)
+RETURNS void
+LANGUAGE sql
+VOLATILE
+AS $$
+  UPDATE document_shares s
+  SET access_count = s.access_count + 1,
+      last_accessed_at = now()
+  WHERE s.id = share_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION record_share_access(uuid) TO authenticated, service_role;
\ No newline at end of file
@@ -0,0 +1,8 @@
+-- Composite index for listing a user's vault documents
+-- get_documents filters on user_id and status and pages newest first with a
+-- (created_at, id) keyset, so the index serves the filter, sort and cursor
+
+CREATE INDEX IF NOT EXISTS idx_document_vault_user_status_created_at ON document_vault(user_id, status, created_at DESC, id DESC);
+
+-- Covered by the composite index above
+DROP INDEX IF EXISTS idx_document_vault_user_id;
\ No newline at end of file
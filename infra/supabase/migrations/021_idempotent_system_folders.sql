@@ -0,0 +1,30 @@
+-- Idempotent system folder creation
+-- create_system_folders_for_user already inserted its folders in one statement,
+-- but top-level folders have a NULL parent_folder_id, which the
+-- UNIQUE(user_id, name, parent_folder_id) constraint never matches, so a
+-- repeated call duplicated every folder. The insert now skips folders the
+-- user already has, still in a single statement.
+
+CREATE OR REPLACE FUNCTION create_system_folders_for_user(user_id uuid)
+RETURNS void
+LANGUAGE sql
+VOLATILE
+AS $$
+  INSERT INTO document_folders (user_id, name, description, is_system_folder, icon, color)
+  SELECT create_system_folders_for_user.user_id, f.name, f.description, true, f.icon, f.color
+  FROM (VALUES
+    ('CVs', 'Generated CV documents', 'document-text', '#10B981'),
+    ('Cover Letters', 'Generated cover letters', 'mail', '#3B82F6'),
+    ('Certificates', 'Certificates and credentials', 'academic-cap', '#F59E0B'),
+    ('Portfolio', 'Portfolio documents', 'briefcase', '#8B5CF6'),
+    ('Archive', 'Archived documents', 'archive', '#6B7280')
+  ) AS f(name, description, icon, color)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM document_folders d
+    WHERE d.user_id = create_system_folders_for_user.user_id
+      AND d.name = f.name
+      AND d.parent_folder_id IS NULL
+  );
+$$;
+
+GRANT EXECUTE ON FUNCTION create_system_folders_for_user(uuid) TO authenticated, service_role;
\ No newline at end of file
@@ -0,0 +1,42 @@
+-- Lookup functions for document uploads
+-- Every upload checks for an existing copy of the file and resolves the
+-- default folder for its type. Running both lookups as SQL functions lets
+-- Postgres reuse their query plans, and the partial indexes below answer
+-- each lookup from one index probe
+
+CREATE INDEX IF NOT EXISTS idx_document_vault_user_hash_active
+  ON document_vault(user_id, file_hash)
+  WHERE status = 'active';
+
+CREATE INDEX IF NOT EXISTS idx_document_folders_user_system_name
+  ON document_folders(user_id, name)
+  WHERE is_system_folder = true;
+
+CREATE OR REPLACE FUNCTION find_duplicate_document(user_id uuid, file_hash text)
+RETURNS TABLE (id uuid, title text)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT d.id, d.title
+  FROM document_vault d
+  WHERE d.user_id = find_duplicate_document.user_id
+    AND d.file_hash = find_duplicate_document.file_hash
+    AND d.status = 'active'
+  LIMIT 1;
+$$;
+
+CREATE OR REPLACE FUNCTION get_system_folder_id(user_id uuid, folder_name text)
+RETURNS uuid
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT f.id
+  FROM document_folders f
+  WHERE f.user_id = get_system_folder_id.user_id
+    AND f.name = folder_name
+    AND f.is_system_folder = true
+  LIMIT 1;
+$$;
+
+GRANT EXECUTE ON FUNCTION find_duplicate_document(uuid, text) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION get_system_folder_id(uuid, text) TO authenticated, service_role;
\ No newline at end of file